@@ -3,11 +3,13 @@ from flask_cors import CORS
 import sys
 import os
 import yaml
-from threading import Lock
+from datetime import datetime, timedelta
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.triggers.date import DateTrigger
 from functools import wraps
 
 sys.path.append(os.getcwd())
@@ -18,8 +20,11 @@ import utils.Log_sql as user_activity_log
 from utils.logger_config import logger
 import utils.helper as helper
 import utils.decorators as decorator
+from utils.tenant_manager import TenantManager, artifact_size_mb
+from utils.http_client import http_stats
 import src.graphs.graph_v3 as graph_v3
 import utils.data_backup_runner as data_backup_runner
+import utils.state_retention as state_retention
 import report.Report as report
 from shared_admin_api import register_admin_endpoints, apply_client_api_keys, save_conversation_to_json, save_to_report_db
 
@@ -31,45 +36,47 @@ with open('client_properties.yaml', 'r') as f:
 for configured_client in client_configs.keys():
     apply_client_api_keys(configured_client, client_configs, logger)
 
-# Pre-load graphs at startup to avoid lazy-loading delays and errors
-client_graphs = {}
-graph_locks = {}
-
-# Initialize all graphs at startup
-for client_id in client_configs.keys():
-    try:
-        logger.info(f"Initializing graph for client: {client_id}")
-        client_graphs[client_id] = graph_v3.MultiTenantGraph(client=client_id, state_in_memory=False)
-        client_graphs[client_id].build_graph()
-        logger.info(f"Graph initialized successfully for: {client_id}")
-    except Exception as e:
-        logger.error(f"Failed to initialize graph for {client_id}: {e}")
-        client_graphs[client_id] = None
-
-def get_or_create_graph(client_id):
-    """Get pre-loaded graph or lazy-load if initialization failed at startup"""
-    if client_id not in client_configs:
-        raise ValueError(f"Client '{client_id}' not configured in client_properties.yaml")
-
+application_properties = helper.load_application_properties()
+# Indexing jobs run in spawned worker processes (utils/indexing_jobs.py), which re-import this module as __mp_main__
+# when the app is started with `python app.py`. Nothing below that loads tenants, sets up databases or starts schedulers
+# may run in them.
+IS_SERVER_PROCESS = __name__ != "__mp_main__"
+# 'lazy': load each tenant on its first request. 'background': serve immediately and load every tenant on a thread pool.
+# 'eager': load everything before serving.
+STARTUP_MODE = application_properties.get("STARTUP_MODE", "eager")
+TENANT_LOAD_TIMEOUT = float(application_properties.get("TENANT_LOAD_TIMEOUT", 120))
+
+def build_client_graph(client_id):
+    """Build and compile a tenant's graph, then warm its models so the first visitor doesn't pay for it"""
+    graph = graph_v3.MultiTenantGraph(client=client_id, state_in_memory=False)
+    graph.build_graph()
+    graph.warm_up()
+    return graph
+
+# Graphs are loaded in parallel on a background pool; requests for a tenant that is still loading wait for it.
+# Only the most recently used tenants stay resident (MAX_RESIDENT_TENANTS / MAX_RESIDENT_TENANT_MB of on-disk artifacts);
+# tenants serving a request are never evicted, evicted ones close their state DB connections.
+max_resident_tenants = application_properties.get("MAX_RESIDENT_TENANTS")
+max_resident_tenant_mb = application_properties.get("MAX_RESIDENT_TENANT_MB")
+tenant_manager = TenantManager(
+    client_configs,
+    build_client_graph,
+    max_workers=int(application_properties.get("TENANT_LOADER_WORKERS", 4)),
+    max_tenants=int(max_resident_tenants) if max_resident_tenants else None,
+    max_artifact_mb=float(max_resident_tenant_mb) if max_resident_tenant_mb else None,
+    size_estimator=lambda client_id: artifact_size_mb(client_configs[client_id]),
+    on_evict=lambda graph: graph.close(),
+)
+if IS_SERVER_PROCESS and STARTUP_MODE != "lazy":
+    tenant_manager.start_loading()
+if IS_SERVER_PROCESS and STARTUP_MODE == "eager":
+    tenant_manager.wait_until_loaded()
+
+def use_client_graph(client_id):
+    """Context manager yielding the tenant's graph, waiting for it if it is still loading (lazy-loads again if a previous
+    load failed). The tenant is not evicted until the block exits."""
     apply_client_api_keys(client_id, client_configs, logger)
-
-    # If graph exists, return it
-    if client_id in client_graphs and client_graphs[client_id] is not None:
-        return client_graphs[client_id]
-
-    # Otherwise, lazy-load with thread safety
-    if client_id not in graph_locks:
-        graph_locks[client_id] = Lock()
-
-    with graph_locks[client_id]:
-        # Double-check after acquiring lock
-        if client_graphs.get(client_id) is None:
-            logger.info(f"Lazy-loading graph for client: {client_id}")
-            client_graphs[client_id] = graph_v3.MultiTenantGraph(client=client_id, state_in_memory=False)
-            client_graphs[client_id].build_graph()
-            logger.info(f"Graph lazy-loaded successfully for: {client_id}")
-
-    return client_graphs[client_id]
+    return tenant_manager.use(client_id, timeout=TENANT_LOAD_TIMEOUT)
 
 # Define the allowed domain for iframe embedding
 ALLOWED_IP = os.getenv('ALLOWED_IP') 
@@ -83,10 +90,12 @@ app.register_blueprint(report.report_bp)
 
 CORS(app) 
 ###### Log db and report db creation #####
-# creating db to log user activity
-user_activity_log.create_user_log_db()
-# report db creation. Create for every required client_id. Also loads any unprocessed conversations.
-report.create_db_report(client_id="terralogic")
+if IS_SERVER_PROCESS:
+    # creating db to log user activity
+    user_activity_log.create_user_log_db()
+    # report db creation. Create for every required client_id. Also loads any unprocessed conversations,
+    # except in lazy/background startup modes where that back-processing is scheduled after the app is serving.
+    report.create_db_report(client_id="terralogic", process_unprocessed=(STARTUP_MODE == "eager"))
 
 
 @app.after_request
@@ -109,11 +118,12 @@ def get_responses():
 
         # Lazy load graph for requested client
         try:
-            graph = get_or_create_graph(client_id)
+            with use_client_graph(client_id) as graph:
+                output = graph.run_graph(clean_user_input, session_id=session_id)
         except ValueError as e:
             return jsonify({"error": str(e)}), 404
-
-        output = graph.run_graph(clean_user_input, session_id=session_id)
+        except FutureTimeoutError:
+            return jsonify({"error": f"Client '{client_id}' is still loading, please retry shortly"}), 503
 
         record={
              user_input.lower(): {
@@ -139,6 +149,22 @@ def get_responses():
         print(f"Error: {e}")  # Log error for debugging
         return jsonify(error=str(e)), 500
     
+# Readiness API: 200 once every tenant is loaded, 503 with per-tenant status while loading or after a failure
+@app.route('/ready', methods=['GET'])
+def ready():
+    tenants = tenant_manager.readiness()
+    # lazily loaded tenants are ready to be served as long as none of them failed to load
+    if STARTUP_MODE == "lazy":
+        is_ready = all(entry["status"] != "failed" for entry in tenants.values())
+    else:
+        is_ready = all(entry["status"] in ("ready", "evicted") for entry in tenants.values())
+    return jsonify({"ready": is_ready, "startup_mode": STARTUP_MODE, "tenants": tenants}), (200 if is_ready else 503)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Process gauges: resident tenants with load/evict counters, outbound HTTP timings per host"""
+    return jsonify({"tenants": tenant_manager.stats(), "http": http_stats()})
+
 #Chatbot Interface API
 @app.route('/<client_id>')
 @decorator.restrict_domain(ALLOWED_IP)
@@ -169,6 +195,12 @@ def start_scheduler():
     # Start the scheduler
     logger.info("Report scheduler is scheduled")
 
+    # unprocessed conversations are back-processed once the app is serving (lazy/background startup modes)
+    if STARTUP_MODE != "eager":
+        backfill_delay = int(application_properties.get("REPORT_BACKFILL_DELAY_SECONDS", 60))
+        scheduler.add_job(lambda: report.insert_summary_into_report_db(client_id="terralogic"), DateTrigger(run_date=datetime.now() + timedelta(seconds=backfill_delay)))
+        logger.info(f"Report back-processing scheduled in {backfill_delay}s")
+
     # data backup scheduler
     logger.info("Data backup scheduler started")
     # # Define a trigger to run every week
@@ -177,9 +209,16 @@ def start_scheduler():
     scheduler.add_job(lambda: data_backup_runner.take_backup_to_provider_bucket("akamai", client_id="terralogic", need_state_db = True, need_report_db = True, need_log_db = True), data_backup_trigger)
     # # Start the scheduler
     logger.info("Data backup scheduler is scheduled")
+
+    # state db retention: prune old checkpoints, archive idle threads and give the freed pages back to the OS
+    state_retention_trigger = IntervalTrigger(hours=int(application_properties.get("STATE_RETENTION_INTERVAL_HOURS", 24)))
+    for configured_client in client_configs.keys():
+        scheduler.add_job(lambda client_id=configured_client: state_retention.compact_state_db(client_id), state_retention_trigger)
+    logger.info("State retention scheduler is scheduled")
     scheduler.start()
 
-start_scheduler()
+if IS_SERVER_PROCESS:
+    start_scheduler()
 
 if __name__ == "__main__":
     app.run(debug=True, port=5001)
@@ -71,7 +71,7 @@ def ensure_schema_upgrade(client_id):
         conn.commit()
 
 
-def create_db_report(client_id):
+def create_db_report(client_id, process_unprocessed=True):
     # create report_db folder if it doesn't exist
     os.makedirs(report_db_path, exist_ok=True)
     report_db_name = os.path.join(report_db_path, f"{client_id}.db")
@@ -116,43 +116,27 @@ def create_db_report(client_id):
         logger.info("Report.py: report DB already exists.")
     
     # Insert data into the client_sessions_data table. Loads any unprocessed conversations when the function is called (application load)
-    insert_summary_into_report_db(client_id=client_id)
-    logger.info("Report.py: processed all unprocessed conversations on application start.")
+    # process_unprocessed=False leaves this to the caller, e.g. a job scheduled after the app starts serving.
+    if process_unprocessed:
+        insert_summary_into_report_db(client_id=client_id)
+        logger.info("Report.py: processed all unprocessed conversations on application start.")
     
 
 def fetch(client_id):
     """
     Function to fetch conversation information from state_db and write into report database.
 
-    1. Gathers client_id.db, client_id.db-wal from state_db folder. .db-shm file has transient locking and state data, not the actual data
-    2. Copies them over to report_db folder, flushes write-ahead log into the client_id.db
-    3. Runs conversation summary function. This gathers last day's data from log_sql database and conversation is summarised for them.
-    4. return result dictionary. It has conversation_summary, company_details and other fields. 
+    1. Opens state_db/client_id.db read-only. The state DB runs in WAL mode, so the reader sees every committed checkpoint
+       (including ones still in client_id.db-wal) without copying the files or blocking the chatbot's writes.
+    2. Runs conversation summary function. This gathers last day's data from log_sql database and conversation is summarised for them.
+    3. return result dictionary. It has conversation_summary, company_details and other fields. 
     """
 
-    state_db_load_path = os.path.join(report_app_db_path, "load")
-    os.makedirs(state_db_load_path, exist_ok=True)
-
     state_db_file = os.path.join(state_db_path, f"{client_id}.db")
-    # make a copy of the state_db file into the load folder. This copy is used for fetching all the conversations for summarization.
-    shutil.copy(state_db_file, state_db_load_path)  
-    state_db_load_file = os.path.join(state_db_load_path, f"{client_id}.db")
     try:
-        state_db_wal_file = os.path.join(state_db_path, f"{client_id}.db-wal")
-
-        # if write ahead log file exists, copy and flush it to the main database
-        if os.path.exists(state_db_wal_file):
-            shutil.copy(state_db_wal_file, state_db_load_path)
-            logger.info(f"Copied WAL file: {state_db_wal_file} to {state_db_load_path}")
-
-            conn = sqlite3.connect(state_db_load_file)
-            # Flushes all pages from the WAL to the main DB file.
-            conn.execute("PRAGMA wal_checkpoint(FULL);")
-            conn.close()
-
         # summarize all the unprocessed 
         start = time.perf_counter()
-        result, total_conversations, rejected_conversations = conv_summarizer.conversation_summary_from_db(llm, state_db_load_file, log_db_file)
+        result, total_conversations, rejected_conversations = conv_summarizer.conversation_summary_from_db(llm, state_db_file, log_db_file, read_only=True)
         summary_duration = time.perf_counter() - start
         logger.info(f"Summarizer Completed: Total - {total_conversations}, Rejected - {rejected_conversations}, Summary Duration - {summary_duration:.4f}")
         # result = jsonify(result)
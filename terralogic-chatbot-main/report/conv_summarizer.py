@@ -1,4 +1,5 @@
 import sqlite3
+from contextlib import closing
 import pandas as pd
 import msgpack
 import pprint
@@ -18,6 +19,7 @@ import sys
 sys.path.append(os.getcwd())
 import utils.Log_sql as log_sql
 import utils.helper as helper
+from src.graphs.checkpointer import open_read_connection
 
 load_dotenv()
 
@@ -140,19 +142,27 @@ def fetch_unpacked_data_from_thread(conn, thread_id):
 def get_details_from_unpacked_data(unpacked_data, min_message_number=5):
     time_stamp = unpacked_data["ts"] if "ts" in unpacked_data else None
     unpacked_data = unpacked_data["channel_values"]
-    if "name" in unpacked_data and "email" in unpacked_data and "messages" in unpacked_data and unpacked_data["name"] is not None and unpacked_data["email"] is not None and len(unpacked_data["messages"]) > min_message_number :
+    # messages removed by the graph's MessageTrimmer still count towards the conversation length
+    trimmed_messages = unpacked_data.get("trimmed_messages", 0) or 0
+    if "name" in unpacked_data and "email" in unpacked_data and "messages" in unpacked_data and unpacked_data["name"] is not None and unpacked_data["email"] is not None and len(unpacked_data["messages"]) + trimmed_messages > min_message_number :
         name = unpacked_data["name"]
         email = unpacked_data["email"]
         messages = unpacked_data["messages"]
-        return (True, [name, email, messages, time_stamp])
+        return (True, [name, email, messages, time_stamp, unpacked_data.get("summary", "")])
     else:
         return (False, [])
 
 
 # extract Human and AI messages from message list. Takes care of duplicate Human message for old state_db
-def parse_conversation_from_state_messages(messages):
+# summary holds the "User: ..." / "Bot: ..." transcript of turns trimmed out of the message list
+def parse_conversation_from_state_messages(messages, summary=""):
     user_questions = []
     chatbot_answers = []
+    for line in (summary or "").split("\n"):
+        if line.startswith("User: "):
+            user_questions.append(line[len("User: "):])
+        elif line.startswith("Bot: "):
+            chatbot_answers.append(line[len("Bot: "):])
     for message in messages:  
         unpacked_messages =  msgpack.unpackb(message.data, raw=False)
         message_type = unpacked_messages[1]
@@ -216,7 +226,7 @@ def write_into_json_file(data, file_path):
 
 
 # Extract conversation details, summary for each conversation from dsqlite file
-def conversation_summary_from_db(llm, db_path, log_db_path):
+def conversation_summary_from_db(llm, db_path, log_db_path, read_only=False):
     """
     Generate conversation details, including name, email, conversation summary of interaction with the chatbot. Extracts from the SQLite database.
 
@@ -224,6 +234,7 @@ def conversation_summary_from_db(llm, db_path, log_db_path):
         llm: language model to process the conversation summary.
         db_path: path to the SQLite database file. 
         log_db_path: path to the log database.
+        read_only: open db_path through a read-only connection, so a live (WAL-mode) state DB can be read without copying it.
     Returns:
         A dictionary with status, reason, and processed conversations as JSON.
     """
@@ -242,7 +253,8 @@ def conversation_summary_from_db(llm, db_path, log_db_path):
     company_info_extractor = CompanyInformationExtraction(llm, max_search_result=5, search_depth="basic")
 
     try:
-        with sqlite3.connect(db_path) as conn:
+        conn = open_read_connection(db_path) if read_only else sqlite3.connect(db_path)
+        with closing(conn), conn:
             cursor = conn.cursor()
 
             # Get unique thread IDs available in the database
@@ -262,13 +274,13 @@ def conversation_summary_from_db(llm, db_path, log_db_path):
                     # Extract data from the Python object
                     status, extracted_data = get_details_from_unpacked_data(unpacked_data)
                     if status:
-                        name, email, messages, time_stamp = extracted_data
+                        name, email, messages, time_stamp, summary = extracted_data
                     else:
                         rejected_chat_count += 1
                         continue
 
                     # Prepare user questions and chatbot answers
-                    user_questions, chatbot_answers = parse_conversation_from_state_messages(messages)
+                    user_questions, chatbot_answers = parse_conversation_from_state_messages(messages, summary)
 
                     # Generate a conversation summary using the LLM
                     conversation_summary,conversation_category = write_conversation_summary(llm, user_questions, chatbot_answers)
@@ -22,6 +22,9 @@ import tempfile
 from docx import Document as DocxDocument
 from fpdf import FPDF
 
+from utils.helper import load_application_properties
+from utils.indexing_jobs import IndexingJobRunner, IndexingQueueFull
+
 API_PROVIDER_ENV_MAP = {
     "openai": "OPENAI_API_KEY",
     "azure_openai": "AZURE_OPENAI_API_KEY",
@@ -443,6 +446,14 @@ def register_admin_endpoints(app, client_configs, logger=None):
 
         return pdf.output()
 
+    # indexing jobs of every client, see utils/indexing_jobs.py
+    indexing_properties = load_application_properties()
+    indexing_runner = IndexingJobRunner(
+        max_workers=int(indexing_properties.get("INDEXING_WORKERS", 2)),
+        max_queued=int(indexing_properties.get("INDEXING_MAX_QUEUED", 5)),
+    )
+    app.indexing_runner = indexing_runner
+
     def _validate_client(client_id: str):
         if not client_id or client_id not in client_configs:
             raise ValueError(f"Invalid client_id: {client_id}")
@@ -584,94 +595,45 @@ def register_admin_endpoints(app, client_configs, logger=None):
             log_info(f"[DEBUG] Received indexing request: client_id={client_id}, index_type={index_type}, urls={urls}, sitemap={sitemap}")
             _validate_client(client_id)
 
-            import subprocess
-            import sys
-            import threading
-
-            job_id = str(uuid.uuid4())
-            app.indexing_jobs = getattr(app, "indexing_jobs", {})
-
             if index_type == "sitemap" and sitemap:
                 indexing_mode = f"Sitemap ({sitemap})"
                 indexing_mode_detail = f"Sitemap mode: {sitemap}"
+                options = {"website_only": True, "sitemap": sitemap}
             elif index_type == "website" and urls:
                 indexing_mode = "Specific URLs"
                 indexing_mode_detail = f"URL mode: {urls}"
+                options = {"website_only": True, "urls": [url.strip() for url in urls.split(",") if url.strip()]}
             elif index_type == "website":
                 indexing_mode = "Full Website"
                 indexing_mode_detail = "Full website mode"
+                options = {"website_only": True}
             elif index_type == "pdf":
                 indexing_mode = "PDF"
                 indexing_mode_detail = "PDF mode"
+                options = {}
             else:
                 indexing_mode = "Full"
                 indexing_mode_detail = "Full (default) mode"
+                options = {}
 
-            app.indexing_jobs[job_id] = {
-                "status": "processing",
-                "progress": 0,
-                "message": f"Starting {indexing_mode} indexing...",
-                "indexing_mode": indexing_mode_detail,
-                "client_id": client_id,
-            }
+            def on_finish(job):
+                _save_indexing_history(client_id, indexing_mode_detail, urls, sitemap, job["status"])
 
-            def run_indexing():
-                try:
-                    chatbot_root = os.getcwd()
-                    setup_path = os.path.join(chatbot_root, "src", "setup.py")
-
-                    app.indexing_jobs[job_id]["message"] = f"Running setup.py for {indexing_mode} indexing..."
-                    app.indexing_jobs[job_id]["progress"] = 10
-
-                    if index_type == "sitemap" and sitemap:
-                        cmd = ["py", "-3.12", setup_path, "-n", client_id, "-w", "-s", sitemap]
-                        log_info(f"[Index] Sitemap mode for {client_id} sitemap={sitemap}")
-                    elif index_type == "website" and urls:
-                        cmd = ["py", "-3.12", setup_path, "-n", client_id, "-w", "-u", urls]
-                        log_info(f"[Index] URL mode for {client_id} urls={urls}")
-                    elif index_type == "website":
-                        cmd = ["py", "-3.12", setup_path, "-n", client_id, "-w"]
-                        log_info(f"[Index] Full website mode for {client_id}")
-                    elif index_type == "pdf":
-                        cmd = ["py", "-3.12", setup_path, "-n", client_id]
-                        log_info(f"[Index] PDF mode for {client_id}")
-                    else:
-                        cmd = ["py", "-3.12", setup_path, "-n", client_id]
-                        log_info(f"[Index] Full (default) mode for {client_id}")
-
-                    result = subprocess.run(
-                        cmd,
-                        cwd=chatbot_root,
-                        capture_output=True,
-                        text=True,
-                    )
-
-                    if result.returncode == 0:
-                        app.indexing_jobs[job_id].update(
-                            {
-                                "status": "completed",
-                                "progress": 100,
-                                "message": f"{indexing_mode} indexing completed successfully",
-                            }
-                        )
-                        log_info(f"{indexing_mode} indexing completed for {client_id}: {job_id}")
-                        _save_indexing_history(client_id, indexing_mode_detail, urls, sitemap, "completed")
-                    else:
-                        raise RuntimeError(result.stderr or "Unknown error")
-                except Exception as exc_inner:
-                    app.indexing_jobs[job_id].update(
-                        {"status": "failed", "message": f"Indexing failed: {exc_inner}", "progress": 100}
-                    )
-                    log_error(f"Indexing error for {client_id}: {exc_inner}")
-                    _save_indexing_history(client_id, indexing_mode_detail, urls, sitemap, "failed")
-
-            threading.Thread(target=run_indexing, daemon=True).start()
-            log_info(f"{indexing_mode} indexing started for {client_id}: {job_id}")
+            # runs src/setup.py in a worker process; one job at a time per client, others queue behind it
+            job_id, created = indexing_runner.submit(client_id, options, description=indexing_mode, on_finish=on_finish)
+            job = indexing_runner.status(job_id)
+            log_info(f"{indexing_mode} indexing {job['status']} for {client_id}: {job_id}")
+
+            if not created:
+                # an identical job was already waiting: it has its history entry
+                return jsonify({"message": "Identical indexing job already queued", "job_id": job_id, "status": job["status"]}), 202
 
             # Save initial history entry
             _save_indexing_history(client_id, indexing_mode_detail, urls, sitemap, "started")
 
-            return jsonify({"message": "Indexing job started", "job_id": job_id, "status": "processing"}), 202
+            return jsonify({"message": "Indexing job started", "job_id": job_id, "status": job["status"]}), 202
+        except IndexingQueueFull as exc:
+            return jsonify({"error": str(exc)}), 429
         except ValueError as exc:
             return jsonify({"error": str(exc)}), 400
         except Exception as exc:
@@ -681,14 +643,38 @@ def register_admin_endpoints(app, client_configs, logger=None):
     @app.route("/api/indexing/status/<job_id>", methods=["GET"])
     def indexing_status(job_id):
         try:
-            jobs = getattr(app, "indexing_jobs", {})
-            if job_id not in jobs:
+            job = indexing_runner.status(job_id)
+            if job is None:
                 return jsonify({"error": "Job not found"}), 404
-            return jsonify({"job_id": job_id, **jobs[job_id]}), 200
+            return jsonify({"job_id": job_id, **job}), 200
         except Exception as exc:
             log_error(f"Error checking indexing status: {exc}")
             return jsonify({"error": str(exc)}), 500
 
+    @app.route("/api/indexing/cancel/<job_id>", methods=["POST"])
+    def cancel_indexing(job_id):
+        try:
+            if not indexing_runner.cancel(job_id):
+                return jsonify({"error": "Job not found or already finished"}), 404
+            log_info(f"Indexing job cancelled: {job_id}")
+            return jsonify({"job_id": job_id, **indexing_runner.status(job_id)}), 200
+        except Exception as exc:
+            log_error(f"Error cancelling indexing job: {exc}")
+            return jsonify({"error": str(exc)}), 500
+
+    @app.route("/api/indexing/jobs", methods=["GET"])
+    def list_indexing_jobs():
+        try:
+            client_id = request.args.get("client_id")
+            if client_id:
+                _validate_client(client_id)
+            return jsonify({"jobs": indexing_runner.list_jobs(client_id)}), 200
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        except Exception as exc:
+            log_error(f"Error listing indexing jobs: {exc}")
+            return jsonify({"error": str(exc)}), 500
+
     @app.route("/api/indexing/history", methods=["GET"])
     def get_indexing_history():
         try:
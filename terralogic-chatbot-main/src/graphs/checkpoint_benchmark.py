@@ -0,0 +1,149 @@
+import os
+import sys
+sys.path.append(os.getcwd())
+import uuid
+import time
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph import MessagesState
+from langchain_core.messages import AIMessage, ToolMessage
+
+from src.graphs.checkpointer import PooledSqliteSaver
+
+DURABILITY_MODES = ["sync", "async", "exit"]
+
+
+class BenchmarkState(MessagesState):
+    name: str
+    email: str
+    mode: str
+    next_node: str
+
+
+class CountingSqliteSaver(PooledSqliteSaver):
+    """
+    PooledSqliteSaver that counts checkpoint puts, pending-write puts and committed transactions.
+    """
+
+    def __init__(self, db_path, **kwargs):
+        super().__init__(db_path, **kwargs)
+        self._counter_lock = threading.Lock()
+        self.reset_counters()
+
+    def reset_counters(self):
+        with self._counter_lock:
+            self.puts, self.write_puts, self.commits = 0, 0, 0
+
+    def put(self, *args, **kwargs):
+        with self._counter_lock:
+            self.puts += 1
+        return super().put(*args, **kwargs)
+
+    def put_writes(self, *args, **kwargs):
+        with self._counter_lock:
+            self.write_puts += 1
+        return super().put_writes(*args, **kwargs)
+
+    @contextmanager
+    def cursor(self, transaction: bool = True):
+        with super().cursor(transaction) as cur:
+            yield cur
+        if transaction:
+            with self._counter_lock:
+                self.commits += 1
+
+
+def build_turn_graph(checkpointer, answer_size=600):
+    """
+    LLM-free copy of a chatbot turn: supervisor_node, then the introduction subgraph cycling
+    introduction_node -> tools -> introduction_node -> respond, with chat-sized messages.
+    """
+    answer = "x" * answer_size
+
+    def introduction_node(state):
+        if isinstance(state["messages"][-1], ToolMessage):
+            return {"messages": [AIMessage(content=answer)]}
+        tool_call = {"name": "ResponseFormatter", "args": {"name": "Alex", "email": "alex@example.com"}, "id": str(uuid.uuid4())}
+        return {"messages": [AIMessage(content="", tool_calls=[tool_call])]}
+
+    def tools(state):
+        return {"messages": [ToolMessage(content="Here is your structured response", tool_call_id=state["messages"][-1].tool_calls[0]["id"])]}
+
+    def should_continue(state):
+        return "tools" if state["messages"][-1].tool_calls else "respond"
+
+    def respond(state):
+        return {"name": "Alex", "email": "alex@example.com", "mode": "answering", "messages": [AIMessage(content=answer)]}
+
+    subgraph_builder = StateGraph(BenchmarkState)
+    subgraph_builder.add_node("introduction_node", introduction_node)
+    subgraph_builder.add_node("tools", tools)
+    subgraph_builder.add_node("respond", respond)
+    subgraph_builder.set_entry_point("introduction_node")
+    subgraph_builder.add_conditional_edges("introduction_node", should_continue, {"tools": "tools", "respond": "respond"})
+    subgraph_builder.add_edge("tools", "introduction_node")
+    subgraph_builder.add_edge("respond", END)
+
+    graph_builder = StateGraph(BenchmarkState)
+    graph_builder.add_node("supervisor_node", lambda state: {"next_node": "introduction"})
+    graph_builder.add_node("introduction_node", subgraph_builder.compile())
+    graph_builder.add_edge(START, "supervisor_node")
+    graph_builder.add_edge("supervisor_node", "introduction_node")
+    graph_builder.add_edge("introduction_node", END)
+    return graph_builder.compile(checkpointer=checkpointer)
+
+
+def _bytes_on_disk(db_path):
+    return sum(os.path.getsize(path) for path in (db_path, db_path + "-wal") if os.path.exists(path))
+
+
+def run_benchmark(durability, sessions=20, turns=10):
+    """
+    Run sessions x turns through the turn graph with the given durability mode.
+    Returns per-turn averages of checkpoint puts, write puts, commits and bytes appended to the database and WAL.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "benchmark.db")
+        saver = CountingSqliteSaver(db_path)
+        # no automatic WAL checkpoints, so the WAL size is exactly what the turns appended
+        with saver.pool.connection() as conn:
+            conn.execute("PRAGMA wal_autocheckpoint=0;")
+        graph = build_turn_graph(saver)
+
+        saver.reset_counters()
+        bytes_before = _bytes_on_disk(db_path)
+        start = time.perf_counter()
+        for _ in range(sessions):
+            config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+            for turn in range(turns):
+                graph.invoke({"messages": [("user", f"message {turn}")]}, config, durability=durability)
+        duration = time.perf_counter() - start
+        bytes_written = _bytes_on_disk(db_path) - bytes_before
+        saver.pool.close()
+
+    total_turns = sessions * turns
+    return {
+        "durability": durability,
+        "puts_per_turn": saver.puts / total_turns,
+        "write_puts_per_turn": saver.write_puts / total_turns,
+        "commits_per_turn": saver.commits / total_turns,
+        "bytes_per_turn": bytes_written / total_turns,
+        "ms_per_turn": duration / total_turns * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure checkpoint writes per chatbot turn for each LangGraph durability mode.")
+    parser.add_argument('-s', '--sessions', type=int, default=20, help='Number of sessions')
+    parser.add_argument('-t', '--turns', type=int, default=10, help='Turns per session')
+    args = parser.parse_args()
+
+    print(f"{'durability':<10} {'puts':>6} {'writes':>7} {'commits':>8} {'bytes':>10} {'ms':>7}  (per turn)")
+    for durability in DURABILITY_MODES:
+        result = run_benchmark(durability, sessions=args.sessions, turns=args.turns)
+        print(f"{result['durability']:<10} {result['puts_per_turn']:>6.1f} {result['write_puts_per_turn']:>7.1f} "
+              f"{result['commits_per_turn']:>8.1f} {result['bytes_per_turn']:>10.0f} {result['ms_per_turn']:>7.2f}")
@@ -0,0 +1,141 @@
+import sqlite3
+import pathlib
+import threading
+from queue import LifoQueue, Empty
+from contextlib import contextmanager
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from utils.logger_config import logger
+
+
+def configure_connection(conn, busy_timeout_ms=5000):
+    """
+    WAL lets readers run alongside the single writer; synchronous=NORMAL only fsyncs at WAL checkpoints;
+    busy_timeout makes a blocked writer wait instead of failing with 'database is locked'.
+    """
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)};")
+    return conn
+
+
+def open_read_connection(db_path, busy_timeout_ms=5000):
+    """
+    Read-only connection to a live state DB, for report extraction. In WAL mode it sees the last committed
+    state and never blocks the chatbot's checkpoint writes.
+    """
+    uri = pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, timeout=busy_timeout_ms / 1000, check_same_thread=False)
+    conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)};")
+    conn.execute("PRAGMA query_only=ON;")
+    return conn
+
+
+# put in the idle queue by close(), so callers waiting for a connection wake up and fail
+_CLOSED = object()
+
+
+class SqliteConnectionPool:
+    """
+    Bounded pool of WAL-mode connections to one SQLite file. Connections are opened lazily up to pool_size;
+    when all are in use, callers wait for one to be returned, at most busy_timeout_ms. close() closes the idle
+    connections and fails current and later waiters; the connections still checked out are closed when they are returned.
+    """
+
+    def __init__(self, db_path, pool_size=8, busy_timeout_ms=5000):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle = LifoQueue()
+        self._opened = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False)
+        # only takes effect on a new, empty file (and must precede the switch to WAL): pages freed by the retention
+        # job can then be given back with PRAGMA incremental_vacuum, see utils/state_retention.py
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+        return configure_connection(conn, self.busy_timeout_ms)
+
+    def release(self, conn):
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    def _checked(self, conn):
+        if conn is _CLOSED:
+            # leave the marker for the next waiter
+            self._idle.put(_CLOSED)
+            raise sqlite3.OperationalError(f"Connection pool of {self.db_path} is closed")
+        return conn
+
+    def acquire(self):
+        if self._closed:
+            raise sqlite3.OperationalError(f"Connection pool of {self.db_path} is closed")
+        try:
+            return self._checked(self._idle.get_nowait())
+        except Empty:
+            pass
+        with self._lock:
+            if self._opened < self.pool_size:
+                self._opened += 1
+                return self.connect()
+        try:
+            return self._checked(self._idle.get(timeout=self.busy_timeout_ms / 1000))
+        except Empty:
+            raise sqlite3.OperationalError(
+                f"No free connection to {self.db_path} after {self.busy_timeout_ms / 1000:.1f}s (pool_size={self.pool_size})"
+            ) from None
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                break
+            if conn is not _CLOSED:
+                conn.close()
+        self._idle.put(_CLOSED)
+
+
+class PooledSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver that checks a connection out of a WAL-mode pool for every operation, instead of serialising
+    all request threads on one shared connection behind a lock. Checkpoint reads and writes of different
+    sessions run concurrently; SQLite itself still orders the (short) write transactions.
+    """
+
+    def __init__(self, db_path, pool_size=8, busy_timeout_ms=5000, *, serde=None):
+        self.pool = SqliteConnectionPool(db_path, pool_size=pool_size, busy_timeout_ms=busy_timeout_ms)
+        setup_conn = self.pool.acquire()
+        super().__init__(setup_conn, serde=serde)
+        # create the tables once on the first connection, then hand it to the pool
+        self.setup()
+        self.pool.release(setup_conn)
+        logger.info(f"Checkpointer: pooled WAL connections to {db_path} (pool_size={pool_size})")
+
+    @contextmanager
+    def cursor(self, transaction: bool = True):
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                yield cur
+                if transaction:
+                    conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
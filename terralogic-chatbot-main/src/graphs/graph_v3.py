@@ -13,8 +13,7 @@ from langgraph.checkpoint.memory import MemorySaver
 # from langchain_community.embeddings import OpenAIEmbeddings
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langgraph.checkpoint.sqlite import SqliteSaver
-import sqlite3
+from src.graphs.checkpointer import PooledSqliteSaver
 from datetime import datetime
 import configparser
 import yaml
@@ -22,13 +21,19 @@ import markdown
 
 import os
 import sys
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 sys.path.append(os.getcwd())
 from src.subgraphs.introduction_subgraph import ServiceInformationSubgraph
 from src.subgraphs.service_subgraph import FAQLLMSubgraph
 from src.subgraphs.careers_subgraph import CareerToolNode
+from src.nodes.encoders import load_sentence_encoder
+from src.nodes.message_trimmer import MessageTrimmer
+from src.nodes.intent_router import IntentRouter
+from src.nodes.llm_driven import LLMNode
 
 from utils.logger_config import logger
 import utils.helper as helper
@@ -36,6 +41,9 @@ import utils.helper as helper
 # Load environment variables
 load_dotenv()
 
+# threads building one tenant's vectorstore and subgraphs
+SUBGRAPH_BUILD_WORKERS = 4
+
 class OverallState(MessagesState):
     # messages is implicit
     name: str
@@ -46,20 +54,45 @@ class OverallState(MessagesState):
     mode: str
     chatMessageOptions: List[str]
     jobs: List
+    # older turns folded out of messages by MessageTrimmer, and how many messages were removed
+    summary: str
+    trimmed_messages: int
 
 
 class Supervisor:
     """central supervising agent that transfers control to other nodes"""
 
-    def __init__(self, llm, all_prompts):
+    # classes of the intent_prompt chain and the routes they map to; starting a project goes to the services flow,
+    # like the "start a project" button
+    INTENT_NEXT_NODES = {"services": "services", "projects": "services", "careers": "career_node"}
+
+    def __init__(self, llm, all_prompts, intent_router=None):
         self.llm = llm
         self.next_node = "fallback_node"
         self.status = ""
+        self.intent_router = intent_router
         prompt = PromptTemplate(
             template = all_prompts["supervisor_prompt"],
             input_variables=["question", "name", "email"],
         )
         self.chain = prompt | self.llm | StrOutputParser()
+        self.intent_chain = None
+        if "intent_prompt" in all_prompts:
+            intent_prompt = PromptTemplate(template=all_prompts["intent_prompt"], input_variables=["question"])
+            self.intent_chain = intent_prompt | self.llm | StrOutputParser()
+
+    def classify_intent(self, question):
+        """
+        LLM fallback for free text the intent router is not confident about. Returns a next_node value or None.
+        """
+        if self.intent_chain is None:
+            return None
+        try:
+            intent = self.intent_chain.invoke({"question": question}).strip().strip("'\"").lower()
+        except Exception as e:
+            logger.exception(f"Supervisor intent chain failed: {e}")
+            return None
+        return self.INTENT_NEXT_NODES.get(intent)
 
     def understand(self, state):
 
@@ -75,6 +108,17 @@ class Supervisor:
                 return {'messages': messages, "next_node": "services"}
             if question.lower() == "looking for a job":
                 return {"messages": messages, "next_node": "career_node"}
+
+            # free text only picks a route before any flow is chosen: a confident local intent match routes without an
+            # LLM call, otherwise the LLM intent chain decides. Inside a flow, free text stays in it.
+            if state.get("next_node") is None:
+                next_node = None
+                if self.intent_router is not None:
+                    next_node, _ = self.intent_router.route(question)
+                if next_node is None:
+                    next_node = self.classify_intent(question)
+                if next_node is not None:
+                    return {'messages': messages, "next_node": next_node}
         return {'messages': messages}
     
     def fallback(self, state):
@@ -109,6 +153,10 @@ class MultiTenantGraph:
         # llm = ChatCohere(model='command-r-plus-08-2024')
         self.client = client
         self.state_in_memory = state_in_memory
+        # seconds spent in each startup step, logged once the graph is compiled
+        self.timings = {}
+        # when checkpoints of a turn are persisted, see CHECKPOINT_DURABILITY in application_properties.yaml
+        self.durability = helper.load_application_properties().get("CHECKPOINT_DURABILITY", "exit")
         # decision_llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=os.getenv("GOOGLE_API_KEY"))
         # embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
         try: 
@@ -123,28 +171,56 @@ class MultiTenantGraph:
 
             # Node creations
             if load_nodes:
+                start = time.perf_counter()
                 all_prompts = self._load_prompts(client_properties)
-                self.supervisor_agent = Supervisor(decision_llm, all_prompts)
-                self.supervisor_node = self.supervisor_agent.understand
-
-                service_info_subgraph = ServiceInformationSubgraph(llm, decision_llm, all_prompts)
-                self.service_info_node = service_info_subgraph.build_graph()
-
-                service_subgraph = FAQLLMSubgraph(llm, decision_llm, embeddings, all_prompts, client_properties, "services")
-                self.service_node = service_subgraph.faq_llm_career_build_graph()
-
-                project_subgraph = FAQLLMSubgraph(llm, decision_llm, embeddings, all_prompts, client_properties, "projects")
-                self.project_node = project_subgraph.faq_llm_career_build_graph()
-
-                career_subgraph = CareerToolNode(llm, client_properties, all_prompts)
-                self.career_node = career_subgraph.build_graph()
+                self.timings["prompts"] = time.perf_counter() - start
+
+                # independent subgraphs are built in parallel; services and projects share one FAISS load
+                vectorstore_path = os.path.join(client_properties["ROOT_DIR"], client_properties["CLIENT_NAME"], client_properties["VECTOR_STORE_FILE"])
+
+                def build_faq_llm_subgraph(subgraph_type):
+                    subgraph = FAQLLMSubgraph(llm, decision_llm, embeddings, all_prompts, client_properties, subgraph_type, vectorstore=vectorstore_future.result())
+                    self.timings.update(subgraph.timings)
+                    return subgraph.faq_llm_career_build_graph()
+
+                with ThreadPoolExecutor(max_workers=SUBGRAPH_BUILD_WORKERS, thread_name_prefix=f"{self.client}-init") as pool:
+                    # submitted first, so it always has a worker while the FAQ/LLM subgraphs wait on it
+                    vectorstore_future = pool.submit(self._timed, "faiss_load", LLMNode.load_or_create_vectorstore, vectorstore_path, client_properties["URL"], embeddings)
+                    intent_router_future = pool.submit(self._timed, "intent_router", IntentRouter.from_client_properties, client_properties)
+                    service_info_future = pool.submit(self._timed, "introduction_subgraph", lambda: ServiceInformationSubgraph(llm, decision_llm, all_prompts).build_graph())
+                    career_future = pool.submit(self._timed, "career_subgraph", lambda: CareerToolNode(llm, client_properties, all_prompts).build_graph())
+                    service_future = pool.submit(self._timed, "services_subgraph", build_faq_llm_subgraph, "services")
+                    project_future = pool.submit(self._timed, "projects_subgraph", build_faq_llm_subgraph, "projects")
+
+                    self.supervisor_agent = Supervisor(decision_llm, all_prompts, intent_router=intent_router_future.result())
+                    self.supervisor_node = self.supervisor_agent.understand
+                    self.service_info_node = service_info_future.result()
+                    self.service_node = service_future.result()
+                    self.project_node = project_future.result()
+                    self.career_node = career_future.result()
 
                 self.fallback_node = self.supervisor_agent.fallback
+                self.trim_node = MessageTrimmer().trim
 
         except Exception as e:
             logger.exception(f"LLM initialization failed at MultiTenantGraph")
 
     
+    def _timed(self, step, function, *args):
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.timings[step] = time.perf_counter() - start
+
+    def warm_up(self):
+        """
+        Run the FAQ encoder once so lazy initialisation (weights, ONNX session, thread pools) happens before the first visitor.
+        """
+        start = time.perf_counter()
+        load_sentence_encoder().encode(["warm up"])
+        logger.info(f"Models warmed up for {self.client} in {time.perf_counter() - start:.2f}s")
+
     def _load_prompts(self, client_properties):
         prompts_config = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
         prompts_file_path = os.path.join(client_properties["ROOT_DIR"], client_properties["CLIENT_NAME"], client_properties["SYSTEM_PROMPTS_FILE"])
@@ -166,14 +242,17 @@ class MultiTenantGraph:
         graph_builder.add_node("project_node", self.project_node)
         graph_builder.add_node("career_node", self.career_node)
         graph_builder.add_node("fallback_node", self.fallback_node)
+        graph_builder.add_node("trim_node", self.trim_node)
 
         graph_builder.add_edge(START, "supervisor_node")
         graph_builder.add_conditional_edges("supervisor_node", self.supervisor_agent.get_next_node)
-        graph_builder.add_edge("introduction_node", END)
-        graph_builder.add_edge("service_node", END)
-        graph_builder.add_edge("project_node", END)
-        graph_builder.add_edge("career_node", END)
-        graph_builder.add_edge("fallback_node", END)
+        # every turn ends by trimming the message list, so the checkpoint written for the turn stays bounded
+        graph_builder.add_edge("introduction_node", "trim_node")
+        graph_builder.add_edge("service_node", "trim_node")
+        graph_builder.add_edge("project_node", "trim_node")
+        graph_builder.add_edge("career_node", "trim_node")
+        graph_builder.add_edge("fallback_node", "trim_node")
+        graph_builder.add_edge("trim_node", END)
 
         # storing the conversation state either in-memory or in server local storage
         # when off memory- one file is created everytime graph is built
@@ -188,13 +267,31 @@ class MultiTenantGraph:
             ## 
             db_file = f"{self.client}.db"
             db_path = os.path.join(self.state_db_path, db_file)
-            conn = sqlite3.connect(db_path, check_same_thread=False)
-            memory = SqliteSaver(conn)
-
+            # WAL + pooled connections, so concurrent sessions don't serialize on one shared connection
+            application_properties = helper.load_application_properties()
+            memory = PooledSqliteSaver(
+                db_path,
+                pool_size=int(application_properties.get("STATE_DB_POOL_SIZE", 8)),
+                busy_timeout_ms=int(application_properties.get("STATE_DB_BUSY_TIMEOUT_MS", 5000)),
+            )
+
+        start = time.perf_counter()
         self.graph = graph_builder.compile(checkpointer=memory)
+        self.timings["compile"] = time.perf_counter() - start
         logger.info("Graph built and compiled")
+        breakdown = ", ".join(f"{step}={seconds:.2f}s" for step, seconds in self.timings.items())
+        logger.info(f"Tenant {self.client} startup timings: {breakdown}")
     
 
+    def close(self):
+        """
+        Release the state DB connections of an evicted tenant (see utils/tenant_manager.py).
+        """
+        checkpointer = getattr(getattr(self, "graph", None), "checkpointer", None)
+        if isinstance(checkpointer, PooledSqliteSaver):
+            checkpointer.pool.close()
+            logger.info(f"Tenant {self.client}: state DB connections closed")
+
     def _post_processing(self, output):
         llm_free_options = []
         chatMessageOptions = []
@@ -240,7 +337,7 @@ class MultiTenantGraph:
         }
 
         try:
-            output = self.graph.invoke(inputs, config)
+            output = self.graph.invoke(inputs, config, durability=self.durability)
             chatbot_answer, llm_free_options, chatMessageOptions, jobs = self._post_processing(output)
 
         except Exception as e:
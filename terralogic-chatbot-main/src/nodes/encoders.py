@@ -0,0 +1,196 @@
+import os
+import sys
+sys.path.append(os.getcwd())
+import argparse
+import threading
+import numpy as np
+
+from utils.logger_config import logger
+import utils.helper as helper
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+# all-MiniLM-L6-v2 truncates at 256 word pieces (SentenceTransformer max_seq_length)
+MAX_SEQ_LENGTH = 256
+
+_encoders = {}
+_encoders_lock = threading.RLock()
+
+
+class OnnxMiniLMEncoder:
+    """
+    Runs an exported, int8-quantized ONNX copy of all-MiniLM-L6-v2 through onnxruntime.
+    Mirrors the SentenceTransformer pipeline (tokenize -> transformer -> mean pooling -> L2 normalize)
+    so the embeddings are interchangeable with the PyTorch backend.
+    """
+
+    def __init__(self, model_dir, intra_op_threads=1):
+        # onnxruntime and tokenizers are only needed when this backend is enabled
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_dir = model_dir
+        model_path = os.path.join(model_dir, "model_int8.onnx")
+        tokenizer_path = os.path.join(model_dir, "tokenizer.json")
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session_options.intra_op_num_threads = intra_op_threads
+        session_options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, session_options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(self, sentences, batch_size=32):
+        """
+        Embed a list of sentences. Returns a float32 array of shape (len(sentences), 384).
+        """
+        if isinstance(sentences, str):
+            sentences = [sentences]
+
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            encodings = self.tokenizer.encode_batch(list(sentences[start:start + batch_size]))
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            # mean pooling over the non-padding tokens
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+
+        if not batches:
+            return np.zeros((0, 384), dtype=np.float32)
+        return np.vstack(batches)
+
+
+def load_sentence_encoder(backend=None, model_dir=None):
+    """
+    Return the process-wide FAQ sentence encoder. Both backends expose encode(sentences) -> np.ndarray.
+    backend: 'sentence_transformers' (PyTorch, default) or 'onnx'. Read from application_properties.yaml when not given.
+    When the ONNX model is missing, 'onnx' resolves (once) to the sentence_transformers encoder.
+    """
+    application_properties = helper.load_application_properties()
+    backend = backend or application_properties.get("FAQ_ENCODER_BACKEND", "sentence_transformers")
+    model_dir = model_dir or application_properties.get("ONNX_ENCODER_DIR", os.path.join("application_models", "all-MiniLM-L6-v2-int8"))
+
+    with _encoders_lock:
+        if backend in _encoders:
+            return _encoders[backend]
+
+        if backend == "onnx":
+            if os.path.exists(os.path.join(model_dir, "model_int8.onnx")):
+                encoder = OnnxMiniLMEncoder(model_dir, intra_op_threads=int(application_properties.get("ONNX_INTRA_OP_THREADS", 1)))
+                logger.info(f"FAQ encoder: ONNX int8 backend loaded from {model_dir}")
+            else:
+                logger.warning(f"FAQ encoder: ONNX model not found in {model_dir}, falling back to sentence_transformers")
+                encoder = load_sentence_encoder(backend="sentence_transformers")
+        else:
+            # importing sentence_transformers pulls in PyTorch, only do it when this backend is used
+            from sentence_transformers import SentenceTransformer
+            encoder = SentenceTransformer(MODEL_NAME)
+            logger.info("FAQ encoder: sentence_transformers backend loaded")
+
+        _encoders[backend] = encoder
+        return encoder
+
+
+def export_onnx_encoder(model_dir):
+    """
+    Export all-MiniLM-L6-v2 to ONNX and quantize the weights to int8. Needs torch and transformers (offline step only).
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    os.makedirs(model_dir, exist_ok=True)
+    hf_name = f"sentence-transformers/{MODEL_NAME}"
+    tokenizer = AutoTokenizer.from_pretrained(hf_name)
+    model = AutoModel.from_pretrained(hf_name)
+    model.eval()
+
+    fp32_path = os.path.join(model_dir, "model_fp32.onnx")
+    int8_path = os.path.join(model_dir, "model_int8.onnx")
+    dummy = tokenizer(["export sample sentence"], return_tensors="pt")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in ["input_ids", "attention_mask", "token_type_ids"]}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy["input_ids"], dummy["attention_mask"], dummy["token_type_ids"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    tokenizer.save_pretrained(model_dir)
+    print(f"Exported int8 ONNX encoder to {int8_path}")
+
+
+def compare_encoders(faq_questions, queries, model_dir, atol=0.05):
+    """
+    Parity check between the PyTorch and ONNX backends on a FAQ set.
+    Every query must pick the same top-1 FAQ, and top-1 scores must agree within atol.
+    """
+    from sentence_transformers import SentenceTransformer
+    torch_encoder = SentenceTransformer(MODEL_NAME)
+    onnx_encoder = OnnxMiniLMEncoder(model_dir)
+
+    torch_faqs = torch_encoder.encode(faq_questions, normalize_embeddings=True)
+    onnx_faqs = onnx_encoder.encode(faq_questions)
+    torch_scores = torch_encoder.encode(queries, normalize_embeddings=True) @ torch_faqs.T
+    onnx_scores = onnx_encoder.encode(queries) @ onnx_faqs.T
+
+    mismatches = []
+    for idx, query in enumerate(queries):
+        torch_top, onnx_top = int(np.argmax(torch_scores[idx])), int(np.argmax(onnx_scores[idx]))
+        score_gap = abs(float(torch_scores[idx][torch_top]) - float(onnx_scores[idx][onnx_top]))
+        if torch_top != onnx_top or score_gap > atol:
+            mismatches.append((query, faq_questions[torch_top], faq_questions[onnx_top], score_gap))
+    return mismatches
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description="Export and verify the ONNX FAQ encoder.")
+    parser.add_argument('-n', '--name', type=str, default="terralogic", help='Client whose FAQ set is used for the parity check')
+    parser.add_argument('-o', '--output', type=str, default=os.path.join("application_models", "all-MiniLM-L6-v2-int8"), help='Model output folder')
+    parser.add_argument('--skip-export', action='store_true', help='Only run the parity check')
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        export_onnx_encoder(args.output)
+
+    client_properties = helper.load_client_properties(args.name)
+    faq_json_path = os.path.join(client_properties["ROOT_DIR"], client_properties["CLIENT_NAME"], client_properties["FAQ_JSON_FILE"])
+    with open(faq_json_path, 'r') as f:
+        faqs = json.load(f)
+    faq_questions = [faq["question"] for faq in faqs]
+    # the FAQ questions themselves plus lower-cased variants act as queries
+    queries = faq_questions + [question.lower().rstrip("?") for question in faq_questions]
+
+    mismatches = compare_encoders(faq_questions, queries, args.output)
+    print(f"Top-1 parity: {len(queries) - len(mismatches)}/{len(queries)} queries match")
+    for query, torch_answer, onnx_answer, score_gap in mismatches:
+        print(f"Mismatch: {query!r}\n  torch: {torch_answer}\n  onnx:  {onnx_answer}\n  score gap: {score_gap:.4f}")
+
+    onnx_encoder = OnnxMiniLMEncoder(args.output)
+    start = time.perf_counter()
+    for query in queries:
+        onnx_encoder.encode([query])
+    print(f"ONNX encode latency: {(time.perf_counter() - start) / len(queries) * 1000:.2f} ms/query")
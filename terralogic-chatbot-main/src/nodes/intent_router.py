@@ -0,0 +1,72 @@
+import os
+import time
+import yaml
+import numpy as np
+
+from src.nodes.encoders import load_sentence_encoder
+from utils.logger_config import logger
+
+
+class IntentRouter:
+    """
+    Local intent classifier for the supervisor. Each intent of a tenant has a few exemplar messages
+    (Data/<client>/intent_exemplars.yaml); their normalized MiniLM embeddings are averaged into one centroid per intent.
+    A message is scored against the centroids with a single dot product, so routing costs one sentence encoding.
+    """
+
+    def __init__(self, exemplars_path, threshold=0.45, margin=0.05, encoder_backend=None):
+        self.threshold = threshold
+        self.margin = margin
+        self.embed_model = load_sentence_encoder(encoder_backend)
+
+        with open(exemplars_path, "r") as f:
+            intents = yaml.safe_load(f)
+
+        self.intents = list(intents.keys())
+        self.next_nodes = [intents[intent]["next_node"] for intent in self.intents]
+        centroids = []
+        for intent in self.intents:
+            exemplar_embeddings = np.asarray(self.embed_model.encode(intents[intent]["exemplars"]), dtype=np.float32)
+            exemplar_embeddings /= np.clip(np.linalg.norm(exemplar_embeddings, axis=1, keepdims=True), 1e-12, None)
+            centroid = exemplar_embeddings.mean(axis=0)
+            centroids.append(centroid / max(np.linalg.norm(centroid), 1e-12))
+        self.centroids = np.vstack(centroids)
+        logger.info(f"Intent router: {len(self.intents)} intents loaded from {exemplars_path}")
+
+    @classmethod
+    def from_client_properties(cls, client_properties):
+        """
+        Build the tenant's router, or return None when the tenant has no exemplars configured.
+        """
+        if "INTENT_EXEMPLARS_FILE" not in client_properties:
+            return None
+        exemplars_path = os.path.join(client_properties["ROOT_DIR"], client_properties["CLIENT_NAME"], client_properties["INTENT_EXEMPLARS_FILE"])
+        if not os.path.exists(exemplars_path):
+            logger.warning(f"Intent router: {exemplars_path} not found, free-text routing uses the LLM only")
+            return None
+        return cls(
+            exemplars_path,
+            threshold=float(client_properties.get("INTENT_ROUTER_THRESH", 0.45)),
+            margin=float(client_properties.get("INTENT_ROUTER_MARGIN", 0.05)),
+        )
+
+    def scores(self, question):
+        query = np.asarray(self.embed_model.encode([question]), dtype=np.float32)[0]
+        query /= max(np.linalg.norm(query), 1e-12)
+        return self.centroids @ query
+
+    def route(self, question):
+        """
+        Return (next_node, score). next_node is None when the best intent is below the threshold or
+        not clearly ahead of the runner-up.
+        """
+        start = time.perf_counter()
+        scores = self.scores(question)
+        ranked = np.argsort(scores)[::-1]
+        best = int(ranked[0])
+        best_score = float(scores[best])
+        runner_up = float(scores[ranked[1]]) if len(ranked) > 1 else -1.0
+        confident = best_score >= self.threshold and best_score - runner_up >= self.margin
+        logger.info(f"Intent router: {self.intents[best]} ({best_score:.3f}, margin {best_score - runner_up:.3f}) "
+                    f"{'routed' if confident else 'low confidence'} in {(time.perf_counter() - start) * 1000:.2f} ms")
+        return (self.next_nodes[best] if confident else None), best_score
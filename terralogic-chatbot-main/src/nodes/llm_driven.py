@@ -24,7 +24,7 @@ from utils.logger_config import logger
 
 class LLMNode:
 
-    def __init__(self, llm, embeddings, vectorstore_path, url, all_prompts, type):
+    def __init__(self, llm, embeddings, vectorstore_path, url, all_prompts, type, vectorstore=None):
         self.llm = llm
         self.embeddings = embeddings
         self.vectorstore_path = vectorstore_path
@@ -32,39 +32,49 @@ class LLMNode:
         self.retriever = None
         self.all_prompts = all_prompts
         self.type = type
-        # index the data first
-        self.index_data()
+        # index the data first. A vectorstore already loaded for the tenant is shared instead of loaded again.
+        self.index_data(vectorstore)
         self.rag_agent_init()
         # self.source_validator()
 
-    def bs4_extractor(self, html: str) -> str:
+    @staticmethod
+    def bs4_extractor(html: str) -> str:
         soup = BeautifulSoup(html, "lxml")
         return re.sub(r"\n\n+", "\n\n", soup.text).strip()
-    
-    def source_validator(self):
-        prompt = PromptTemplate(
-                    template = self.all_prompts["source_validator_template"],
-                    input_variables=["sources", "question"],
-                )
-        self.source_valid_chain = prompt | self.llm | JsonOutputParser()
-
-    def index_data(self):
 
+    @staticmethod
+    def load_or_create_vectorstore(vectorstore_path, url, embeddings):
+        """
+        Load the saved FAISS index, or crawl the website and create it the first time.
+        """
         # crete index for the first time
-        if len(os.listdir(self.vectorstore_path)) == 0:
-            loader = RecursiveUrlLoader(self.url, extractor=self.bs4_extractor)
+        if len(os.listdir(vectorstore_path)) == 0:
+            loader = RecursiveUrlLoader(url, extractor=LLMNode.bs4_extractor)
             docs_list = loader.load()
             text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
                 chunk_size=100, chunk_overlap=50
             )
             doc_splits = text_splitter.split_documents(docs_list)
             # Create a vectorstore
-            vectorstore = FAISS.from_documents(doc_splits, self.embeddings)
+            vectorstore = FAISS.from_documents(doc_splits, embeddings)
             # Save the documents and embeddings
-            vectorstore.save_local(self.vectorstore_path)
+            vectorstore.save_local(vectorstore_path)
         else:
             # load saved index
-            vectorstore = FAISS.load_local(self.vectorstore_path, self.embeddings, allow_dangerous_deserialization=True)
+            vectorstore = FAISS.load_local(vectorstore_path, embeddings, allow_dangerous_deserialization=True)
+        return vectorstore
+    
+    def source_validator(self):
+        prompt = PromptTemplate(
+                    template = self.all_prompts["source_validator_template"],
+                    input_variables=["sources", "question"],
+                )
+        self.source_valid_chain = prompt | self.llm | JsonOutputParser()
+
+    def index_data(self, vectorstore=None):
+
+        if vectorstore is None:
+            vectorstore = self.load_or_create_vectorstore(self.vectorstore_path, self.url, self.embeddings)
 
         # Create retriever
         self.retriever = vectorstore.as_retriever(search_type="similarity", search_kwargs={'k': 6, 'lambda_mult': 0.25})
@@ -0,0 +1,59 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage, RemoveMessage
+
+import utils.helper as helper
+
+
+class MessageTrimmer:
+    """
+    End-of-turn node that keeps the checkpointed message list bounded.
+
+    1. Tool scaffolding (AI tool-call messages and their ToolMessages, e.g. "Here is your structured response")
+       is removed once the turn is over.
+    2. Only the last `window` user/assistant messages are kept. Older ones are folded into `summary`,
+       a bounded "User: ... / Bot: ..." transcript. Older transcript lines are dropped once it exceeds summary_max_chars.
+    3. `trimmed_messages` counts every removed message, so report/conv_summarizer.py still sees the full conversation length.
+    """
+
+    def __init__(self, window=None, summary_max_chars=None, line_max_chars=None):
+        application_properties = helper.load_application_properties()
+        self.window = window or int(application_properties.get("MESSAGE_WINDOW", 20))
+        self.summary_max_chars = summary_max_chars or int(application_properties.get("SUMMARY_MAX_CHARS", 4000))
+        self.line_max_chars = line_max_chars or int(application_properties.get("SUMMARY_LINE_MAX_CHARS", 300))
+
+    @staticmethod
+    def is_tool_scaffolding(message):
+        return isinstance(message, ToolMessage) or (isinstance(message, AIMessage) and bool(message.tool_calls))
+
+    def _summary_line(self, message):
+        speaker = "User" if isinstance(message, HumanMessage) else "Bot"
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        content = " ".join(content.split())
+        if len(content) > self.line_max_chars:
+            content = content[:self.line_max_chars] + "..."
+        return f"{speaker}: {content}"
+
+    def _extend_summary(self, summary, messages):
+        lines = summary.split("\n") if summary else []
+        lines += [self._summary_line(message) for message in messages if message.content]
+        # keep the most recent part of the transcript within the budget
+        while lines and len("\n".join(lines)) > self.summary_max_chars:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def trim(self, state):
+        messages = state["messages"]
+        scaffolding = [message for message in messages if self.is_tool_scaffolding(message)]
+        conversation = [message for message in messages if not self.is_tool_scaffolding(message)]
+        overflow = conversation[:-self.window] if len(conversation) > self.window else []
+
+        removed = scaffolding + overflow
+        if not removed:
+            return {}
+
+        update = {
+            "messages": [RemoveMessage(id=message.id) for message in removed],
+            "trimmed_messages": state.get("trimmed_messages", 0) + len(removed),
+        }
+        if overflow:
+            update["summary"] = self._extend_summary(state.get("summary", ""), overflow)
+        return update
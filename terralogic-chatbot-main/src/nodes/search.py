@@ -3,56 +3,68 @@ import sys
 sys.path.append(os.getcwd())
 import re
 import json
+import html
+import hashlib
 import numpy as np
-import fitz
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 
+from src.nodes.encoders import load_sentence_encoder
+from utils.pdf_extractor import extract_pdf_pages, pages_complete
 from utils.logger_config import logger
 
+# number of related FAQs precomputed for every FAQ at index time
+FAQ_NEIGHBORS_K = 10
+
+
+def normalize_question(text):
+    """
+    Canonical form of a question for exact-match lookup: unescaped, without zero-width characters,
+    whitespace collapsed and lower-cased. Option clicks arrive bleach-escaped from /getresponses.
+    """
+    text = html.unescape(text or "")
+    text = re.sub(r"[\u200b\u200c\u200d\ufeff]", "", text)
+    return " ".join(text.split()).lower()
+
+
 class SearchNode:
     
-    def __init__(self, pdf_path, embeddings_path, faq_json_path, uploads_dir=None) -> None:
-        self.embed_model = SentenceTransformer('all-MiniLM-L6-v2')
+    def __init__(self, pdf_path, embeddings_path, faq_json_path, uploads_dir=None, encoder_backend=None) -> None:
+        # shared per process; backend (sentence_transformers / onnx) comes from application_properties.yaml
+        self.embed_model = load_sentence_encoder(encoder_backend)
         self.pdf_path = pdf_path
         self.embeddings_path = embeddings_path
         self.faq_json_path = faq_json_path
         self.uploads_dir = uploads_dir
         self.faqs = None
         self.faq_embeddings = None
+        self.faq_neighbors = None
+        self.question_index = {}
         
     def embed_sentences(self, sentences):
         """
-        Embed a list of sentences using the SentenceTransformer model.
+        Embed a list of sentences using the configured MiniLM encoder.
         """
         return self.embed_model.encode(sentences)
     
-    def extract_text_from_pdf_pymupdf(self):
+    def list_source_pdfs(self):
         """
-        Extract text from the base PDF and any uploaded PDFs.
+        Base PDF followed by the uploaded PDFs (sorted, so the merged FAQ order is stable).
         """
-        pages = []
-
-        # Base PDF
+        pdf_paths = []
         if os.path.exists(self.pdf_path):
-            try:
-                doc = fitz.open(self.pdf_path)
-                pages.extend([page.get_text() for page in doc])
-            except Exception as e:
-                logger.error(f"Error reading base PDF {self.pdf_path}: {e}")
-
-        # Uploaded PDFs (if any)
+            pdf_paths.append(self.pdf_path)
         if self.uploads_dir and os.path.exists(self.uploads_dir):
-            for filename in os.listdir(self.uploads_dir):
-                if not filename.lower().endswith(".pdf"):
-                    continue
-                file_path = os.path.join(self.uploads_dir, filename)
-                try:
-                    doc = fitz.open(file_path)
-                    pages.extend([page.get_text() for page in doc])
-                except Exception as e:
-                    logger.error(f"Error reading uploaded PDF {file_path}: {e}")
+            for filename in sorted(os.listdir(self.uploads_dir)):
+                if filename.lower().endswith(".pdf"):
+                    pdf_paths.append(os.path.join(self.uploads_dir, filename))
+        return pdf_paths
 
+    def extract_text_from_pdf_pymupdf(self):
+        """
+        Extract text from the base PDF and any uploaded PDFs.
+        """
+        pages = []
+        for pdf_pages in extract_pdf_pages(self.list_source_pdfs()).values():
+            pages.extend(text for text in pdf_pages or [] if text is not None)
         return pages
     
     def split_pdf_text_into_faqs(self, pdf_text):
@@ -158,6 +170,172 @@ class SearchNode:
 
         return faqs
 
+    @staticmethod
+    def file_sha256(file_path):
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def refresh_faq_data(self, pdf_pages=None):
+        """
+        Incrementally rebuild the merged FAQ files from the source PDFs.
+
+        FAQs and embeddings are cached per source document under faq_sources/, keyed by the PDF's sha256.
+        Only new or changed PDFs are parsed and embedded; caches of deleted PDFs are dropped, and every cache is
+        dropped when the FAQ encoder changes. PDFs that could not be fully extracted are not cached.
+        The merged FAQ json and embedding matrix are then rebuilt by concatenating the per-document caches.
+
+        pdf_pages: optional dict of pdf_path -> page texts already extracted in this indexing run.
+        """
+        faq_dir = os.path.dirname(self.faq_json_path)
+        sources_dir = os.path.join(faq_dir, "faq_sources")
+        os.makedirs(sources_dir, exist_ok=True)
+        manifest_path = os.path.join(sources_dir, "manifest.json")
+
+        # per-document caches are only reusable with the encoder that produced them
+        encoder_name = type(self.embed_model).__name__
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        if manifest.get("encoder") != encoder_name:
+            # another encoder's vectors must not be reused: drop every per-document cache
+            if manifest:
+                logger.info(f"FAQ encoder changed from {manifest.get('encoder')} to {encoder_name}, re-embedding every PDF")
+            for filename in os.listdir(sources_dir):
+                if filename.endswith((".json", ".npy")) and filename != "manifest.json":
+                    os.remove(os.path.join(sources_dir, filename))
+            manifest = {"encoder": encoder_name, "documents": {}}
+
+        documents = {}
+        for pdf_path in self.list_source_pdfs():
+            sha = self.file_sha256(pdf_path)
+            if sha in documents.values():
+                logger.info(f"Skipping duplicate PDF content: {pdf_path}")
+                continue
+            documents[pdf_path] = sha
+
+        def is_cached(sha):
+            return os.path.exists(os.path.join(sources_dir, f"{sha}.json")) and os.path.exists(os.path.join(sources_dir, f"{sha}.npy"))
+
+        # extract the new/changed PDFs together so they share the process pool
+        changed_paths = [pdf_path for pdf_path, sha in documents.items() if not is_cached(sha)]
+        pdf_pages = pdf_pages or {}
+        missing_paths = [pdf_path for pdf_path in changed_paths if pdf_path not in pdf_pages]
+        if missing_paths:
+            pdf_pages = {**pdf_pages, **extract_pdf_pages(missing_paths)}
+
+        all_faqs, all_embeddings = [], []
+        for pdf_path, sha in documents.items():
+            cached_faq_path = os.path.join(sources_dir, f"{sha}.json")
+            cached_emb_path = os.path.join(sources_dir, f"{sha}.npy")
+            if pdf_path not in changed_paths:
+                with open(cached_faq_path, 'r') as f:
+                    faqs = json.load(f)
+                embeddings = np.load(cached_emb_path)
+            else:
+                print(f"Extracting FAQs from {pdf_path}...")
+                pages = pdf_pages.get(pdf_path)
+                faqs = self.split_pdf_text_into_faqs([text for text in pages or [] if text is not None])
+                if faqs:
+                    embeddings = np.asarray(self.embed_sentences([faq["question"] for faq in faqs]), dtype=np.float32)
+                else:
+                    embeddings = np.zeros((0, 384), dtype=np.float32)
+                if pages_complete(pages):
+                    with open(cached_faq_path, 'w') as f:
+                        json.dump(faqs, f, indent=4)
+                    np.save(cached_emb_path, embeddings)
+                else:
+                    # unreadable or partly extracted PDF: not cached, so the next run extracts it again
+                    logger.warning(f"{pdf_path} was not fully extracted, its FAQs are not cached")
+
+            if faqs:
+                all_faqs.extend(faqs)
+                all_embeddings.append(embeddings)
+
+        # drop caches of PDFs that were deleted or replaced
+        live_hashes = set(documents.values())
+        for filename in os.listdir(sources_dir):
+            stem, ext = os.path.splitext(filename)
+            if ext in (".json", ".npy") and filename != "manifest.json" and stem not in live_hashes:
+                os.remove(os.path.join(sources_dir, filename))
+
+        manifest["documents"] = documents
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=4)
+
+        merged_embeddings = np.vstack(all_embeddings) if all_embeddings else np.zeros((0, 384), dtype=np.float32)
+        self.save_faq_store(all_faqs, merged_embeddings)
+        self.load_faq_store()
+        print(f"FAQs and embeddings saved. Parsed {len(changed_paths)} new/changed PDFs, reused {len(documents) - len(changed_paths)}.")
+        logger.info(f"Refreshed FAQ data: {len(self.faqs)} FAQs from {len(documents)} PDFs ({len(changed_paths)} parsed)")
+
+    def save_faq_store(self, faqs, embeddings):
+        """
+        Write the ID-aligned FAQ store: row i of the embedding matrix belongs to faqs[i].
+
+        Embeddings are saved L2-normalised as a raw float32 .npy so workers can memory-map them,
+        and both files are replaced atomically so running workers keep reading their old copy.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.clip(norms, 1e-12, None)
+
+        tmp_json_path = f"{self.faq_json_path}.tmp"
+        with open(tmp_json_path, 'w') as f:
+            json.dump(faqs, f, separators=(",", ":"))
+        tmp_emb_path = f"{self.embeddings_path}.tmp"
+        with open(tmp_emb_path, 'wb') as f:
+            np.save(f, embeddings)
+        tmp_neighbors_path = f"{self.neighbors_path}.tmp"
+        with open(tmp_neighbors_path, 'wb') as f:
+            np.save(f, self.compute_faq_neighbors(embeddings))
+        os.replace(tmp_emb_path, self.embeddings_path)
+        os.replace(tmp_neighbors_path, self.neighbors_path)
+        os.replace(tmp_json_path, self.faq_json_path)
+
+    @property
+    def neighbors_path(self):
+        return os.path.join(os.path.dirname(self.embeddings_path), "faq_neighbors.npy")
+
+    @staticmethod
+    def compute_faq_neighbors(embeddings, k=FAQ_NEIGHBORS_K):
+        """
+        For every FAQ, the ids of its k most similar other FAQs, most similar first. Shape (n_faqs, k), int32.
+        """
+        n_faqs = len(embeddings)
+        k = min(k, max(n_faqs - 1, 0))
+        if k == 0:
+            return np.zeros((n_faqs, 0), dtype=np.int32)
+        similarities = embeddings @ embeddings.T
+        np.fill_diagonal(similarities, -np.inf)
+        return np.argsort(-similarities, axis=1, kind="stable")[:, :k].astype(np.int32)
+
+    def load_faq_store(self):
+        """
+        Open the FAQ store. The embedding matrix is memory-mapped read-only, so all workers and tenants
+        share the page-cache copy and nothing is decompressed at startup.
+        """
+        with open(self.faq_json_path, 'r') as f:
+            self.faqs = json.load(f)
+        try:
+            self.faq_embeddings = np.load(self.embeddings_path, mmap_mode='r')
+        except ValueError:
+            # an empty FAQ set cannot be memory-mapped
+            self.faq_embeddings = np.load(self.embeddings_path)
+
+        if os.path.exists(self.neighbors_path):
+            self.faq_neighbors = np.load(self.neighbors_path)
+        if self.faq_neighbors is None or len(self.faq_neighbors) != len(self.faqs):
+            # store written before neighbor lists existed
+            self.faq_neighbors = self.compute_faq_neighbors(np.asarray(self.faq_embeddings))
+
+        self.question_index = {}
+        for faq_id, faq in enumerate(self.faqs):
+            self.question_index.setdefault(normalize_question(faq["question"]), faq_id)
+
     def load_faq_data(self):
         """
         Load FAQs and embeddings from precomputed files if available.
@@ -172,39 +350,47 @@ class SearchNode:
         if emb_dir:
             os.makedirs(emb_dir, exist_ok=True)
 
+        # one-time migration from the compressed .npz store
+        legacy_npz_path = os.path.splitext(self.embeddings_path)[0] + ".npz"
+        if not os.path.exists(self.embeddings_path) and os.path.exists(legacy_npz_path) and os.path.exists(self.faq_json_path):
+            with open(self.faq_json_path, 'r') as f:
+                faqs = json.load(f)
+            self.save_faq_store(faqs, np.load(legacy_npz_path)['faq_embeddings'])
+            logger.info(f"Migrated FAQ embeddings from {legacy_npz_path} to {self.embeddings_path}")
+
         if os.path.exists(self.embeddings_path) and os.path.exists(self.faq_json_path):
             # Load precomputed FAQs and embeddings
-            with open(self.faq_json_path, 'r') as f:
-                self.faqs = json.load(f)
-            data = np.load(self.embeddings_path)
-            self.faq_embeddings = data['faq_embeddings']
+            self.load_faq_store()
             print("Loaded precomputed FAQs and embeddings.")
         else:
-            # Extract text from PDF and compute embeddings
-            print("Extracting text from PDF...")
-            pdf_text = self.extract_text_from_pdf_pymupdf()
-            self.faqs = self.split_pdf_text_into_faqs(pdf_text)
-            
-            with open(self.faq_json_path, 'w') as f:
-                json.dump(self.faqs, f, indent=4)
-            
-            print("Computing embeddings...")
-            faq_questions = [faq["question"] for faq in self.faqs]
-            self.faq_embeddings = self.embed_sentences(faq_questions)
-            
-            np.savez(self.embeddings_path, faq_embeddings=self.faq_embeddings)
-            print("FAQs and embeddings saved.")
+            # Extract text from PDFs and compute embeddings
+            self.refresh_faq_data()
 
         logger.info("Loaded FAQ data")
 
+    def lookup_faq(self, user_question):
+        """
+        Exact (normalised) match of the user question against the FAQ questions, e.g. a clicked option.
+        Returns the FAQ id or None.
+        """
+        return self.question_index.get(normalize_question(user_question))
+
+    def related_faqs(self, faq_id, top_n=FAQ_NEIGHBORS_K):
+        """
+        The precomputed most similar FAQs of a FAQ, without running the encoder or the similarity scan.
+        """
+        return [self.faqs[i] for i in self.faq_neighbors[faq_id][:top_n]]
+
     def faq_search(self, user_question, top_n=4, mode='cosine'):
         """
         Perform semantic search between the user question and the FAQs.
         """
-        user_embedding = self.embed_sentences([user_question])
+        user_embedding = np.asarray(self.embed_sentences([user_question]), dtype=np.float32)[0]
 
         if mode == 'cosine':
-            similarities = cosine_similarity(user_embedding, self.faq_embeddings)[0]
+            # stored rows are unit length, so cosine similarity is a single mat-vec over the mapped matrix
+            user_embedding = user_embedding / max(float(np.linalg.norm(user_embedding)), 1e-12)
+            similarities = self.faq_embeddings @ user_embedding
             top_indices = np.argsort(similarities)[-top_n:][::-1]
             top_faqs = [self.faqs[i] for i in top_indices]
             top_scores = [similarities[i] for i in top_indices]
@@ -218,7 +404,7 @@ if __name__ == "__main__":
     # Paths for the cached files
     ROOT_DIR = "Data"
     PDF_PATH = f'{ROOT_DIR}/terralogic_academy/faq_data/Terralogic_Academy_FAQs_Nov222024.pdf'
-    EMBEDDINGS_PATH = f'{ROOT_DIR}/terralogic_academy/faq_data/faq_embeddings.npz'
+    EMBEDDINGS_PATH = f'{ROOT_DIR}/terralogic_academy/faq_data/faq_embeddings.npy'
     FAQ_JSON_PATH = f'{ROOT_DIR}/terralogic_academy/faq_data/faqs_from_pdf.json'
 
     # Load FAQ data on startup
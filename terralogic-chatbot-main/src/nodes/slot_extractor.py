@@ -0,0 +1,98 @@
+import re
+
+# strict: local part, then one or more dot-separated domain labels and an alphabetic TLD
+EMAIL_PATTERN = re.compile(r"(?<![\w.+-])([A-Za-z0-9][A-Za-z0-9._%+-]*@(?:[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?\.)+[A-Za-z]{2,24})(?![\w@-])")
+
+# phrases that introduce a name. "my name is X" leaves no doubt; "I'm X" / "this is X" are just as often
+# "I'm ready" or "this is urgent", so after those the name must be typed capitalised and end the clause
+NAME_INTRO_PATTERN = re.compile(r"\b(my name is|my name's|name is|name\s*:|call me|i am|i'm|im|this is)\s+", re.IGNORECASE)
+WEAK_INTRO_PHRASES = {"i am", "i'm", "im", "this is"}
+# words that may follow the name in "This is John here", "I'm John and ..."
+NAME_FOLLOWERS = {"and", "here", "speaking"}
+CLAUSE_PATTERN = re.compile(r"[^,;.!?\n]*")
+NAME_TOKEN_PATTERN = re.compile(r"^[A-Za-z][A-Za-z'\-]{1,29}$")
+MAX_NAME_TOKENS = 3
+
+# words that are never part of a name: greetings, fillers, and the vocabulary visitors use at this stage
+COMMON_WORDS = {
+    "a", "an", "the", "and", "or", "but", "so", "of", "to", "in", "on", "at", "for", "from", "with", "by", "about", "as",
+    "hi", "hii", "hey", "hello", "hola", "namaste", "greetings", "good", "morning", "afternoon", "evening", "day", "there",
+    "yes", "yeah", "yep", "no", "nope", "ok", "okay", "sure", "fine", "thanks", "thank", "you", "please", "pls", "cool", "great",
+    "i", "im", "me", "my", "mine", "we", "us", "our", "your", "yours", "he", "she", "they", "it", "its", "this", "that", "here",
+    "is", "am", "are", "was", "were", "be", "been", "do", "does", "did", "have", "has", "had", "can", "could", "would", "will",
+    "what", "who", "why", "how", "when", "where", "which", "name", "email", "mail", "gmail", "id", "address", "contact",
+    "looking", "interested", "searching", "trying", "want", "need", "like", "just", "also", "not", "new", "here", "again",
+    "job", "jobs", "career", "careers", "hiring", "work", "working", "project", "projects", "service", "services", "company",
+    "help", "info", "information", "details", "question", "questions", "test", "testing", "bot", "chatbot", "terralogic",
+    "student", "developer", "engineer", "manager", "fresher", "client", "customer", "user", "sir", "madam", "mr", "mrs", "ms",
+    # states and adjectives that follow "I'm" / "this is"
+    "ready", "happy", "glad", "excited", "curious", "sorry", "urgent", "important", "available", "busy", "free", "done",
+    "back", "based", "located", "going", "planning", "calling", "writing", "reaching", "wondering", "very", "really",
+    "all", "set", "bad", "well", "confused", "stuck", "late", "early", "currently", "still",
+    # topics visitors type instead of a name
+    "mobile", "app", "apps", "web", "website", "development", "software", "cloud", "migration", "react", "native",
+    "data", "ai", "ml", "devops", "testing", "design", "product", "platform", "solution", "solutions", "consulting",
+}
+
+
+def extract_email(text):
+    """
+    Return the single email address in text, or None when there is none or more than one.
+    """
+    matches = EMAIL_PATTERN.findall(text or "")
+    unique = {match.lower() for match in matches}
+    if len(unique) != 1:
+        return None
+    return matches[0].rstrip(".")
+
+
+def _as_name(candidate):
+    """
+    Accept 1-3 alphabetic tokens that are not common words, title-cased. Anything else is not a confident name.
+    """
+    tokens = candidate.split()
+    if not 0 < len(tokens) <= MAX_NAME_TOKENS:
+        return None
+    if any(not NAME_TOKEN_PATTERN.match(token) or token.lower() in COMMON_WORDS for token in tokens):
+        return None
+    return " ".join(token[:1].upper() + token[1:] for token in tokens)
+
+
+def _name_after(phrase, text):
+    """
+    Name that follows an intro phrase, up to the end of its clause. Returns None when unsure.
+    """
+    words = CLAUSE_PATTERN.match(text).group(0).split()
+    tokens = []
+    for word in words:
+        if word.lower() in COMMON_WORDS or word.lower() in NAME_FOLLOWERS:
+            break
+        tokens.append(word)
+    if phrase.lower() in WEAK_INTRO_PHRASES:
+        following = words[len(tokens):]
+        if following and following[0].lower() not in NAME_FOLLOWERS:
+            return None
+        if not all(token[:1].isupper() for token in tokens):
+            return None
+    return _as_name(" ".join(tokens))
+
+
+def extract_name(text):
+    """
+    Rule-based name extraction from an explicit intro phrase ("my name is X", "I'm X", "this is X here").
+    A message without one (a bare "John Doe", or a topic such as "cloud migration") is left to the LLM. Returns None when unsure.
+    """
+    # an email address ends the clause the name is in
+    text = EMAIL_PATTERN.sub(",", text or "")
+    for match in NAME_INTRO_PATTERN.finditer(text):
+        name = _name_after(" ".join(match.group(1).split()), text[match.end():])
+        if name is not None:
+            return name
+    return None
+
+
+def extract_slots(text):
+    """
+    Deterministic pre-pass over a user message. Returns (name, email); either is None when not found with confidence.
+    """
+    return extract_name(text), extract_email(text)
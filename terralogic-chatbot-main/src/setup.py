@@ -3,237 +3,313 @@
 import os
 import sys
 sys.path.append(os.getcwd())
-import re
 import argparse
 import yaml
-import requests
-import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
+import uuid
+import itertools
 
-from langchain_community.document_loaders import RecursiveUrlLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings
-from langchain_community.document_loaders import PyMuPDFLoader
+from langchain_core.documents import Document
 from langchain_experimental.text_splitter import SemanticChunker
 
 from src.nodes.search import SearchNode
+from utils.pdf_extractor import extract_pdf_pages
+from utils.url_fetcher import bs4_extractor, fetch_documents, write_fetch_report
+from utils.index_manifest import IndexManifest, content_hash, is_web_source
+from utils.vectorstore_builder import FaissIndexBuilder
+from utils.site_crawler import SiteCrawler
+from utils.sitemap_parser import iter_sitemap
 from utils.logger_config import logger
+import utils.helper as helper
 from shared_admin_api import load_api_key_for_provider
 
-parser = argparse.ArgumentParser(description="Parse company name from terminal.")
-parser.add_argument('-n', '--name', type=str, required=True, help='Name of the company')
-parser.add_argument('-w', '--website', action='store_true', help='Index website only (skip PDFs)')
-parser.add_argument('-u', '--urls', type=str, help='Comma-separated list of URLs to index')
-parser.add_argument('-s', '--sitemap', type=str, help='Sitemap XML URL to extract and index URLs from')
-args = parser.parse_args()
-client = args.name
-index_website_only = args.website
-custom_urls = args.urls.split(',') if args.urls else None
-sitemap_url = args.sitemap
-print(f"Client: {client}, Website Only: {index_website_only}, Custom URLs: {custom_urls}, Sitemap: {sitemap_url}")
-
-# Load properties from YAML file
-properties_file = os.path.join(os.getcwd(), "client_properties.yaml")
-with open(properties_file, "r", encoding="utf-8") as f:
-    all_properties = yaml.safe_load(f)
-    client_properties = all_properties.get(client, {})
-
-ROOT_DIR = client_properties["ROOT_DIR"]
-CLIENT_NAME = client_properties["CLIENT_NAME"]
-PDF_FILE = client_properties["PDF_FILE"]
-EMBEDDINGS_FILE = client_properties["EMBEDDINGS_FILE"]
-FAQ_JSON_FILE = client_properties["FAQ_JSON_FILE"]
-# Use custom URLs if provided, otherwise default to config URL
-# Convert single config URL to list for consistent handling
-# If sitemap is provided, extract URLs from sitemap
-if sitemap_url:
-    URLS = []  # Will be populated from sitemap
-    INDEX_MODE = "sitemap"
-elif custom_urls:
-    URLS = custom_urls
-    INDEX_MODE = "custom_urls"
-else:
-    URLS = [client_properties["URL"]]
-    INDEX_MODE = "default"
-vectorstore_path = os.path.join(ROOT_DIR, CLIENT_NAME, client_properties["VECTOR_STORE_FILE"])
-uploads_dir = os.path.join(ROOT_DIR, CLIENT_NAME, "uploads")
-
-# Load BYOK secrets (e.g., OpenAI) so embeddings work without .env edits
-load_api_key_for_provider(ROOT_DIR, CLIENT_NAME, provider="openai", logger=logger)
-
-embed_model = OpenAIEmbeddings(model="text-embedding-ada-002")
-
-# create the folder if not present
-os.makedirs(vectorstore_path, exist_ok=True)
-os.makedirs(uploads_dir, exist_ok=True)
-
-
-def load_pdf_documents(primary_pdf_path: str, uploads_directory: str):
-    """Load the base FAQ PDF and any additional PDFs uploaded via the Admin Portal."""
-    documents = []
+# Configuration of the current indexing run, set by configure() (one run at a time per process)
+client_properties = {}
+ROOT_DIR = CLIENT_NAME = PDF_FILE = EMBEDDINGS_FILE = FAQ_JSON_FILE = None
+URLS = []
+INDEX_MODE = "default"
+# sitemap <lastmod> per URL, used to skip unchanged pages on a website re-index
+SITEMAP_LASTMOD = {}
+# stream of sitemap entries, read while indexing (see sitemap_batches)
+SITEMAP_ENTRIES = None
+vectorstore_path = uploads_dir = manifest_path = None
+embed_model = None
+# progress callback of the run: progress(stage, count), count is cumulative per stage (see report_progress)
+PROGRESS = None
+PROGRESS_COUNTS = {}
+
+
+def configure(client: str, custom_urls: list = None, sitemap_url: str = None, progress=None):
+    """Load the client's properties and set up the paths, URL list and embedding model of an indexing run."""
+    global client_properties, ROOT_DIR, CLIENT_NAME, PDF_FILE, EMBEDDINGS_FILE, FAQ_JSON_FILE, URLS, INDEX_MODE
+    global SITEMAP_LASTMOD, SITEMAP_ENTRIES, vectorstore_path, uploads_dir, manifest_path, embed_model, PROGRESS, PROGRESS_COUNTS
+
+    # Load properties from YAML file
+    properties_file = os.path.join(os.getcwd(), "client_properties.yaml")
+    with open(properties_file, "r", encoding="utf-8") as f:
+        all_properties = yaml.safe_load(f)
+        client_properties = all_properties.get(client, {})
+
+    ROOT_DIR = client_properties["ROOT_DIR"]
+    CLIENT_NAME = client_properties["CLIENT_NAME"]
+    PDF_FILE = client_properties["PDF_FILE"]
+    EMBEDDINGS_FILE = client_properties["EMBEDDINGS_FILE"]
+    FAQ_JSON_FILE = client_properties["FAQ_JSON_FILE"]
+    # Use custom URLs if provided, otherwise default to config URL
+    # Convert single config URL to list for consistent handling
+    # If sitemap is provided, extract URLs from sitemap
+    SITEMAP_LASTMOD = {}
+    SITEMAP_ENTRIES = None
+    if sitemap_url:
+        URLS = []  # Will be populated from sitemap, as it is read
+        INDEX_MODE = "sitemap"
+    elif custom_urls:
+        URLS = list(custom_urls)
+        INDEX_MODE = "custom_urls"
+    else:
+        URLS = [client_properties["URL"]]
+        INDEX_MODE = "default"
+    vectorstore_path = os.path.join(ROOT_DIR, CLIENT_NAME, client_properties["VECTOR_STORE_FILE"])
+    uploads_dir = os.path.join(ROOT_DIR, CLIENT_NAME, "uploads")
+    manifest_path = os.path.join(ROOT_DIR, CLIENT_NAME, client_properties.get("INDEX_MANIFEST_FILE", "index_manifest.json"))
+    PROGRESS = progress
+    PROGRESS_COUNTS = {}
+
+    # Load BYOK secrets (e.g., OpenAI) so embeddings work without .env edits
+    load_api_key_for_provider(ROOT_DIR, CLIENT_NAME, provider="openai", logger=logger)
+
+    embed_model = OpenAIEmbeddings(model="text-embedding-ada-002")
+
+    # create the folder if not present
+    os.makedirs(vectorstore_path, exist_ok=True)
+    os.makedirs(uploads_dir, exist_ok=True)
+
+
+def report_progress(stage: str, count: int = 1):
+    """Add count to a pipeline stage (fetched, extracted, chunked, embedded, saving, saved) and pass the total to the run's callback."""
+    PROGRESS_COUNTS[stage] = PROGRESS_COUNTS.get(stage, 0) + count
+    if PROGRESS:
+        PROGRESS(stage, PROGRESS_COUNTS[stage])
+
+
+def save_index(vectorstore, manifest: IndexManifest = None):
+    """
+    Write the vectorstore, and the manifest describing its web pages, together. "saving" is the run's last
+    cancellation point; "saved" is reported once both are on disk and can no longer cancel the run.
+    """
+    report_progress("saving")
+    vectorstore.save_local(vectorstore_path)
+    if manifest is not None:
+        manifest.save()
+    report_progress("saved")
 
-    def load_pdf(path: str):
-        if os.path.exists(path) and path.lower().endswith(".pdf"):
-            loader = PyMuPDFLoader(path)
-            return loader.load()
-        return []
 
-    documents.extend(load_pdf(primary_pdf_path))
+def list_pdf_paths(primary_pdf_path: str, uploads_directory: str) -> list:
+    """Base FAQ PDF followed by any additional PDFs uploaded via the Admin Portal."""
+    pdf_paths = []
+    if os.path.exists(primary_pdf_path) and primary_pdf_path.lower().endswith(".pdf"):
+        pdf_paths.append(primary_pdf_path)
 
     if os.path.isdir(uploads_directory):
-        for filename in os.listdir(uploads_directory):
+        for filename in sorted(os.listdir(uploads_directory)):
             file_path = os.path.join(uploads_directory, filename)
-            documents.extend(load_pdf(file_path))
+            if filename.lower().endswith(".pdf"):
+                pdf_paths.append(file_path)
+    return pdf_paths
 
-    return documents
 
-# Beautiful soup plain text extractor function
-def bs4_extractor(html: str) -> str:
-    soup = BeautifulSoup(html, "lxml")
-    return re.sub(r"\n\n+", "\n\n", soup.text).strip()
+def load_pdf_documents(primary_pdf_path: str, uploads_directory: str, pdf_pages: dict = None):
+    """
+    Load the base FAQ PDF and any additional PDFs uploaded via the Admin Portal, one Document per page.
 
-def extract_urls_from_sitemap(sitemap_url: str) -> list:
+    pdf_pages: optional dict of pdf_path -> page texts already extracted in this run (shared with the FAQ parser).
     """
-    Extract all URLs from a sitemap XML file.
+    pdf_paths = list_pdf_paths(primary_pdf_path, uploads_directory)
+    pdf_pages = pdf_pages or {}
+    missing_paths = [path for path in pdf_paths if path not in pdf_pages]
+    if missing_paths:
+        pdf_pages = {**pdf_pages, **extract_pdf_pages(missing_paths)}
 
-    Args:
-        sitemap_url: URL of the sitemap XML file
+    documents = []
+    for path in pdf_paths:
+        pages = pdf_pages.get(path) or []
+        for page_number, text in enumerate(pages):
+            # pages that could not be extracted keep their number, the following pages stay aligned
+            if text is None:
+                continue
+            metadata = {"source": path, "file_path": path, "page": page_number, "total_pages": len(pages)}
+            documents.append(Document(page_content=text, metadata=metadata))
+
+    report_progress("extracted", len(documents))
+    return documents
 
-    Returns:
-        List of URLs extracted from the sitemap
+def sitemap_batches(batch_size: int):
     """
-    try:
-        print(f"Fetching sitemap from: {sitemap_url}")
-        response = requests.get(sitemap_url, timeout=30)
-        response.raise_for_status()
-
-        # Parse XML
-        root = ET.fromstring(response.content)
-
-        # Handle namespace
-        namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-
-        # Extract URLs
-        urls = []
-        for url_elem in root.findall('.//ns:url/ns:loc', namespace):
-            url = url_elem.text.strip()
-            if url:
-                urls.append(url)
-
-        print(f"Extracted {len(urls)} URLs from sitemap")
-        return urls
-    except Exception as e:
-        print(f"Error extracting URLs from sitemap: {e}")
-        logger.error(f"Sitemap parsing error: {e}")
-        return []
-
-def load_documents_from_urls(urls: list, extractor=None) -> list:
+    Yield the sitemap URLs in batches while the sitemap tree is still being read (utils/sitemap_parser.py).
+    Every URL is recorded in URLS and its lastmod in SITEMAP_LASTMOD.
+    """
+    batch = []
+    for loc, lastmod in SITEMAP_ENTRIES:
+        URLS.append(loc)
+        if lastmod:
+            SITEMAP_LASTMOD[loc] = lastmod
+        batch.append(loc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def load_documents_from_urls(urls: list, extractor=bs4_extractor) -> list:
     """
     Load documents from a list of URLs (non-recursive, direct fetch).
 
+    Pages are fetched concurrently (global and per-host limits, politeness delay and retries from
+    application_properties.yaml) and their text is extracted on a process pool, see utils/url_fetcher.py.
+    A per-URL timing and error report is written next to the vectorstore.
+
     Args:
         urls: List of URLs to fetch
-        extractor: Optional text extractor function
+        extractor: Text extractor function (module-level, it runs in worker processes)
 
     Returns:
         List of Document objects
     """
-    from langchain_community.document_loaders import WebBaseLoader
-
-    documents = []
-    total = len(urls)
-
-    print(f"Loading {total} custom URLs (non-recursive)...")
-
-    for idx, url in enumerate(urls, 1):
-        try:
-            if idx % 10 == 0:  # Progress update every 10 URLs
-                print(f"Progress: {idx}/{total} URLs loaded")
+    application_properties = helper.load_application_properties()
+    print(f"Loading {len(urls)} custom URLs (non-recursive, concurrent)...")
+
+    documents, reports = fetch_documents(
+        urls,
+        extractor=extractor,
+        max_workers=int(application_properties.get("FETCH_MAX_WORKERS", 16)),
+        per_host=int(application_properties.get("FETCH_PER_HOST_LIMIT", 4)),
+        delay=float(application_properties.get("FETCH_POLITENESS_DELAY", 0.2)),
+        retries=int(application_properties.get("FETCH_RETRIES", 2)),
+    )
+    write_fetch_report(reports, os.path.join(ROOT_DIR, CLIENT_NAME, "url_fetch_report.json"))
+    report_progress("fetched", sum(1 for report in reports if report.bytes))
+    report_progress("extracted", len(documents))
+
+    print(f"Successfully loaded {len(documents)} documents from {len(urls)} URLs")
+    return documents
 
-            loader = WebBaseLoader(url)
-            docs = loader.load()
+def crawl_website(urls: list, depth: int) -> tuple:
+    """
+    Crawl each start URL with the concurrent crawler (budgets and concurrency from application_properties.yaml,
+    see utils/site_crawler.py). Returns (the HTML pages as Documents, every URL the crawls discovered including the
+    ones that failed, whether every crawl finished within its budget); the per-URL report is written next to the vectorstore.
+    """
+    application_properties = helper.load_application_properties()
+    docs_list, reports = [], []
+    discovered_urls, complete = set(), True
+    for url in urls:
+        url = url.strip()
+        if not url: continue
+        print(f"Crawling URL: {url}")
+        crawler = SiteCrawler(
+            url,
+            max_depth=depth,
+            extractor=bs4_extractor,
+            max_workers=int(application_properties.get("CRAWL_MAX_WORKERS", 8)),
+            max_pages=int(application_properties.get("CRAWL_MAX_PAGES", 2000)),
+            max_bytes=int(application_properties.get("CRAWL_MAX_MB", 200)) * 1024 * 1024,
+            max_page_bytes=int(application_properties.get("CRAWL_MAX_PAGE_MB", 5)) * 1024 * 1024,
+            delay=float(application_properties.get("FETCH_POLITENESS_DELAY", 0.2)),
+        )
+        docs_list.extend(crawler.crawl())
+        reports.extend(crawler.reports)
+        discovered_urls |= crawler.discovered
+        complete = complete and not crawler.budget_reached
+    write_fetch_report(reports, os.path.join(ROOT_DIR, CLIENT_NAME, "url_fetch_report.json"))
+    report_progress("fetched", sum(1 for report in reports if report.bytes))
+    report_progress("extracted", len(docs_list))
+    print(f"Crawled {len(docs_list)} pages")
+    return docs_list, discovered_urls, complete
+
+def new_index_builder(vectorstore=None) -> FaissIndexBuilder:
+    """Index builder with the embedding batch size, concurrency and rate limit from application_properties.yaml."""
+    application_properties = helper.load_application_properties()
+    return FaissIndexBuilder(
+        embed_model,
+        vectorstore=vectorstore,
+        batch_size=int(application_properties.get("EMBED_BATCH_SIZE", 256)),
+        max_concurrency=int(application_properties.get("EMBED_MAX_CONCURRENCY", 4)),
+        requests_per_minute=int(application_properties.get("EMBED_REQUESTS_PER_MINUTE", 300)),
+        on_progress=lambda count: report_progress("embedded", count),
+    )
+
+def update_website_index(vectorstore, docs: list, current_urls: set, manifest: IndexManifest, text_splitter, lastmods: dict = None,
+                         remove_missing: bool = True) -> bool:
+    """
+    Apply a website crawl to an existing vectorstore: only new or changed pages are split and embedded, chunks of
+    changed pages and of pages no longer on the site are deleted from the FAISS index and docstore, and the
+    manifest records the result.
 
-            # Apply text extraction if provided
-            if extractor and docs:
-                for doc in docs:
-                    doc.page_content = extractor(doc.page_content)
+    current_urls is every URL still on the site, including the ones that were not loaded this run (skipped by lastmod,
+    or failed to load): those keep their chunks. With remove_missing=False (a crawl cut short by its budget, which
+    cannot tell a removed page from an unvisited one) no page is removed.
 
-            documents.extend(docs)
-        except Exception as e:
-            print(f"Failed to load {url}: {e}")
-            logger.warning(f"Failed to load URL {url}: {e}")
+    Returns True when the vectorstore changed.
+    """
+    lastmods = lastmods or {}
+    stale_ids = []
+    removed_urls = manifest.urls() - current_urls if remove_missing else set()
+    if not remove_missing:
+        print("Website re-index: the crawl did not cover the whole site, pages missing from it keep their chunks")
+    for url in removed_urls:
+        stale_ids.extend(manifest.remove(url))
+
+    new_splits, new_ids = [], []
+    seen_urls, unchanged = set(), 0
+    for doc in docs:
+        url = doc.metadata["source"]
+        if url in seen_urls:
             continue
+        seen_urls.add(url)
 
-    print(f"Successfully loaded {len(documents)} documents from {total} URLs")
-    return documents
+        page_hash = content_hash(doc.page_content)
+        if manifest.has_content(url, page_hash):
+            manifest.set_lastmod(url, lastmods.get(url))
+            unchanged += 1
+            continue
 
-def create_vectorstore(mode=None, depth=100, website_only=False, use_sitemap=False):
+        stale_ids.extend(manifest.chunk_ids(url))
+        splits = text_splitter.split_documents([doc])
+        ids = [str(uuid.uuid4()) for _ in splits]
+        new_splits.extend(splits)
+        new_ids.extend(ids)
+        manifest.record(url, page_hash, ids, lastmods.get(url))
+
+    indexed_ids = set(vectorstore.index_to_docstore_id.values())
+    stale_ids = [chunk_id for chunk_id in stale_ids if chunk_id in indexed_ids]
+    if stale_ids:
+        vectorstore.delete(stale_ids)
+    report_progress("chunked", len(new_splits))
+    if new_splits:
+        builder = new_index_builder(vectorstore)
+        builder.add_documents(new_splits, ids=new_ids)
+        builder.build()
+
+    print(
+        f"Website re-index: {len(seen_urls) - unchanged} new/changed pages ({len(new_splits)} chunks embedded), "
+        f"{unchanged} unchanged, {len(removed_urls)} removed ({len(stale_ids)} chunks deleted)"
+    )
+    return bool(stale_ids or new_splits)
+
+def create_vectorstore(mode=None, depth=100, website_only=False, use_sitemap=False, pdf_pages=None):
     """
     if block: if no vectorstore present, creates vectorstore with both urlloader and faq document
     else block: if vectorstore present, loads from disk and merges faw vectorstore with it
 
     website_only: If True, only index website content (skip PDFs)
     use_sitemap: If True, load URLs from sitemap instead of recursive crawling
+    pdf_pages: Optional dict of pdf_path -> page texts extracted earlier in this run
     """
 
     # Create Vectorstore for RAG agent
     if not os.path.exists(vectorstore_path) or len(os.listdir(vectorstore_path)) == 0:
-        docs_list = []
-
-        if use_sitemap:
-            # Sitemap mode: Load all URLs from sitemap directly
-            total_urls = len(URLS)
-            BATCH_SIZE = 50
-
-            if total_urls > BATCH_SIZE:
-                print(f"Sitemap mode: Processing {total_urls} URLs in batches of {BATCH_SIZE}")
-                docs_list = []  # Will accumulate from all batches
-
-                for i in range(0, total_urls, BATCH_SIZE):
-                    batch_num = (i // BATCH_SIZE) + 1
-                    total_batches = (total_urls + BATCH_SIZE - 1) // BATCH_SIZE
-                    batch_urls = URLS[i:i+BATCH_SIZE]
-
-                    print(f"Batch {batch_num}/{total_batches}: Loading {len(batch_urls)} URLs...")
-                    batch_docs = load_documents_from_urls(batch_urls)
-
-                    # Process batch immediately to avoid memory issues
-                    batch_splits = text_splitter.split_documents(batch_docs)
-                    print(f"Batch {batch_num}/{total_batches}: Split into {len(batch_splits)} chunks")
-
-                    if 'vectorstore' not in locals():
-                        # First batch - create initial vectorstore
-                        vectorstore = FAISS.from_documents(batch_splits, embed_model)
-                        print(f"Batch {batch_num}/{total_batches}: Created initial vectorstore with {len(batch_splits)} chunks")
-                    else:
-                        # Subsequent batches - create and merge
-                        batch_vectorstore = FAISS.from_documents(batch_splits, embed_model)
-                        vectorstore.merge_from(batch_vectorstore)
-                        print(f"Batch {batch_num}/{total_batches}: Merged {len(batch_splits)} chunks into main vectorstore")
-
-                print(f"✅ Sitemap batch processing complete! Processed {total_urls} URLs in {total_batches} batches")
-                sitemap_batch_processed = True  # Flag to indicate vectorstore already created
-                docs_list = []  # All processing done, no need for further processing
-
-            else:
-                # Small sitemap - process normally
-                print(f"Sitemap mode: Loading {total_urls} URLs (small batch)")
-                docs_list = load_documents_from_urls(URLS)
-        elif INDEX_MODE == "custom_urls":
-            # Custom URLs mode: Load ONLY the specified URLs (no recursive crawling)
-            print(f"Custom URLs mode: Loading {len(URLS)} specific URLs (no recursive crawling)")
-            docs_list = load_documents_from_urls(URLS, extractor=bs4_extractor)
-        else:
-            # Full website mode: Recursive crawling from homepage
-            print(f"Full website mode: Recursive crawling with depth={depth}")
-            for url in URLS:
-                url = url.strip()
-                if not url: continue
-                print(f"Loading URL: {url}")
-                loader = RecursiveUrlLoader(url, max_depth=depth, extractor=bs4_extractor, timeout=None,  continue_on_failure=False)
-                docs_list.extend(loader.load())
-
         if mode is None:
             text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
                 chunk_size=500, chunk_overlap=100
@@ -241,133 +317,98 @@ def create_vectorstore(mode=None, depth=100, website_only=False, use_sitemap=Fal
         elif mode == "semantic":
             text_splitter = SemanticChunker(embed_model, breakpoint_threshold_type="gradient")
 
-        # Filter HTML documents only if using recursive crawling
-        # For custom URLs and sitemap, content is already clean
-        if use_sitemap or INDEX_MODE == "custom_urls":
-            text_docs_list = docs_list
+        # chunks stream into one index; embedding of a batch runs while the next pages are fetched and split
+        builder = new_index_builder()
+        page_hashes = {}
+
+        def add_pages(docs):
+            for doc in docs:
+                if is_web_source(doc.metadata.get("source")):
+                    page_hashes[doc.metadata["source"]] = content_hash(doc.page_content)
+            splits = text_splitter.split_documents(docs)
+            report_progress("chunked", len(splits))
+            builder.add_documents(splits)
+
+        if use_sitemap:
+            # Sitemap mode: Load all URLs from sitemap directly, a batch at a time as the sitemap is read
+            # each batch is fetched concurrently, so it should be well above FETCH_MAX_WORKERS
+            BATCH_SIZE = 200
+            for batch_num, batch_urls in enumerate(sitemap_batches(BATCH_SIZE), 1):
+                print(f"Batch {batch_num}: Loading {len(batch_urls)} URLs...")
+                add_pages(load_documents_from_urls(batch_urls))
+            print(f"Loaded {len(URLS)} URLs from sitemap")
+        elif INDEX_MODE == "custom_urls":
+            # Custom URLs mode: Load ONLY the specified URLs (no recursive crawling)
+            print(f"Custom URLs mode: Loading {len(URLS)} specific URLs (no recursive crawling)")
+            add_pages(load_documents_from_urls(URLS, extractor=bs4_extractor))
         else:
-            # filter out rubbish files from recursive crawling
-            text_docs_list = [doc for doc in docs_list if 'text/html' in doc.metadata['content_type']]
+            # Full website mode: Recursive crawling from homepage
+            print(f"Full website mode: Recursive crawling with depth={depth}")
+            add_pages(crawl_website(URLS, depth)[0])
 
         # Conditionally load PDFs based on website_only flag
         if website_only:
             print("Website-only mode: Skipping PDF indexing")
-            total_docs_list = text_docs_list
         else:
             # load faq document(s)
             pdf_path = os.path.join(ROOT_DIR, CLIENT_NAME, PDF_FILE)
-            pdf_docs_list = load_pdf_documents(pdf_path, uploads_dir)
-            # create combined knowledge source of faq pdf and website index
-            total_docs_list = text_docs_list + pdf_docs_list
-
-        # Check if sitemap batching already created vectorstore
-        if 'sitemap_batch_processed' in locals() and sitemap_batch_processed:
-            print("Sitemap batching already completed - skipping further processing")
-        else:
-            doc_splits = text_splitter.split_documents(total_docs_list)
-
-            # BATCH PROCESSING: Split into smaller batches to avoid token limits
-            BATCH_SIZE = 30  # Process 30 URLs worth of content at a time
-            total_splits = len(doc_splits)
-
-            if total_splits > BATCH_SIZE:
-                print(f"Processing {total_splits} document chunks in batches of {BATCH_SIZE}...")
+            pdf_splits = text_splitter.split_documents(load_pdf_documents(pdf_path, uploads_dir, pdf_pages))
+            report_progress("chunked", len(pdf_splits))
+            builder.add_documents(pdf_splits)
 
-                # Create first batch
-                first_batch = doc_splits[:BATCH_SIZE]
-                vectorstore = FAISS.from_documents(first_batch, embed_model)
-                print(f"Batch 1/{(total_splits + BATCH_SIZE - 1) // BATCH_SIZE}: Created initial vectorstore with {len(first_batch)} chunks")
+        vectorstore = builder.build()
+        if vectorstore is None:
+            print("No documents to index - vectorstore not created")
+            return
+        print(f"✅ Indexed {builder.chunks_added} chunks")
 
-                # Process remaining batches and merge
-                for i in range(BATCH_SIZE, total_splits, BATCH_SIZE):
-                    batch_num = (i // BATCH_SIZE) + 1
-                    total_batches = (total_splits + BATCH_SIZE - 1) // BATCH_SIZE
-                    batch = doc_splits[i:i+BATCH_SIZE]
-
-                    print(f"Batch {batch_num}/{total_batches}: Processing {len(batch)} chunks...")
-                    batch_vectorstore = FAISS.from_documents(batch, embed_model)
-
-                    vectorstore.merge_from(batch_vectorstore)
-                    print(f"Batch {batch_num}/{total_batches}: Merged into main vectorstore")
-
-                print(f"✅ All {total_batches} batches processed and merged successfully!")
-            else:
-                # If small enough, process all at once
-                print(f"Processing {total_splits} document chunks (small batch, no splitting needed)...")
-                vectorstore = FAISS.from_documents(doc_splits, embed_model)
-
-            # Save the documents and embeddings
-            vectorstore.save_local(vectorstore_path)
+        # Save the documents and embeddings, with the record of which chunks belong to which page, so the next
+        # website re-index is incremental
+        save_index(vectorstore, IndexManifest(manifest_path).rebuild_from_vectorstore(vectorstore, page_hashes, SITEMAP_LASTMOD))
 
     else:
         if website_only:
-            # Website-only mode: Re-index website and overwrite existing vectorstore
-            print("Website-only mode: Re-indexing website content only")
+            # Website-only mode: Incremental re-index, only new, changed and removed pages touch the existing vectorstore
+            print("Website-only mode: Re-indexing website content only (incremental)")
+            vectorstore = FAISS.load_local(vectorstore_path, embed_model, allow_dangerous_deserialization=True)
+            manifest = IndexManifest(manifest_path)
+            if not len(manifest):
+                # first incremental run on this vectorstore: attribute its existing chunks to their pages
+                manifest.rebuild_from_vectorstore(vectorstore)
 
             docs_list = []
+            remove_missing = True
             if use_sitemap:
-                # Sitemap mode: Load all URLs from sitemap directly
-                print("Sitemap mode: Loading URLs from sitemap")
-                docs_list = load_documents_from_urls(URLS)
+                # Sitemap mode: pages whose <lastmod> did not change since they were indexed are not fetched at all
+                for batch_urls in sitemap_batches(200):
+                    changed_urls = [url for url in batch_urls if not manifest.unchanged_since(url, SITEMAP_LASTMOD.get(url))]
+                    print(f"Sitemap mode: {len(batch_urls) - len(changed_urls)} URLs unchanged since their lastmod, loading {len(changed_urls)}")
+                    if changed_urls:
+                        docs_list.extend(load_documents_from_urls(changed_urls))
+                current_urls = set(URLS)
             elif INDEX_MODE == "custom_urls":
                 # Custom URLs mode: Load ONLY the specified URLs (no recursive crawling)
                 print(f"Custom URLs mode: Loading {len(URLS)} specific URLs (no recursive crawling)")
                 docs_list = load_documents_from_urls(URLS, extractor=bs4_extractor)
+                current_urls = {url.strip() for url in URLS if url.strip()}
             else:
                 # Full website mode: Recursive crawling from homepage
                 print(f"Full website mode: Recursive crawling with depth={depth}")
-                for url in URLS:
-                    url = url.strip()
-                    if not url: continue
-                    print(f"Loading URL: {url}")
-                    loader = RecursiveUrlLoader(url, max_depth=depth, extractor=bs4_extractor, timeout=None,  continue_on_failure=False)
-                    docs_list.extend(loader.load())
+                # every page the crawler found is still on the site, even if it failed to load this time; removals
+                # are only trusted when the crawl was not cut short by its budget
+                docs_list, current_urls, remove_missing = crawl_website(URLS, depth)
 
             text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
                 chunk_size=500, chunk_overlap=100
             )
 
-            # Filter HTML documents only if using recursive crawling
-            # For custom URLs and sitemap, content is already clean
-            if use_sitemap or INDEX_MODE == "custom_urls":
-                text_docs_list = docs_list
+            if update_website_index(vectorstore, docs_list, current_urls, manifest, text_splitter, SITEMAP_LASTMOD, remove_missing):
+                # the manifest lists the chunk ids of this index: both are written or neither is
+                save_index(vectorstore, manifest)
+                print(f"Saved updated vectorstore to {vectorstore_path}")
             else:
-                # filter out rubbish files from recursive crawling
-                text_docs_list = [doc for doc in docs_list if 'text/html' in doc.metadata['content_type']]
-
-            doc_splits = text_splitter.split_documents(text_docs_list)
-
-            # BATCH PROCESSING: Split into smaller batches to avoid token limits
-            BATCH_SIZE = 30  # Process 30 URLs worth of content at a time
-            total_splits = len(doc_splits)
-
-            if total_splits > BATCH_SIZE:
-                print(f"Re-indexing: Processing {total_splits} document chunks in batches of {BATCH_SIZE}...")
-
-                # Create first batch
-                first_batch = doc_splits[:BATCH_SIZE]
-                vectorstore = FAISS.from_documents(first_batch, embed_model)
-                print(f"Batch 1/{(total_splits + BATCH_SIZE - 1) // BATCH_SIZE}: Created initial vectorstore with {len(first_batch)} chunks")
-
-                # Process remaining batches and merge
-                for i in range(BATCH_SIZE, total_splits, BATCH_SIZE):
-                    batch_num = (i // BATCH_SIZE) + 1
-                    total_batches = (total_splits + BATCH_SIZE - 1) // BATCH_SIZE
-                    batch = doc_splits[i:i+BATCH_SIZE]
-
-                    print(f"Batch {batch_num}/{total_batches}: Processing {len(batch)} chunks...")
-                    batch_vectorstore = FAISS.from_documents(batch, embed_model)
-
-                    vectorstore.merge_from(batch_vectorstore)
-                    print(f"Batch {batch_num}/{total_batches}: Merged into main vectorstore")
-
-                print(f"✅ All {total_batches} batches processed and merged successfully!")
-            else:
-                # If small enough, process all at once
-                print(f"Re-indexing: Processing {total_splits} document chunks (small batch, no splitting needed)...")
-                vectorstore = FAISS.from_documents(doc_splits, embed_model)
-
-            vectorstore.save_local(vectorstore_path)
+                print("Website unchanged - vectorstore not rewritten")
+                manifest.save()
         else:
             # PDF mode: Load existing vectorstore and merge PDFs
             print("PDF mode: Loading existing vectorstore and adding PDFs")
@@ -375,7 +416,7 @@ def create_vectorstore(mode=None, depth=100, website_only=False, use_sitemap=Fal
 
             # load faq document(s)
             pdf_path = os.path.join(ROOT_DIR, CLIENT_NAME, PDF_FILE)
-            pdf_docs_list = load_pdf_documents(pdf_path, uploads_dir)
+            pdf_docs_list = load_pdf_documents(pdf_path, uploads_dir, pdf_pages)
             print(f"Loaded {len(pdf_docs_list)} PDF documents (pages)")
 
             if len(pdf_docs_list) > 0:
@@ -384,19 +425,18 @@ def create_vectorstore(mode=None, depth=100, website_only=False, use_sitemap=Fal
                         chunk_size=500, chunk_overlap=100
                     )
                 doc_splits = text_splitter.split_documents(pdf_docs_list)
+                report_progress("chunked", len(doc_splits))
                 print(f"Split into {len(doc_splits)} chunks")
 
                 if len(doc_splits) > 0:
-                    # Create a FAQ vectorstore
-                    faq_vectorstore = FAISS.from_documents(doc_splits, embed_model)
-                    print(f"Created new vectorstore with {len(doc_splits)} chunks")
-
-                    # merge faq vectorstore with og vectorstore
-                    vectorstore.merge_from(faq_vectorstore)
-                    print("Merged PDF vectorstore with existing vectorstore")
+                    # embed the PDF chunks straight into the existing index
+                    builder = new_index_builder(vectorstore)
+                    builder.add_documents(doc_splits)
+                    builder.build()
+                    print(f"Added {len(doc_splits)} PDF chunks to the existing vectorstore")
 
                     # Save the documents and embeddings
-                    vectorstore.save_local(vectorstore_path)
+                    save_index(vectorstore)
                     print(f"Saved updated vectorstore to {vectorstore_path}")
                 else:
                     print("No chunks to add - skipping merge")
@@ -404,48 +444,85 @@ def create_vectorstore(mode=None, depth=100, website_only=False, use_sitemap=Fal
                 print("No PDF documents found - skipping merge")
 
 
-if __name__ == "__main__":
+def run_setup(client: str, website_only: bool = False, urls: list = None, sitemap: str = None,
+              include: list = None, exclude: list = None, progress=None):
+    """
+    Run an indexing job for a client: FAQ embeddings and PDFs (unless website_only), and the website vectorstore
+    from the sitemap, the given URLs, or a crawl of the configured URL.
+
+    progress: optional callback progress(stage, count), called as the pipeline advances. It may raise to cancel the run.
+    """
+    global SITEMAP_ENTRIES
+    print(f"Client: {client}, Website Only: {website_only}, Custom URLs: {urls}, Sitemap: {sitemap}")
+    configure(client, custom_urls=urls, sitemap_url=sitemap, progress=progress)
+
     # Extract URLs from sitemap if sitemap mode is enabled
     use_sitemap_mode = False
-    if sitemap_url:
-        print(f"Extracting URLs from sitemap: {sitemap_url}")
-        sitemap_urls = extract_urls_from_sitemap(sitemap_url)
-        if sitemap_urls:
-            URLS = sitemap_urls
-            use_sitemap_mode = True
-            print(f"Will index {len(URLS)} URLs from sitemap")
-        else:
-            print("Failed to extract URLs from sitemap, aborting...")
-            sys.exit(1)
+    if sitemap:
+        print(f"Extracting URLs from sitemap: {sitemap}")
+        sitemap_entries = iter_sitemap(sitemap, include=include, exclude=exclude)
+        first_entry = next(sitemap_entries, None)
+        if not first_entry:
+            raise ValueError(f"Failed to extract URLs from sitemap {sitemap}")
+        # the rest of the sitemap tree is read while the first batches are indexed
+        SITEMAP_ENTRIES = itertools.chain([first_entry], sitemap_entries)
+        use_sitemap_mode = True
 
     # Load FAQ data on startup (skip if website-only mode)
-    if not index_website_only:
+    pdf_pages = None
+    if not website_only:
         # Construct paths
         pdf_path = os.path.join(ROOT_DIR, CLIENT_NAME, PDF_FILE)
         embeddings_path = os.path.join(ROOT_DIR, CLIENT_NAME, EMBEDDINGS_FILE)
         faq_json_path = os.path.join(ROOT_DIR, CLIENT_NAME, FAQ_JSON_FILE)
-        
-        # Force regeneration of FAQ data to include new uploads
-        if os.path.exists(faq_json_path):
-            os.remove(faq_json_path)
-            print(f"Removed existing FAQ JSON: {faq_json_path}")
-        if os.path.exists(embeddings_path):
-            os.remove(embeddings_path)
-            print(f"Removed existing Embeddings: {embeddings_path}")
 
+        # Every PDF is extracted once, in parallel, and shared by the FAQ parser and the RAG loader
+        pdf_pages = extract_pdf_pages(list_pdf_paths(pdf_path, uploads_dir))
+
+        # Only new or changed PDFs are parsed and embedded, deleted PDFs drop out of the FAQ set.
+        # Also precomputes each FAQ's related-FAQ list used for option clicks.
         search_obj = SearchNode(pdf_path, embeddings_path, faq_json_path, uploads_dir)
-        search_obj.load_faq_data()
+        search_obj.refresh_faq_data(pdf_pages=pdf_pages)
         print("Created FAQ Embeddings for LLM-free journey ---------------------")
 
-    # create vectorstore for RAG
-    create_vectorstore(depth=1, website_only=index_website_only, use_sitemap=use_sitemap_mode)
+    # create vectorstore for RAG; a full-website crawl follows links CRAWL_MAX_DEPTH levels deep, within the page/MB budgets
+    crawl_depth = int(helper.load_application_properties().get("CRAWL_MAX_DEPTH", 10))
+    create_vectorstore(depth=crawl_depth, website_only=website_only, use_sitemap=use_sitemap_mode, pdf_pages=pdf_pages)
 
     if use_sitemap_mode:
         print("Created Vectorstore from sitemap URLs ----------------")
         logger.info("Setup complete - Indexed content from sitemap")
-    elif index_website_only:
+    elif website_only:
         print("Created Vectorstore for website content only ----------------")
         logger.info("Setup complete - Re-indexed website content")
     else:
         print("Created Vectorstore for RAG agent (PDFs + Website) ----------------")
         logger.info("Setup complete - Created Knowledge store with FAQs and Website data")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse company name from terminal.")
+    parser.add_argument('-n', '--name', type=str, required=True, help='Name of the company')
+    parser.add_argument('-w', '--website', action='store_true', help='Index website only (skip PDFs)')
+    parser.add_argument('-u', '--urls', type=str, help='Comma-separated list of URLs to index')
+    parser.add_argument('-s', '--sitemap', type=str, help='Sitemap XML URL to extract and index URLs from')
+    parser.add_argument('--include', type=str, help='Comma-separated regexes, index only sitemap URLs matching one of them')
+    parser.add_argument('--exclude', type=str, help='Comma-separated regexes, skip sitemap URLs matching any of them')
+    args = parser.parse_args(argv)
+
+    try:
+        run_setup(
+            args.name,
+            website_only=args.website,
+            urls=args.urls.split(',') if args.urls else None,
+            sitemap=args.sitemap,
+            include=args.include.split(',') if args.include else None,
+            exclude=args.exclude.split(',') if args.exclude else None,
+        )
+    except ValueError as e:
+        print(f"{e}, aborting...")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,6 @@ import sys
 import os
 sys.path.append(os.getcwd())
 
-import requests
-from bs4 import BeautifulSoup
 import configparser
 import yaml, json
 from dotenv import load_dotenv
@@ -26,6 +24,8 @@ from langchain_openai import ChatOpenAI
 # from src.all_prompts import job_params_template
 from utils.logger_config import logger
 import utils.helper as helper
+from src.tools.career_listings import get_career_listings
+from src.tools.job_shortlist import shortlist_jobs, encode_jobs_table, rehydrate_jobs
 
 load_dotenv()
 
@@ -34,13 +34,11 @@ class OverallState(MessagesState):
     jobs : List
 
 class JobItem(BaseModel):
-    title: str = Field(description="Job title")
-    location: str = Field(description="Job location")
-    link: str = Field(description="URL for job application")
+    job_id: str = Field(description="Id of the job in the available jobs table, e.g. J3")
 
 class Response_format(BaseModel):
     response: str = Field(description="Conversational reply to the user's question. Do not provide any direct job listings. Provide in HTML format and dont use <p> tags. Wrap whole answer inside single <div> tag")
-    filtered_jobs: List[JobItem] = Field(description="List of filtered jobs, each containing 'title', 'location', and 'link'.")
+    filtered_jobs: List[JobItem] = Field(description="List of filtered jobs, each given by its 'job_id' from the available jobs table.")
     reasoning: str = Field(description="Your reasoning for giving this answer and whether you have followed the guidelines.")
 
 
@@ -52,6 +50,9 @@ class CareerToolNode:
         self.location = ""
         self.filtered_jobs =[]
         self.url = client_properties.get('CAREER_URL')
+        # starts the background refresh, so listings are usually in memory before the first career question
+        self.listings = get_career_listings(client_properties)
+        self.shortlist_size = int(client_properties.get("CAREER_SHORTLIST_SIZE", 15))
         self.llm = llm
         self.all_prompts = all_prompts
         self.tools = [self.extract_job_params]
@@ -78,87 +79,27 @@ class CareerToolNode:
 
     def extract_job_params(self) -> List:
         """
-        This node filters the job based on the jobtype and location 
+        Current job listings as title/location/link dicts.
 
-        args:
-            jobtype, location
-        
-        Returns: 
-            filtered jobs based on the jobtype and location
-        
+        Served from the tenant's career listings cache (src/tools/career_listings.py), which is refreshed in the
+        background, so the career flow only waits on the careers site before the very first fetch completes.
         """
-        try:
-            response = requests.get(
-                self.url,
-                verify=False,
-                timeout=30
-                )
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, "lxml")
-            job_elements = soup.find_all('li', class_='job-info')
-                
-            jobs = []
-            for job_element in job_elements:
-                # extract job title
-                title_element = job_element.find('h6', class_='fnt-lg job-title__heading')
-                title = title_element.text.strip() if title_element else 'N/A'
-
-                # extract job location
-                location_element = job_element.find('span', class_='job-location')
-                location = location_element.text.strip() if location_element else 'N/A'
-
-                # extract the application link
-                link_element = job_element.find('a')
-                link = link_element['href'].strip() if link_element else 'N/A'
-
-                #jobs.append(f"Title: {title}\nLocation: {loc}\nApply here: {link}\n")
-                #jobs.append(f"<b><i>Title</b></i>: {title}<br> <b><i>Location</b></i>: {Location}<br> <b><i>Apply here</b></i>: <a href='{link}' target='_blank' rel='noopener noreferrer'>Apply</a>")
-                jobs.append({
-                            'title': title,
-                            'location': location,
-                            'link': link
-                        })
-
-            return jobs
-
-            # output = self.filtering_llm.invoke({'jobs' : jobs, 'jobtype' : jobtype, 'location': location })
-            # self.filtered_jobs = output.get("filtered_jobs", [])
-            # print(self.filtered_jobs)
-            # return {
-            #     'messages': [
-            #         ToolMessage(
-            #             content=output,  # Convert output to string if needed
-            #             tool_call_id='job_search',  # Add this if ToolMessage requires it
-            #             tool_name="extract_job_params"
-            #         )
-            #     ]
-            # }
-
-        except requests.RequestException as e:
-            logger.exception(f"Career request at _run_search_jobs() failed with exception: {e}")
-            return None
-            # return {
-            #     'messages': [
-            #         ToolMessage(
-            #             content='Oops, I dont have the job list right now. Try again later',
-            #             tool_call_id='job_search_error',
-            #             tool_name="extract_job_params"
-            #         )
-            #     ]
-            # }
+        return [job._asdict() for job in self.listings.jobs()]
 
     def _run_search_jobs(self, state):
         messages = state['messages']
         last_message = messages[-1]
 
 
-        jobs = self.extract_job_params()
-        model_response = self.career_llm.invoke({'chat_history': get_buffer_string(messages[-10:]), 'jobs': jobs})
+        # shortlist locally and send a compact id | title | location table; links are looked up by id afterwards
+        jobs = self.listings.jobs()
+        user_messages = [message.content for message in messages[-10:] if isinstance(message, HumanMessage)]
+        shortlist = shortlist_jobs(jobs, user_messages, limit=self.shortlist_size)
+        model_response = self.career_llm.invoke({'chat_history': get_buffer_string(messages[-10:]), 'jobs': encode_jobs_table(shortlist, jobs)})
 
         output = model_response
         response = output.response
-        filtered_jobs = output.filtered_jobs
+        filtered_jobs = rehydrate_jobs([job.job_id for job in output.filtered_jobs], shortlist)
         formatted_filtered_jobs = []
         for job in filtered_jobs:
             job_html = (
@@ -204,7 +145,7 @@ class CareerToolNode:
         #     return {'messages': [AIMessage(content="Sorry, I encountered an error.")]}
     
 
-    def build_graph(self):
+    def build_graph(self, checkpointer=None):
         graph_builder = StateGraph(OverallState)
 
         #add nodes
@@ -216,9 +157,8 @@ class CareerToolNode:
         #graph_builder.add_conditional_edges("job_search", tools_condition)
         graph_builder.add_edge( "job_search", END)
 
-        memory = MemorySaver()
-
-        graph = graph_builder.compile(checkpointer= memory)
+        # runs on the main graph's checkpointer; the standalone demo below passes its own
+        graph = graph_builder.compile(checkpointer=checkpointer)
         
         return graph
 
@@ -255,7 +195,7 @@ if __name__ == "__main__":
     all_prompts = _load_prompts(client_properties)
 
     career_subgraph = CareerToolNode(llm, client_properties, all_prompts)
-    graph = career_subgraph.build_graph()
+    graph = career_subgraph.build_graph(checkpointer=MemorySaver())
     
     config = {"configurable": {"thread_id": "1"}}
 
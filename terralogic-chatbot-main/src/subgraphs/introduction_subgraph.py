@@ -23,6 +23,7 @@ import configparser
 sys.path.append(os.getcwd())
 load_dotenv()
 from src.tools.email_Validator import validate_email_address
+from src.nodes import slot_extractor
 
 
 from pydantic import BaseModel, Field
@@ -40,6 +41,8 @@ class OverallState(MessagesState):
     email: str
     mode: str
     chatMessageOptions: List[str]
+    # set to "respond" by slot_prepass when it answered the turn itself
+    prepass: str
 
 class ServiceInformationSubgraph:
     def __init__(self, llm, decision_llm, all_prompts):
@@ -63,11 +66,14 @@ class ServiceInformationSubgraph:
             Dict[str, Optional[str]]: A dictionary with string keys and values 
         """
 
-        prompt = PromptTemplate(template = self.all_prompts["extract_name_email_template"], input_variables=["text"])
-        chain = prompt | self.llm | JsonOutputParser()
+        # a single well-formed address needs no LLM call
+        user_email = slot_extractor.extract_email(user_input)
+        if user_email is None:
+            prompt = PromptTemplate(template = self.all_prompts["extract_name_email_template"], input_variables=["text"])
+            chain = prompt | self.llm | JsonOutputParser()
 
-        decision = chain.invoke({"text": user_input})
-        user_email = decision["email"] if decision["email"] != "" else None
+            decision = chain.invoke({"text": user_input})
+            user_email = decision["email"] if decision["email"] != "" else None
         email_validation_reason = None
 
         if user_email is not None:
@@ -78,6 +84,30 @@ class ServiceInformationSubgraph:
         return {"user_email": user_email, "email_validation_reason": email_validation_reason}
 
 
+    # Deterministic pre-pass
+    def slot_prepass(self, state: OverallState):
+        """
+        Answers the turn from a template, without an LLM call, only when the latest user message introduces the user
+        by name ("my name is ...", "I'm ...") and carries one valid email address. Everything else, including a name
+        or an email on its own, goes through the LLM tool loop and its name validation.
+        """
+        if not isinstance(state["messages"][-1], HumanMessage):
+            return {"prepass": "llm"}
+        user_name, user_email = slot_extractor.extract_slots(state["messages"][-1].content)
+        if user_name is None or user_email is None:
+            return {"prepass": "llm"}
+        is_valid, _ = validate_email_address(user_email)
+        if not is_valid:
+            # let the LLM explain what is wrong with the address
+            return {"prepass": "llm"}
+
+        response = AIMessage(content=self.all_prompts.get("intro_complete_template", "Thanks, {name}! Please choose one of the options below.").format(name=user_name))
+        chatMessageOptions=["Start a project", "Looking for a job", "Explore services"]
+        return {"messages": [response], "name": user_name, "email": user_email, "mode": "answering", "chatMessageOptions": chatMessageOptions, "prepass": "respond"}
+
+    def route_after_prepass(self, state: OverallState):
+        return "respond" if state.get("prepass") == "respond" else "llm"
+
     # Introduction Node
     def introduction_node(self, state: OverallState):
         """
@@ -145,7 +175,7 @@ class ServiceInformationSubgraph:
             return "continue"
 
 
-    def build_graph(self):
+    def build_graph(self, checkpointer=None):
 
         graph_builder = StateGraph(OverallState)
 
@@ -154,8 +184,19 @@ class ServiceInformationSubgraph:
         graph_builder.add_node("respond", self.respond)
         graph_builder.add_node("tools", ToolNode(self.tools))
 
+        graph_builder.add_node("slot_prepass", self.slot_prepass)
+
         # build edges
-        graph_builder.set_entry_point("introduction_node")
+        # confident name/email turns are answered by the pre-pass; everything else goes through the LLM tool loop
+        graph_builder.set_entry_point("slot_prepass")
+        graph_builder.add_conditional_edges(
+            "slot_prepass",
+            self.route_after_prepass,
+            {
+                "respond": END,
+                "llm": "introduction_node",
+            },
+        )
         # We now add a conditional edge
         graph_builder.add_conditional_edges(
             "introduction_node",
@@ -169,11 +210,10 @@ class ServiceInformationSubgraph:
         graph_builder.add_edge("tools", "introduction_node")
         graph_builder.add_edge("respond", END)
 
-        # memory object
-        memory = MemorySaver()
-
         # compile graph
-        graph = graph_builder.compile(checkpointer=memory)
+        # no checkpointer of its own: inside the main graph it uses the main graph's one (with 'sync'/'async' durability
+        # that writes a namespace per turn, pruned by utils/state_retention.py). Pass a MemorySaver to run it standalone.
+        graph = graph_builder.compile(checkpointer=checkpointer)
         return graph    
 
 
@@ -204,7 +244,7 @@ if __name__ == "__main__":
 
     
     introduction_subgraph = ServiceInformationSubgraph(llm, decision_llm, all_prompts)
-    graph = introduction_subgraph.build_graph()
+    graph = introduction_subgraph.build_graph(checkpointer=MemorySaver())
     
     config = {"configurable": {"thread_id": "1"}}
 
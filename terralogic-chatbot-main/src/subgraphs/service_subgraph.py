@@ -3,6 +3,7 @@ import os
 sys.path.append(os.getcwd())
 import pprint
 import uuid
+import time
 
 from langgraph.graph import START, MessagesState, StateGraph, END
 from langgraph.prebuilt import ToolNode
@@ -55,7 +56,7 @@ class AgentState(TypedDict):
     jobs : List
 
 class FAQLLMSubgraph:
-    def __init__(self, llm, decision_llm, embeddings, all_prompts, client_properties, type='projects'):
+    def __init__(self, llm, decision_llm, embeddings, all_prompts, client_properties, type='projects', vectorstore=None):
         self.llm = llm
         self.decision_llm = decision_llm
         self.embeddings = embeddings
@@ -75,13 +76,20 @@ class FAQLLMSubgraph:
         self.FAQ_SEARCH_THRESH = float(client_properties["FAQ_SEARCH_THRESH"]) 
 
 
+        # load durations, reported in the tenant's startup timing breakdown
+        self.timings = {}
+
         # initialize LLM, search, career nodes
-        self.llm_obj = LLMNode(self.llm, self.embeddings, vectorstore_path, URL, all_prompts, self.type)
+        start = time.perf_counter()
+        self.llm_obj = LLMNode(self.llm, self.embeddings, vectorstore_path, URL, all_prompts, self.type, vectorstore=vectorstore)
+        self.timings[f"{self.type}_rag_init"] = time.perf_counter() - start
 
         # only services flow requires llm_free. 
         if self.type == "services":
+            start = time.perf_counter()
             self.search_obj = SearchNode(PDF_PATH, EMBEDDINGS_PATH, FAQ_JSON_PATH)
             self.search_obj.load_faq_data()      # load the faq data on startup
+            self.timings["faq_load"] = time.perf_counter() - start
 
     # condition and routing functions
     def llm_free(self, state):
@@ -89,6 +97,14 @@ class FAQLLMSubgraph:
         top_n = 7
         messages = state['messages']
         question = messages[-1].content
+
+        # fast path: a clicked option is an exact FAQ question. Answer it with its precomputed related FAQs.
+        faq_id = self.search_obj.lookup_faq(question)
+        if faq_id is not None:
+            options = [faq['question'] for faq in self.search_obj.related_faqs(faq_id, top_n=top_n - 1)]
+            ai_response = AIMessage(content=self.search_obj.faqs[faq_id]['answer'])
+            return {'messages': [ai_response], 'score': 1.0, 'options': options, "chatMessageOptions": [], 'jobs': []}
+
         top_faqs, top_scores = self.search_obj.faq_search(question, top_n=top_n, mode='cosine')
         options = []                    # consists top 4 QAs. Top 1 is given as answer, rest 3 questions as options
         for faq in top_faqs:
@@ -112,7 +128,7 @@ class FAQLLMSubgraph:
 
 
 
-    def faq_llm_career_build_graph(self):
+    def faq_llm_career_build_graph(self, checkpointer=None):
         workflow = StateGraph(AgentState)
 
         # add llm_agent. This is needed for both services and projects
@@ -143,8 +159,8 @@ class FAQLLMSubgraph:
 
         workflow.add_edge("llm_agent", END)
 
-        memory = MemorySaver()
-        graph = workflow.compile(checkpointer=memory)
+        # checkpointer=None: the main graph's checkpointer is used, as for the introduction subgraph
+        graph = workflow.compile(checkpointer=checkpointer)
         logger.info("FAQ LLM SubGraph built and compiled")
         return graph
 
@@ -174,7 +190,7 @@ if __name__ == "__main__":
     client_properties = _load_properties(client)
     all_prompts = _load_prompts(client_properties)
     faq_career_node = FAQLLMSubgraph(llm, decision_llm, embeddings, all_prompts, client_properties)
-    graph = faq_career_node.faq_llm_career_build_graph()
+    graph = faq_career_node.faq_llm_career_build_graph(checkpointer=MemorySaver())
     session_id = str(uuid.uuid4())
     config = {"configurable": {"thread_id": session_id}}
     # testing the graph
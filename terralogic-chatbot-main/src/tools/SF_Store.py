@@ -1,6 +1,6 @@
-import requests
 import json
 from utils.logger_config import logger
+import utils.http_client as http_client
 import os
 
 # Salesforce Web-to-Lead Endpoint
@@ -69,7 +69,7 @@ def send_project_enquiry_to_salesforce(enquiry: dict):
         }
 
         # --- Send request ---
-        response = requests.post(SF_URL, data=data, timeout=10)
+        response = http_client.post(SF_URL, data=data, timeout=10)
 
         if response.status_code == 200:
             if "Thank" in response.text or "success" in response.text.lower():
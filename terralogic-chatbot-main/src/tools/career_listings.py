@@ -0,0 +1,183 @@
+import os
+import sys
+sys.path.append(os.getcwd())
+import json
+import time
+import threading
+from collections import namedtuple
+from email.utils import formatdate
+
+from bs4 import BeautifulSoup
+
+from utils.logger_config import logger
+import utils.helper as helper
+import utils.http_client as http_client
+
+JobRecord = namedtuple("JobRecord", ["title", "location", "link"])
+
+# one cache per careers URL, shared by every tenant that points to it
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def parse_job_listings(content):
+    """
+    Parse the careers page into compact JobRecords.
+    """
+    soup = BeautifulSoup(content, "lxml")
+    jobs = []
+    for job_element in soup.find_all('li', class_='job-info'):
+        # extract job title
+        title_element = job_element.find('h6', class_='fnt-lg job-title__heading')
+        title = " ".join(title_element.text.split()) if title_element else 'N/A'
+
+        # extract job location
+        location_element = job_element.find('span', class_='job-location')
+        location = " ".join(location_element.text.split()) if location_element else 'N/A'
+
+        # extract the application link
+        link_element = job_element.find('a')
+        link = link_element['href'].strip() if link_element and link_element.get('href') else 'N/A'
+
+        jobs.append(JobRecord(title, location, link))
+    return tuple(jobs)
+
+
+class CareerListingsCache:
+    """
+    In-memory snapshot of a careers page, refreshed in the background.
+
+    - A daemon thread re-fetches the page every refresh_seconds with If-None-Match / If-Modified-Since, so an unchanged
+      page costs a 304 and no parsing.
+    - Readers do not wait on the network: jobs() returns the current snapshot and, when it is older than refresh_seconds,
+      triggers a background refresh (stale-while-revalidate). The one exception is a cache with nothing loaded yet (no
+      snapshot file, first fetch still running): readers then wait for that first fetch, at most timeout seconds.
+    - Failed fetches keep the last good snapshot, which is also saved to snapshot_path so a restart while the careers
+      site is down still has listings.
+    """
+
+    def __init__(self, url, refresh_seconds=900, timeout=10, snapshot_path=None):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.timeout = timeout
+        self.snapshot_path = snapshot_path
+        self._jobs = ()
+        self._etag = None
+        self._last_modified = None
+        self._fetched_at = 0.0
+        self._refresh_lock = threading.Lock()
+        # set once the first fetch finished, successfully or not
+        self._first_fetch_done = threading.Event()
+        self._thread = None
+        self._load_snapshot()
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._jobs = tuple(JobRecord(*job) for job in snapshot["jobs"])
+            logger.info(f"Career listings: {len(self._jobs)} jobs loaded from snapshot {self.snapshot_path}")
+        except Exception as e:
+            logger.warning(f"Career listings: could not read snapshot {self.snapshot_path}: {e}")
+
+    def _save_snapshot(self, jobs):
+        if not self.snapshot_path:
+            return
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"url": self.url, "saved_at": formatdate(usegmt=True), "jobs": [list(job) for job in jobs]}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def refresh(self):
+        """
+        Conditional GET of the careers page. Returns True when the snapshot is current (200 or 304).
+        Concurrent calls collapse into one fetch.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            headers = {}
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+
+            start = time.perf_counter()
+            response = http_client.get(self.url, headers=headers, verify=False, timeout=self.timeout)
+            if response.status_code == 304:
+                self._fetched_at = time.monotonic()
+                logger.info(f"Career listings: {self.url} not modified ({time.perf_counter() - start:.2f}s)")
+                return True
+            response.raise_for_status()
+
+            jobs = parse_job_listings(response.content)
+            # an empty parse of a page that used to list jobs is more likely a layout/outage page than zero openings
+            if not jobs and self._jobs:
+                logger.warning(f"Career listings: {self.url} returned no jobs, keeping the last good snapshot")
+                return False
+
+            self._jobs = jobs
+            self._etag = response.headers.get("ETag")
+            self._last_modified = response.headers.get("Last-Modified")
+            self._fetched_at = time.monotonic()
+            self._save_snapshot(jobs)
+            logger.info(f"Career listings: {len(jobs)} jobs refreshed from {self.url} ({time.perf_counter() - start:.2f}s)")
+            return True
+        except Exception as e:
+            logger.warning(f"Career listings: refresh of {self.url} failed, serving the last good snapshot: {e}")
+            return False
+        finally:
+            self._first_fetch_done.set()
+            self._refresh_lock.release()
+
+    def _refresh_loop(self):
+        while True:
+            self.refresh()
+            time.sleep(self.refresh_seconds)
+
+    def start(self):
+        """
+        Start the background refresh thread (once). The first fetch happens on that thread.
+        """
+        with _caches_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refresh_loop, name="career-listings-refresh", daemon=True)
+                self._thread.start()
+        return self
+
+    def is_stale(self):
+        return time.monotonic() - self._fetched_at > self.refresh_seconds
+
+    def jobs(self):
+        """
+        Current job listings, from memory. Only blocks, for at most timeout seconds, when nothing has been loaded yet.
+        """
+        if not self._jobs and not self._first_fetch_done.is_set() and self._thread is not None:
+            if not self._first_fetch_done.wait(self.timeout):
+                logger.warning(f"Career listings: first fetch of {self.url} still running after {self.timeout}s, no jobs to show yet")
+        if self.is_stale() and not self._refresh_lock.locked():
+            threading.Thread(target=self.refresh, name="career-listings-revalidate", daemon=True).start()
+        return self._jobs
+
+
+def get_career_listings(client_properties):
+    """
+    The shared, started listings cache for a tenant's CAREER_URL.
+    """
+    url = client_properties.get('CAREER_URL')
+    with _caches_lock:
+        cache = _caches.get(url)
+        if cache is None:
+            application_properties = helper.load_application_properties()
+            snapshot_file = client_properties.get("CAREER_SNAPSHOT_FILE")
+            snapshot_path = os.path.join(client_properties["ROOT_DIR"], client_properties["CLIENT_NAME"], snapshot_file) if snapshot_file else None
+            cache = CareerListingsCache(
+                url,
+                refresh_seconds=int(application_properties.get("CAREER_REFRESH_SECONDS", 900)),
+                timeout=float(application_properties.get("CAREER_FETCH_TIMEOUT", 10)),
+                snapshot_path=snapshot_path,
+            )
+            _caches[url] = cache
+    return cache.start()
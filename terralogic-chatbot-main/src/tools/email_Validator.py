@@ -1,10 +1,156 @@
 import re
+import time
 import socket
 import smtplib
+import asyncio
+import threading
+import dns.exception
 import dns.resolver
-from typing import Tuple, Optional
+import dns.asyncresolver
+from typing import List, Tuple, Optional
 from email_validator import validate_email, EmailNotValidError
 
+# bounded DNS waits: per nameserver attempt, and for the whole lookup
+DNS_TIMEOUT_SECONDS = 2.0
+DNS_LIFETIME_SECONDS = 3.0
+# positive answers are cached for the record TTL, clamped to this range
+MIN_POSITIVE_TTL = 300
+MAX_POSITIVE_TTL = 86400
+# domains without MX records, and lookups that failed (timeouts, no nameservers)
+NEGATIVE_TTL = 900
+FAILURE_TTL = 60
+MAX_CACHE_ENTRIES = 10000
+
+# major mailbox providers, accepted without a lookup
+PUBLIC_MAIL_DOMAINS = {
+    "gmail.com", "googlemail.com", "yahoo.com", "yahoo.co.in", "yahoo.co.uk", "ymail.com", "outlook.com", "hotmail.com",
+    "live.com", "msn.com", "icloud.com", "me.com", "mac.com", "aol.com", "protonmail.com", "proton.me", "zoho.com",
+    "zohomail.in", "yandex.com", "gmx.com", "gmx.de", "mail.com", "rediffmail.com", "qq.com", "163.com",
+}
+
+_resolver = dns.resolver.Resolver()
+_resolver.timeout = DNS_TIMEOUT_SECONDS
+_resolver.lifetime = DNS_LIFETIME_SECONDS
+_async_resolver = None
+
+
+class MXCache:
+    """
+    Thread-safe domain -> (mx_hosts, reason) cache with per-entry expiry. An empty host list is a cached negative answer.
+    """
+
+    def __init__(self, max_entries=MAX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, domain):
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry is None:
+                return None
+            expires_at, hosts, reason = entry
+            if expires_at < time.monotonic():
+                del self._entries[domain]
+                return None
+            return hosts, reason
+
+    def set(self, domain, hosts, reason, ttl):
+        with self._lock:
+            if domain not in self._entries and len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                for expired in [key for key, entry in self._entries.items() if entry[0] < now]:
+                    del self._entries[expired]
+                if len(self._entries) >= self.max_entries:
+                    # oldest insertion goes first
+                    del self._entries[next(iter(self._entries))]
+            self._entries[domain] = (time.monotonic() + ttl, hosts, reason)
+
+
+mx_cache = MXCache()
+
+
+def _hosts_from_answer(answer):
+    hosts = [str(record.exchange) for record in sorted(answer, key=lambda record: record.preference)]
+    ttl = min(max(answer.rrset.ttl, MIN_POSITIVE_TTL), MAX_POSITIVE_TTL)
+    return hosts, ttl
+
+
+def resolve_mx(domain: str) -> Tuple[List[str], str]:
+    """
+    MX hosts of a domain, preferred first, through the cache. Returns ([], reason) when the domain has no MX records
+    or the lookup failed within the DNS time budget.
+    """
+    domain = domain.lower().rstrip(".")
+    cached = mx_cache.get(domain)
+    if cached is not None:
+        return cached
+    try:
+        hosts, ttl = _hosts_from_answer(_resolver.resolve(domain, 'MX'))
+        reason = "Valid email"
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+        hosts, reason, ttl = [], "Domain does not have MX records", NEGATIVE_TTL
+    except (dns.exception.Timeout, dns.resolver.NoNameservers) as e:
+        hosts, reason, ttl = [], f"Validation failed: {str(e)}", FAILURE_TTL
+    mx_cache.set(domain, hosts, reason, ttl)
+    return hosts, reason
+
+
+async def resolve_mx_async(domain: str) -> Tuple[List[str], str]:
+    """
+    Non-blocking resolve_mx for async callers; shares the same cache.
+    """
+    global _async_resolver
+    domain = domain.lower().rstrip(".")
+    cached = mx_cache.get(domain)
+    if cached is not None:
+        return cached
+    if _async_resolver is None:
+        _async_resolver = dns.asyncresolver.Resolver()
+        _async_resolver.timeout = DNS_TIMEOUT_SECONDS
+        _async_resolver.lifetime = DNS_LIFETIME_SECONDS
+    try:
+        hosts, ttl = _hosts_from_answer(await _async_resolver.resolve(domain, 'MX'))
+        reason = "Valid email"
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+        hosts, reason, ttl = [], "Domain does not have MX records", NEGATIVE_TTL
+    except (dns.exception.Timeout, dns.resolver.NoNameservers) as e:
+        hosts, reason, ttl = [], f"Validation failed: {str(e)}", FAILURE_TTL
+    mx_cache.set(domain, hosts, reason, ttl)
+    return hosts, reason
+
+
+def _verify_smtp(email: str, mx_record: str) -> Tuple[bool, str]:
+    try:
+        # Connect to SMTP server
+        smtp = smtplib.SMTP(timeout=10)
+        smtp.connect(mx_record)
+        smtp.helo(socket.getfqdn())
+        
+        # Start TLS if available
+        if smtp.has_extn('starttls'):
+            smtp.starttls()
+            smtp.helo(socket.getfqdn())
+        
+        # Try to verify the email
+        smtp_from_address = f"verify@{socket.getfqdn()}"
+        code, message = smtp.verify(email)
+        
+        smtp.quit()
+        
+        if code == 250:
+            return True, "Email address is valid and reachable"
+        elif code == 251:
+            return True, "Email address is valid but user is not local"
+        elif code == 252:
+            return True, "Email address is valid but cannot verify user"
+        else:
+            return False, f"Email verification failed with code {code}: {message}"
+        
+    except (socket.timeout, socket.error, smtplib.SMTPException) as e:
+        return False, f"SMTP connection failed: {str(e)}"
+
+
 def validate_email_address(email: str, verify_smtp: bool = False) -> Tuple[bool, str]:
     """
     Validate an email address by checking format, DNS records, and SMTP connection.
@@ -23,56 +169,47 @@ def validate_email_address(email: str, verify_smtp: bool = False) -> Tuple[bool,
         # Step 2: Split email into local part and domain
         local_part, domain = email.split('@')
         
-        # Step 3: Check DNS MX records
-        try:
-            mx_records = dns.resolver.resolve(domain, 'MX')
-            mx_record = str(mx_records[0].exchange)
-
-            # condition added for cases where SMTP validation 
-            # added as part of gcp vm deployment. based-https://stackoverflow.com/questions/8640129/resolving-gmail-com-mail-server
-            if not verify_smtp:
-                if len(mx_records) > 0:
-                    return True, "Valid email"
-                else:
-                    return False, "Not valid email"
-        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
-            return False, "Domain does not have MX records"
+        # Step 3: Check DNS MX records (cached; major mailbox providers need no lookup)
+        if not verify_smtp and domain.lower() in PUBLIC_MAIL_DOMAINS:
+            return True, "Valid email"
+        mx_records, reason = resolve_mx(domain)
+        if len(mx_records) == 0:
+            return False, reason
+
+        # condition added for cases where SMTP validation 
+        # added as part of gcp vm deployment. based-https://stackoverflow.com/questions/8640129/resolving-gmail-com-mail-server
+        if not verify_smtp:
+            return True, "Valid email"
         
         # Step 4: Verify SMTP connection
-        try:
-            # Connect to SMTP server
-            smtp = smtplib.SMTP(timeout=10)
-            smtp.connect(mx_record)
-            smtp.helo(socket.getfqdn())
-            
-            # Start TLS if available
-            if smtp.has_extn('starttls'):
-                smtp.starttls()
-                smtp.helo(socket.getfqdn())
-            
-            # Try to verify the email
-            smtp_from_address = f"verify@{socket.getfqdn()}"
-            code, message = smtp.verify(email)
-            
-            smtp.quit()
-            
-            if code == 250:
-                return True, "Email address is valid and reachable"
-            elif code == 251:
-                return True, "Email address is valid but user is not local"
-            elif code == 252:
-                return True, "Email address is valid but cannot verify user"
-            else:
-                return False, f"Email verification failed with code {code}: {message}"
-            
-        except (socket.timeout, socket.error, smtplib.SMTPException) as e:
-            return False, f"SMTP connection failed: {str(e)}"
+        return _verify_smtp(email, mx_records[0])
             
     except EmailNotValidError as e:
         return False, f"Invalid email format: {str(e)}"
     except Exception as e:
         return False, f"Validation failed: {str(e)}"
 
+async def validate_email_address_async(email: str, verify_smtp: bool = False) -> Tuple[bool, str]:
+    """
+    Async validate_email_address: the MX lookup awaits the DNS answer instead of blocking the thread.
+    SMTP verification, when requested, runs in a worker thread.
+    """
+    try:
+        validate_email(email, check_deliverability=False)
+        local_part, domain = email.split('@')
+        if not verify_smtp and domain.lower() in PUBLIC_MAIL_DOMAINS:
+            return True, "Valid email"
+        mx_records, reason = await resolve_mx_async(domain)
+        if len(mx_records) == 0:
+            return False, reason
+        if not verify_smtp:
+            return True, "Valid email"
+        return await asyncio.to_thread(_verify_smtp, email, mx_records[0])
+    except EmailNotValidError as e:
+        return False, f"Invalid email format: {str(e)}"
+    except Exception as e:
+        return False, f"Validation failed: {str(e)}"
+
 def main():
     """
     Main function to demonstrate email validation usage.
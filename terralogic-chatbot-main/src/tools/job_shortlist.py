@@ -0,0 +1,83 @@
+import re
+from difflib import SequenceMatcher
+
+# words in career questions that say nothing about the role or place
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "at", "for", "from", "with", "by", "is", "are", "am", "be", "any",
+    "i", "im", "me", "my", "we", "you", "your", "do", "does", "have", "has", "can", "could", "would", "like", "want", "need",
+    "looking", "search", "searching", "find", "show", "list", "tell", "about", "there", "some", "other", "more", "all", "also",
+    "job", "jobs", "role", "roles", "position", "positions", "opening", "openings", "vacancy", "vacancies", "opportunity",
+    "opportunities", "career", "careers", "hiring", "apply", "work", "working", "available", "please", "thanks", "hi", "hello",
+    "what", "which", "where", "how", "yes", "no", "ok", "okay", "location", "locations", "city", "based", "terralogic",
+}
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#.]+")
+# two tokens match when they are this similar (catches typos such as "develper" or "banglore")
+FUZZY_THRESHOLD = 0.82
+
+
+def tokenize(text):
+    return [token.strip(".") for token in TOKEN_PATTERN.findall(text.lower()) if token.strip(".")]
+
+
+def extract_keywords(user_messages):
+    """
+    Role and location keywords from the user's recent messages, most recent message first.
+    """
+    keywords = []
+    for message in reversed(user_messages):
+        for token in tokenize(message):
+            if token not in STOPWORDS and len(token) > 1 and token not in keywords:
+                keywords.append(token)
+    return keywords
+
+
+def _token_similarity(keyword, tokens):
+    best = 0.0
+    for token in tokens:
+        if keyword == token:
+            return 1.0
+        best = max(best, SequenceMatcher(None, keyword, token).ratio())
+    return best if best >= FUZZY_THRESHOLD else 0.0
+
+
+def score_job(job, keywords):
+    title_tokens = tokenize(job.title)
+    location_tokens = tokenize(job.location)
+    return sum(max(_token_similarity(keyword, title_tokens), _token_similarity(keyword, location_tokens)) for keyword in keywords)
+
+
+def shortlist_jobs(jobs, user_messages, limit=15):
+    """
+    Pick up to limit jobs for the career LLM. Returns a list of (job_id, job) in listing order, where job_id is the
+    job's stable position in the full listing ("J1", "J2", ...). Without matching keywords, the first jobs are returned.
+    """
+    indexed = [(f"J{position + 1}", job) for position, job in enumerate(jobs)]
+    keywords = extract_keywords(user_messages)
+    scored = [(score_job(job, keywords), position) for position, (_, job) in enumerate(indexed)] if keywords else []
+    matched = sorted((item for item in scored if item[0] > 0), key=lambda item: (-item[0], item[1]))[:limit]
+    if not matched:
+        return indexed[:limit]
+    return [indexed[position] for _, position in sorted(matched, key=lambda item: item[1])]
+
+
+def encode_jobs_table(shortlist, jobs):
+    """
+    Compact encoding of the shortlist for the prompt: every location on offer, then one "id | title | location" row per job.
+    Links stay out of the prompt; they are looked up by id afterwards.
+    """
+    locations = sorted({location.strip() for job in jobs if job.location.strip() != 'N/A'
+                        for location in re.split(r"[/,&]| and ", job.location) if location.strip()})
+    rows = [f"{job_id} | {job.title} | {job.location}" for job_id, job in shortlist]
+    return (
+        f"All locations: {', '.join(locations)}\n"
+        f"{len(shortlist)} of {len(jobs)} openings, best matches for the conversation:\n"
+        "id | title | location\n" + "\n".join(rows)
+    )
+
+
+def rehydrate_jobs(job_ids, shortlist):
+    """
+    Map job ids chosen by the LLM back to full records (with links). Unknown ids are dropped.
+    """
+    by_id = dict(shortlist)
+    return [by_id[job_id.strip().upper()] for job_id in job_ids if job_id.strip().upper() in by_id]
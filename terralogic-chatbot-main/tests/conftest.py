@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the app reads application_properties.yaml and client_properties.yaml from the working directory
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT_DIR)
+sys.path.insert(0, ROOT_DIR)
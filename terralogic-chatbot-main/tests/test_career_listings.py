@@ -0,0 +1,52 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import src.tools.career_listings as career_listings
+from src.tools.career_listings import CareerListingsCache, JobRecord
+
+CAREERS_PAGE = b"""
+<ul>
+  <li class="job-info"><h6 class="fnt-lg job-title__heading">Python Developer</h6>
+    <span class="job-location">Bangalore</span><a href="https://example.com/jobs/1">Apply</a></li>
+</ul>
+"""
+
+
+def slow_careers_site(monkeypatch, delay, release=None):
+    def get(url, headers=None, verify=True, timeout=None):
+        if release is not None:
+            release.wait(5)
+        time.sleep(delay)
+        return SimpleNamespace(status_code=200, content=CAREERS_PAGE, headers={"ETag": '"v1"'}, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(career_listings.http_client, "get", get)
+
+
+def test_first_read_waits_for_the_initial_fetch(monkeypatch):
+    slow_careers_site(monkeypatch, delay=0.2)
+    cache = CareerListingsCache("https://example.com/careers", timeout=5).start()
+    assert cache.jobs() == (JobRecord("Python Developer", "Bangalore", "https://example.com/jobs/1"),)
+
+
+def test_initial_wait_is_bounded_by_the_fetch_timeout(monkeypatch):
+    release = threading.Event()
+    slow_careers_site(monkeypatch, delay=0, release=release)
+    cache = CareerListingsCache("https://example.com/careers", timeout=0.2).start()
+    start = time.perf_counter()
+    assert cache.jobs() == ()
+    assert time.perf_counter() - start < 1
+    release.set()
+
+
+def test_snapshot_is_served_without_waiting(monkeypatch, tmp_path):
+    release = threading.Event()
+    slow_careers_site(monkeypatch, delay=0, release=release)
+    snapshot_path = str(tmp_path / "careers.json")
+    CareerListingsCache("https://example.com/careers", snapshot_path=snapshot_path)._save_snapshot([JobRecord("Tester", "Remote", "N/A")])
+
+    cache = CareerListingsCache("https://example.com/careers", timeout=5, snapshot_path=snapshot_path).start()
+    start = time.perf_counter()
+    assert cache.jobs() == (JobRecord("Tester", "Remote", "N/A"),)
+    assert time.perf_counter() - start < 1
+    release.set()
@@ -0,0 +1,81 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.graphs.checkpoint_benchmark import CountingSqliteSaver, build_turn_graph, run_benchmark
+from src.graphs.checkpointer import SqliteConnectionPool
+
+
+def test_connections_are_reused(tmp_path):
+    pool = SqliteConnectionPool(str(tmp_path / "state.db"), pool_size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    pool.close()
+
+
+def test_exhausted_pool_times_out(tmp_path):
+    pool = SqliteConnectionPool(str(tmp_path / "state.db"), pool_size=1, busy_timeout_ms=200)
+    held = pool.acquire()
+    start = time.perf_counter()
+    with pytest.raises(sqlite3.OperationalError, match="No free connection"):
+        pool.acquire()
+    assert time.perf_counter() - start < 2
+    # a returned connection serves the next caller
+    pool.release(held)
+    assert pool.acquire() is held
+    pool.close()
+
+
+def test_close_wakes_waiters_and_fails_later_callers(tmp_path):
+    pool = SqliteConnectionPool(str(tmp_path / "state.db"), pool_size=1, busy_timeout_ms=30000)
+    held = pool.acquire()
+    errors = []
+
+    def wait_for_connection():
+        try:
+            pool.acquire()
+        except sqlite3.OperationalError as e:
+            errors.append(str(e))
+
+    waiters = [threading.Thread(target=wait_for_connection) for _ in range(3)]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(0.1)
+    pool.close()
+    for waiter in waiters:
+        waiter.join(5)
+    assert len(errors) == 3 and all("closed" in error for error in errors)
+
+    with pytest.raises(sqlite3.OperationalError, match="closed"):
+        pool.acquire()
+    # checked-out connections are closed when they come back
+    pool.release(held)
+    with pytest.raises(sqlite3.ProgrammingError):
+        held.execute("SELECT 1")
+
+
+def test_exit_durability_writes_one_checkpoint_per_turn():
+    exit_result = run_benchmark("exit", sessions=2, turns=3)
+    sync_result = run_benchmark("sync", sessions=2, turns=3)
+    assert exit_result["puts_per_turn"] == 1 and exit_result["write_puts_per_turn"] == 0
+    assert exit_result["commits_per_turn"] == 1
+    assert sync_result["puts_per_turn"] > exit_result["puts_per_turn"]
+
+
+def test_exit_durability_resumes_from_the_previous_turn(tmp_path):
+    saver = CountingSqliteSaver(str(tmp_path / "state.db"))
+    config = {"configurable": {"thread_id": "session"}}
+    build_turn_graph(saver).invoke({"messages": [("user", "hello")]}, config, durability="exit")
+    saver.pool.close()
+
+    # a new worker process reads the session back from the database
+    saver = CountingSqliteSaver(str(tmp_path / "state.db"))
+    output = build_turn_graph(saver).invoke({"messages": [("user", "again")]}, config, durability="exit")
+    assert output["email"] == "alex@example.com"
+    assert [message.content for message in output["messages"] if message.type == "human"] == ["hello", "again"]
+    saver.pool.close()
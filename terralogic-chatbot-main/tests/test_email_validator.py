@@ -0,0 +1,132 @@
+import asyncio
+from types import SimpleNamespace
+
+import dns.exception
+import dns.resolver
+import pytest
+
+import src.tools.email_Validator as email_validator
+from src.tools.email_Validator import MXCache
+
+
+class MXAnswer(list):
+    def __init__(self, records, ttl):
+        super().__init__(SimpleNamespace(preference=preference, exchange=exchange) for preference, exchange in records)
+        self.rrset = SimpleNamespace(ttl=ttl)
+
+
+class FakeResolver:
+    """
+    Answers MX queries from a dict: domain -> MXAnswer, or the exception to raise. Counts the lookups.
+    """
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.lookups = []
+
+    def resolve(self, domain, record_type):
+        self.lookups.append(domain)
+        answer = self.answers[domain]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class FakeAsyncResolver(FakeResolver):
+    async def resolve(self, domain, record_type):
+        return FakeResolver.resolve(self, domain, record_type)
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    resolver = FakeResolver({
+        "example.com": MXAnswer([(20, "mx2.example.com."), (10, "mx1.example.com.")], ttl=60),
+        "nomx.com": dns.resolver.NoAnswer(),
+        "slow.com": dns.exception.Timeout(),
+    })
+    monkeypatch.setattr(email_validator, "_resolver", resolver)
+    monkeypatch.setattr(email_validator, "mx_cache", MXCache())
+    return resolver
+
+
+def test_cache_entries_expire():
+    cache = MXCache()
+    cache.set("a.com", ["mx.a.com."], "Valid email", ttl=60)
+    cache.set("b.com", [], "Domain does not have MX records", ttl=-1)
+    assert cache.get("a.com") == (["mx.a.com."], "Valid email")
+    assert cache.get("b.com") is None
+    assert cache.get("c.com") is None
+
+
+def test_cache_is_bounded():
+    cache = MXCache(max_entries=2)
+    cache.set("expired.com", [], "gone", ttl=-1)
+    cache.set("a.com", ["mx.a.com."], "Valid email", ttl=60)
+    # the expired entry makes room first
+    cache.set("b.com", ["mx.b.com."], "Valid email", ttl=60)
+    assert cache.get("a.com") is not None
+    # then the oldest insertion
+    cache.set("c.com", ["mx.c.com."], "Valid email", ttl=60)
+    assert cache.get("a.com") is None
+    assert cache.get("b.com") is not None and cache.get("c.com") is not None
+
+
+def test_resolve_mx_orders_hosts_and_caches(resolver):
+    assert email_validator.resolve_mx("Example.COM.") == (["mx1.example.com.", "mx2.example.com."], "Valid email")
+    assert email_validator.resolve_mx("example.com") == (["mx1.example.com.", "mx2.example.com."], "Valid email")
+    assert resolver.lookups == ["example.com"]
+
+
+def test_positive_ttl_is_clamped(resolver):
+    email_validator.resolve_mx("example.com")
+    expires_at = email_validator.mx_cache._entries["example.com"][0]
+    remaining = expires_at - email_validator.time.monotonic()
+    assert email_validator.MIN_POSITIVE_TTL - 5 < remaining <= email_validator.MIN_POSITIVE_TTL
+
+
+def test_negative_and_failed_lookups_are_cached(resolver):
+    assert email_validator.resolve_mx("nomx.com") == ([], "Domain does not have MX records")
+    hosts, reason = email_validator.resolve_mx("slow.com")
+    assert hosts == [] and reason.startswith("Validation failed")
+    email_validator.resolve_mx("nomx.com")
+    email_validator.resolve_mx("slow.com")
+    assert resolver.lookups == ["nomx.com", "slow.com"]
+
+
+def test_validate_email_address(resolver):
+    assert email_validator.validate_email_address("someone@example.com") == (True, "Valid email")
+    assert email_validator.validate_email_address("someone@nomx.com") == (False, "Domain does not have MX records")
+    # major mailbox providers need no lookup
+    assert email_validator.validate_email_address("someone@gmail.com") == (True, "Valid email")
+    is_valid, reason = email_validator.validate_email_address("not-an-email")
+    assert not is_valid and reason.startswith("Invalid email format")
+    assert resolver.lookups == ["example.com", "nomx.com"]
+
+
+def test_async_validation_shares_the_cache(resolver, monkeypatch):
+    async_resolver = FakeAsyncResolver(resolver.answers)
+    monkeypatch.setattr(email_validator, "_async_resolver", async_resolver)
+
+    assert email_validator.validate_email_address("someone@example.com")[0]
+    assert asyncio.run(email_validator.validate_email_address_async("other@example.com")) == (True, "Valid email")
+    assert asyncio.run(email_validator.validate_email_address_async("other@nomx.com")) == (False, "Domain does not have MX records")
+    assert async_resolver.lookups == ["nomx.com"]
+
+
+def test_resolve_mx_async_caches_for_the_sync_path(resolver, monkeypatch):
+    async_resolver = FakeAsyncResolver(resolver.answers)
+    monkeypatch.setattr(email_validator, "_async_resolver", async_resolver)
+
+    async def lookups():
+        return [await email_validator.resolve_mx_async(domain) for domain in ("Example.COM.", "nomx.com", "slow.com", "example.com", "nomx.com", "slow.com")]
+
+    results = asyncio.run(lookups())
+    assert results[0] == results[3] == (["mx1.example.com.", "mx2.example.com."], "Valid email")
+    assert results[1] == results[4] == ([], "Domain does not have MX records")
+    assert results[2][0] == [] and results[2][1].startswith("Validation failed") and results[5] == results[2]
+    assert async_resolver.lookups == ["example.com", "nomx.com", "slow.com"]
+
+    # answers cached by the async path, negative ones included, are served to sync callers
+    assert email_validator.resolve_mx("example.com") == results[0]
+    assert email_validator.validate_email_address("someone@nomx.com") == (False, "Domain does not have MX records")
+    assert resolver.lookups == []
@@ -0,0 +1,45 @@
+import json
+import logging
+import os
+import sys
+import types
+
+import pytest
+
+import src.nodes.encoders as encoders
+import utils.helper as helper
+
+ONNX_MODEL_DIR = helper.load_application_properties().get("ONNX_ENCODER_DIR", os.path.join("application_models", "all-MiniLM-L6-v2-int8"))
+FAQ_JSON_PATH = os.path.join("Data", "terralogic", "faq_data", "faqs_from_pdf.json")
+
+
+def test_missing_onnx_model_falls_back_once(monkeypatch, tmp_path, caplog):
+    loaded = []
+
+    class FakeSentenceTransformer:
+        def __init__(self, model_name):
+            loaded.append(model_name)
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(SentenceTransformer=FakeSentenceTransformer))
+    monkeypatch.setattr(encoders, "_encoders", {})
+
+    with caplog.at_level(logging.WARNING):
+        first = encoders.load_sentence_encoder(backend="onnx", model_dir=str(tmp_path))
+        second = encoders.load_sentence_encoder(backend="onnx", model_dir=str(tmp_path))
+
+    assert first is second is encoders.load_sentence_encoder(backend="sentence_transformers")
+    assert loaded == [encoders.MODEL_NAME]
+    assert sum("ONNX model not found" in record.getMessage() for record in caplog.records) == 1
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(ONNX_MODEL_DIR, "model_int8.onnx")), reason="ONNX encoder not exported")
+def test_onnx_top1_parity_with_sentence_transformers():
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    with open(FAQ_JSON_PATH, encoding="utf-8") as f:
+        faq_questions = [faq["question"] for faq in json.load(f)]
+    queries = faq_questions + [question.lower().rstrip("?") for question in faq_questions]
+
+    mismatches = encoders.compare_encoders(faq_questions, queries, ONNX_MODEL_DIR)
+    assert mismatches == []
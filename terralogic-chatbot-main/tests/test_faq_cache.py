@@ -0,0 +1,119 @@
+import os
+
+import fitz
+import numpy as np
+import pytest
+
+import src.nodes.search as search
+
+
+def write_pdf(path, page_texts):
+    doc = fitz.open()
+    for text in page_texts:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, sentences):
+        self.encoded.extend(sentences)
+        return np.array([[len(sentence), 1.0] + [0.0] * 382 for sentence in sentences], dtype=np.float32)
+
+
+class OtherFakeEncoder(FakeEncoder):
+    pass
+
+
+@pytest.fixture
+def faq_dir(tmp_path):
+    write_pdf(tmp_path / "base.pdf", ["What is Terralogic?\nAn IT services company."])
+    (tmp_path / "uploads").mkdir()
+    write_pdf(tmp_path / "uploads" / "hr.pdf", ["How do I apply?\nThrough the careers page."])
+    return tmp_path
+
+
+def make_node(monkeypatch, faq_dir, encoder):
+    monkeypatch.setattr(search, "load_sentence_encoder", lambda backend=None: encoder)
+    return search.SearchNode(
+        str(faq_dir / "base.pdf"),
+        str(faq_dir / "faq_embeddings.npy"),
+        str(faq_dir / "faqs_from_pdf.json"),
+        uploads_dir=str(faq_dir / "uploads"),
+    )
+
+
+def cached_hashes(faq_dir):
+    return {os.path.splitext(name)[0] for name in os.listdir(faq_dir / "faq_sources") if name != "manifest.json"}
+
+
+def questions(node):
+    return [faq["question"] for faq in node.faqs]
+
+
+def test_unchanged_pdfs_are_not_embedded_again(monkeypatch, faq_dir):
+    encoder = FakeEncoder()
+    node = make_node(monkeypatch, faq_dir, encoder)
+    node.refresh_faq_data()
+    assert encoder.encoded == ["What is Terralogic?", "How do I apply?"]
+    first_embeddings = np.array(node.faq_embeddings)
+
+    encoder.encoded.clear()
+    node.refresh_faq_data()
+
+    assert encoder.encoded == []
+    assert questions(node) == ["What is Terralogic?", "How do I apply?"]
+    np.testing.assert_array_equal(node.faq_embeddings, first_embeddings)
+
+
+def test_changed_and_deleted_pdfs_invalidate_their_cache(monkeypatch, faq_dir):
+    encoder = FakeEncoder()
+    node = make_node(monkeypatch, faq_dir, encoder)
+    node.refresh_faq_data()
+    old_hashes = cached_hashes(faq_dir)
+
+    write_pdf(faq_dir / "base.pdf", ["Where is Terralogic based?\nIn Bangalore."])
+    encoder.encoded.clear()
+    node.refresh_faq_data()
+
+    assert encoder.encoded == ["Where is Terralogic based?"]
+    assert questions(node) == ["Where is Terralogic based?", "How do I apply?"]
+    assert len(cached_hashes(faq_dir) & old_hashes) == 1
+
+    os.remove(faq_dir / "uploads" / "hr.pdf")
+    node.refresh_faq_data()
+
+    assert questions(node) == ["Where is Terralogic based?"]
+    assert cached_hashes(faq_dir) == {node.file_sha256(str(faq_dir / "base.pdf"))}
+
+
+def test_encoder_change_purges_every_cache(monkeypatch, faq_dir):
+    make_node(monkeypatch, faq_dir, FakeEncoder()).refresh_faq_data()
+
+    other_encoder = OtherFakeEncoder()
+    node = make_node(monkeypatch, faq_dir, other_encoder)
+    node.refresh_faq_data()
+
+    assert other_encoder.encoded == ["What is Terralogic?", "How do I apply?"]
+    assert len(cached_hashes(faq_dir)) == 2
+
+
+def test_partly_extracted_pdf_is_not_cached(monkeypatch, faq_dir):
+    encoder = FakeEncoder()
+    node = make_node(monkeypatch, faq_dir, encoder)
+    base_path = str(faq_dir / "base.pdf")
+
+    node.refresh_faq_data(pdf_pages={base_path: ["What is Terralogic?\nAn IT services company.", None]})
+
+    assert questions(node) == ["What is Terralogic?", "How do I apply?"]
+    assert node.file_sha256(base_path) not in cached_hashes(faq_dir)
+
+    encoder.encoded.clear()
+    node.refresh_faq_data()
+
+    # extracted again on the next run, and cached once it is read completely
+    assert encoder.encoded == ["What is Terralogic?"]
+    assert node.file_sha256(base_path) in cached_hashes(faq_dir)
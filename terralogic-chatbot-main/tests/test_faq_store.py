@@ -0,0 +1,95 @@
+import json
+
+import numpy as np
+import pytest
+from langchain_core.messages import HumanMessage
+
+import src.nodes.search as search
+from src.subgraphs.service_subgraph import FAQLLMSubgraph
+
+FAQS = [
+    {"question": "What is Terralogic?", "answer": "An IT services company."},
+    {"question": "Where is Terralogic based?", "answer": "In Bangalore."},
+    {"question": "How do I apply?", "answer": "Through the careers page."},
+]
+EMBEDDINGS = np.array([[3.0, 4.0, 0.0], [3.0, 3.0, 1.0], [0.0, 1.0, 5.0]], dtype=np.float32)
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, sentences):
+        self.encoded.extend(sentences)
+        return EMBEDDINGS[[next(i for i, faq in enumerate(FAQS) if faq["question"] == s) for s in sentences]]
+
+
+@pytest.fixture
+def node(tmp_path, monkeypatch):
+    encoder = FakeEncoder()
+    monkeypatch.setattr(search, "load_sentence_encoder", lambda backend=None: encoder)
+    return search.SearchNode(str(tmp_path / "base.pdf"), str(tmp_path / "faq_embeddings.npy"), str(tmp_path / "faqs_from_pdf.json"))
+
+
+@pytest.fixture
+def store(node):
+    node.save_faq_store(FAQS, EMBEDDINGS)
+    node.load_faq_store()
+    return node
+
+
+def test_neighbor_lists_are_precomputed(store):
+    assert store.faq_neighbors.tolist() == [[1, 2], [0, 2], [1, 0]]
+    assert store.related_faqs(2, top_n=1) == [FAQS[1]]
+
+
+def test_store_without_neighbor_lists_recomputes_them(store, tmp_path):
+    (tmp_path / "faq_neighbors.npy").unlink()
+    store.faq_neighbors = None
+    store.load_faq_store()
+    assert store.faq_neighbors.tolist() == [[1, 2], [0, 2], [1, 0]]
+
+
+def test_clicked_option_is_answered_from_its_neighbor_list(store):
+    subgraph = FAQLLMSubgraph.__new__(FAQLLMSubgraph)
+    subgraph.search_obj = store
+    subgraph.FAQ_SEARCH_THRESH = 0.85
+
+    # option clicks arrive bleach-escaped, with whatever spacing and case the client sends
+    result = subgraph.llm_free({"messages": [HumanMessage(content="  what&nbsp;is\u200b TERRALOGIC? ")]})
+
+    assert result["messages"][0].content == "An IT services company."
+    assert result["score"] == 1.0
+    assert result["options"] == ["Where is Terralogic based?", "How do I apply?"]
+    # the encoder is not run for a clicked option
+    assert store.embed_model.encoded == []
+
+    result = subgraph.llm_free({"messages": [HumanMessage(content="How do I apply?")]})
+    assert result["options"] == ["Where is Terralogic based?", "What is Terralogic?"]
+    assert store.embed_model.encoded == []
+
+
+def test_legacy_npz_store_is_migrated_and_memory_mapped(node, tmp_path, monkeypatch):
+    np.savez_compressed(tmp_path / "faq_embeddings.npz", faq_embeddings=EMBEDDINGS)
+    with open(tmp_path / "faqs_from_pdf.json", "w") as f:
+        json.dump(FAQS, f)
+    monkeypatch.setattr(node, "refresh_faq_data", lambda *args: pytest.fail("migration must not re-extract the PDFs"))
+
+    node.load_faq_data()
+
+    assert (tmp_path / "faq_embeddings.npy").exists() and (tmp_path / "faq_neighbors.npy").exists()
+    assert isinstance(node.faq_embeddings, np.memmap) and not node.faq_embeddings.flags.writeable
+    assert node.faq_embeddings.dtype == np.float32
+    np.testing.assert_allclose(node.faq_embeddings, EMBEDDINGS / np.linalg.norm(EMBEDDINGS, axis=1, keepdims=True), rtol=1e-6)
+    assert node.faqs == FAQS
+
+    # the migrated store answers like the original one
+    top_faqs, top_scores = node.faq_search("Where is Terralogic based?", top_n=2)
+    assert [faq["question"] for faq in top_faqs] == ["Where is Terralogic based?", "What is Terralogic?"]
+    assert top_scores[0] == pytest.approx(1.0)
+
+
+def test_empty_store_loads_without_mapping(node, tmp_path):
+    node.save_faq_store([], np.zeros((0, 384), dtype=np.float32))
+    node.load_faq_store()
+    assert node.faqs == [] and node.faq_embeddings.shape == (0, 384) and node.faq_neighbors.shape == (0, 0)
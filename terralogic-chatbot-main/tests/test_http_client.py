@@ -0,0 +1,67 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import utils.http_client as http_client
+from utils.http_client import PooledSession
+
+
+class UnavailableHandler(BaseHTTPRequestHandler):
+    """
+    Answers every request with 503 and counts the hits per method.
+    """
+
+    hits = {}
+    lock = threading.Lock()
+
+    def _unavailable(self):
+        with self.lock:
+            self.hits[self.command] = self.hits.get(self.command, 0) + 1
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_error(503)
+
+    do_GET = do_POST = _unavailable
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url(monkeypatch):
+    monkeypatch.setattr(http_client, "RETRY_BACKOFF_FACTOR", 0)
+    UnavailableHandler.hits = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), UnavailableHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_post_is_never_retried(server_url):
+    session = PooledSession()
+
+    assert session.post(f"{server_url}/enquiry", json={"email": "alex@example.com"}).status_code == 503
+    assert session.get(f"{server_url}/careers").status_code == 503
+
+    assert UnavailableHandler.hits == {"POST": 1, "GET": 1 + http_client.RETRY_TOTAL}
+
+
+def test_no_retry_session_attempts_once(server_url):
+    session = PooledSession(retry=False)
+    assert session.get(f"{server_url}/careers").status_code == 503
+    assert UnavailableHandler.hits == {"GET": 1}
+
+
+def test_shared_sessions_and_metrics(server_url):
+    assert http_client.get_session() is http_client.get_session()
+    assert http_client.get_session(retry=False) is http_client.get_session(retry=False) is not http_client.get_session()
+
+    host = server_url.split("//")[1]
+    before = http_client.http_stats().get(host, {"requests": 0, "errors": 0})
+    http_client.get_session(retry=False).post(f"{server_url}/enquiry", data=b"x")
+    after = http_client.http_stats()[host]
+    assert (after["requests"], after["errors"]) == (before["requests"] + 1, before["errors"] + 1)
@@ -0,0 +1,89 @@
+import json
+
+from langchain_core.documents import Document
+
+from utils.index_manifest import IndexManifest, content_hash, is_web_source
+
+
+class FakeDocstore:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def search(self, chunk_id):
+        return self.documents[chunk_id]
+
+
+class FakeVectorstore:
+    def __init__(self, documents):
+        self.docstore = FakeDocstore(documents)
+        self.index_to_docstore_id = dict(enumerate(documents))
+
+
+def test_record_save_and_reload(tmp_path):
+    path = str(tmp_path / "index_manifest.json")
+    manifest = IndexManifest(path)
+    assert len(manifest) == 0
+    manifest.record("https://example.com/a", content_hash("a"), ["c1", "c2"], lastmod="2026-01-01")
+    manifest.record("https://example.com/b", content_hash("b"), ["c3"])
+    manifest.save()
+
+    reloaded = IndexManifest(path)
+    assert reloaded.urls() == {"https://example.com/a", "https://example.com/b"}
+    assert reloaded.chunk_ids("https://example.com/a") == ["c1", "c2"]
+    assert reloaded.chunk_ids("https://example.com/unknown") == []
+    with open(path, encoding="utf-8") as f:
+        assert set(json.load(f)["pages"]) == reloaded.urls()
+    assert not (tmp_path / "index_manifest.json.tmp").exists()
+
+
+def test_change_detection(tmp_path):
+    manifest = IndexManifest(str(tmp_path / "index_manifest.json"))
+    manifest.record("https://example.com/a", content_hash("a"), ["c1"], lastmod="2026-01-01")
+    manifest.record("https://example.com/b", None, ["c2"], lastmod="2026-01-01")
+
+    assert manifest.unchanged_since("https://example.com/a", "2026-01-01")
+    assert not manifest.unchanged_since("https://example.com/a", "2026-02-01")
+    assert not manifest.unchanged_since("https://example.com/a", None)
+    # a page without a known hash is always re-embedded
+    assert not manifest.unchanged_since("https://example.com/b", "2026-01-01")
+
+    assert manifest.has_content("https://example.com/a", content_hash("a"))
+    assert not manifest.has_content("https://example.com/a", content_hash("a, edited"))
+
+    manifest.set_lastmod("https://example.com/a", "2026-03-01")
+    manifest.set_lastmod("https://example.com/a", None)
+    manifest.set_lastmod("https://example.com/unknown", "2026-03-01")
+    assert manifest.pages["https://example.com/a"]["lastmod"] == "2026-03-01"
+    assert "https://example.com/unknown" not in manifest.pages
+
+
+def test_remove_returns_the_chunk_ids(tmp_path):
+    manifest = IndexManifest(str(tmp_path / "index_manifest.json"))
+    manifest.record("https://example.com/a", content_hash("a"), ["c1", "c2"])
+    assert manifest.remove("https://example.com/a") == ["c1", "c2"]
+    assert manifest.remove("https://example.com/a") == []
+    assert len(manifest) == 0
+
+
+def test_rebuild_from_vectorstore_keeps_web_pages_only(tmp_path):
+    vectorstore = FakeVectorstore({
+        "c1": Document(page_content="a1", metadata={"source": "https://example.com/a"}),
+        "c2": Document(page_content="faq", metadata={"source": "Data/terralogic/faq.pdf", "page": 1}),
+        "c3": Document(page_content="a2", metadata={"source": "https://example.com/a"}),
+        "c4": Document(page_content="b", metadata={"source": "https://example.com/b"}),
+    })
+    manifest = IndexManifest(str(tmp_path / "index_manifest.json"))
+    manifest.record("https://example.com/gone", content_hash("gone"), ["c9"])
+    manifest.rebuild_from_vectorstore(vectorstore, page_hashes={"https://example.com/a": content_hash("a")},
+                                      lastmods={"https://example.com/b": "2026-01-01"})
+
+    assert manifest.urls() == {"https://example.com/a", "https://example.com/b"}
+    assert manifest.chunk_ids("https://example.com/a") == ["c1", "c3"]
+    assert manifest.has_content("https://example.com/a", content_hash("a"))
+    assert manifest.pages["https://example.com/b"]["hash"] is None
+    assert manifest.pages["https://example.com/b"]["lastmod"] == "2026-01-01"
+
+
+def test_is_web_source():
+    assert is_web_source("https://example.com/a") and is_web_source("http://example.com")
+    assert not is_web_source("Data/terralogic/faq.pdf") and not is_web_source(None)
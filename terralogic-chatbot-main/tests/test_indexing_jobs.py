@@ -0,0 +1,126 @@
+import queue
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from utils.indexing_jobs import IndexingJobRunner, IndexingCancelled, IndexingQueueFull, FINISHED_STATUSES, _run_indexing_job
+
+
+def fake_indexing_job(job_id, client_id, options, progress_queue, cancel_event):
+    """
+    Worker stand-in for run_setup: reports progress, then runs until cancelled or for options["seconds"].
+    """
+    progress_queue.put((job_id, "fetched", 3))
+    deadline = time.monotonic() + options.get("seconds", 30)
+    while time.monotonic() < deadline:
+        if cancel_event.is_set():
+            raise IndexingCancelled(f"Indexing job {job_id} cancelled")
+        time.sleep(0.02)
+    if options.get("fail"):
+        raise RuntimeError("sitemap unreachable")
+
+
+@pytest.fixture
+def runner():
+    runner = IndexingJobRunner(max_workers=2, max_queued=2, job_function=fake_indexing_job)
+    yield runner
+    runner.shutdown()
+
+
+def wait_for(runner, job_id, statuses=FINISHED_STATUSES, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.status(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {runner.status(job_id)['status']}")
+
+
+def test_jobs_queue_per_tenant_and_dedupe(runner):
+    finished = []
+    running_id, created = runner.submit("acme", {"seconds": 30}, description="Full")
+    assert created and runner.status(running_id)["status"] == "processing"
+
+    queued_id, created = runner.submit("acme", {"seconds": 0}, on_finish=lambda job: finished.append(("first", job["status"])))
+    assert created and runner.status(queued_id)["status"] == "queued"
+    # an identical submission joins the queued job, and keeps its own callback
+    same_id, created = runner.submit("acme", {"seconds": 0}, on_finish=lambda job: finished.append(("second", job["status"])))
+    assert (same_id, created) == (queued_id, False)
+
+    runner.submit("acme", {"seconds": 0, "website_only": True})
+    with pytest.raises(IndexingQueueFull):
+        runner.submit("acme", {"seconds": 0, "urls": ["https://example.com"]})
+    # other tenants are not held up
+    other_id, _ = runner.submit("globex", {"seconds": 0})
+    assert wait_for(runner, other_id)["status"] == "completed"
+
+    assert runner.cancel(running_id)
+    assert wait_for(runner, running_id)["status"] == "cancelled"
+    assert wait_for(runner, queued_id)["status"] == "completed"
+    assert sorted(finished) == [("first", "completed"), ("second", "completed")]
+
+
+def test_progress_is_reported(runner):
+    job_id, _ = runner.submit("acme", {"seconds": 30})
+    deadline = time.monotonic() + 30
+    while runner.status(job_id)["stages"] != {"fetched": 3} and time.monotonic() < deadline:
+        time.sleep(0.05)
+    job = runner.status(job_id)
+    assert job["stage"] == "fetched" and job["progress"] == 20
+    runner.cancel(job_id)
+    wait_for(runner, job_id)
+
+
+def test_cancel_queued_job(runner):
+    finished = []
+    running_id, _ = runner.submit("acme", {"seconds": 30})
+    queued_id, _ = runner.submit("acme", {"seconds": 0}, on_finish=lambda job: finished.append(job["status"]))
+
+    assert runner.cancel(queued_id)
+    assert runner.status(queued_id)["status"] == "cancelled" and finished == ["cancelled"]
+    assert not runner.cancel(queued_id)
+    assert not runner.cancel("unknown")
+
+    runner.cancel(running_id)
+    wait_for(runner, running_id)
+    assert [job["status"] for job in runner.list_jobs("acme").values()] == ["cancelled", "cancelled"]
+
+
+def test_failed_job(runner):
+    job_id, _ = runner.submit("acme", {"seconds": 0, "fail": True})
+    job = wait_for(runner, job_id)
+    assert job["status"] == "failed" and "sitemap unreachable" in job["message"]
+
+
+def test_cancel_is_not_honoured_once_the_index_is_saved(monkeypatch):
+    cancel_event = threading.Event()
+    writes = []
+
+    def run_setup(client_id, progress=None, **options):
+        progress("embedded", 10)
+        cancel_event.set()
+        progress("saving", 1)
+        writes.append("index and manifest")
+        progress("saved", 1)
+
+    monkeypatch.setitem(sys.modules, "src.setup", types.SimpleNamespace(run_setup=run_setup))
+    with pytest.raises(IndexingCancelled):
+        _run_indexing_job("job", "acme", {}, queue.Queue(), cancel_event)
+    assert writes == []
+
+    def run_setup_cancelled_while_saving(client_id, progress=None, **options):
+        progress("saving", 1)
+        cancel_event.set()
+        writes.append("index and manifest")
+        progress("saved", 1)
+
+    cancel_event.clear()
+    progress_queue = queue.Queue()
+    monkeypatch.setitem(sys.modules, "src.setup", types.SimpleNamespace(run_setup=run_setup_cancelled_while_saving))
+    _run_indexing_job("job", "acme", {}, progress_queue, cancel_event)
+    assert writes == ["index and manifest"]
+    assert [progress_queue.get()[1] for _ in range(progress_queue.qsize())] == ["starting", "saving", "saved"]
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+import yaml
+from langchain_core.language_models import FakeListLLM
+from langchain_core.messages import HumanMessage
+
+import src.nodes.intent_router as intent_router
+from src.graphs.graph_v3 import Supervisor
+
+VOCABULARY = ["services", "offer", "company", "build", "app", "project", "quote", "job", "hiring", "resume", "weather"]
+
+
+class KeywordEncoder:
+    """
+    Bag-of-words stand-in for the MiniLM encoder: one dimension per vocabulary word.
+    """
+
+    def encode(self, sentences):
+        return np.array([[float(word in sentence.lower()) for word in VOCABULARY] for sentence in sentences], dtype=np.float32)
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch):
+    monkeypatch.setattr(intent_router, "load_sentence_encoder", lambda backend=None: KeywordEncoder())
+    exemplars_path = tmp_path / "intent_exemplars.yaml"
+    exemplars_path.write_text(yaml.safe_dump({
+        "services": {"next_node": "services", "exemplars": ["what services do you offer", "tell me about your company"]},
+        "projects": {"next_node": "services", "exemplars": ["build an app", "quote for a project"]},
+        "careers": {"next_node": "career_node", "exemplars": ["are you hiring a job", "send my resume"]},
+    }))
+    return intent_router.IntentRouter(str(exemplars_path), threshold=0.45, margin=0.05)
+
+
+def test_routes_confident_matches(router):
+    assert router.route("Are you hiring for this job?")[0] == "career_node"
+    assert router.route("which services do you offer")[0] == "services"
+    # project requests share the services flow with the "start a project" button
+    assert router.route("we want to build an app")[0] == "services"
+
+
+def test_unsure_messages_are_not_routed(router):
+    next_node, score = router.route("what is the weather like")
+    assert next_node is None
+    assert score < 0.45
+
+
+def test_close_runner_up_is_not_routed(router):
+    # equally close to services and careers
+    assert router.route("company resume")[0] is None
+
+
+def test_missing_exemplars_file_disables_the_router(tmp_path):
+    client_properties = {"ROOT_DIR": str(tmp_path), "CLIENT_NAME": "tenant", "INTENT_EXEMPLARS_FILE": "missing.yaml"}
+    assert intent_router.IntentRouter.from_client_properties(client_properties) is None
+    assert intent_router.IntentRouter.from_client_properties({}) is None
+
+
+def supervisor(router, llm_answers=("none",)):
+    all_prompts = {"supervisor_prompt": "{question} {name} {email}", "intent_prompt": "{question}"}
+    return Supervisor(FakeListLLM(responses=list(llm_answers)), all_prompts, intent_router=router)
+
+
+def understand(agent, message, **state):
+    return agent.understand({"messages": [HumanMessage(content=message)], "mode": "answering", **state})
+
+
+def test_supervisor_routes_free_text_before_a_flow(router):
+    assert understand(supervisor(router), "Are you hiring?").get("next_node") == "career_node"
+    # unsure router: the LLM intent chain decides, a project maps to the services flow
+    assert understand(supervisor(router, ["projects"]), "something new").get("next_node") == "services"
+
+
+def test_supervisor_keeps_an_active_flow(router):
+    update = understand(supervisor(router), "Are you hiring?", next_node="services")
+    assert "next_node" not in update
+
+
+def test_supervisor_buttons_switch_flows(router):
+    assert understand(supervisor(router), "Looking for a job", next_node="services")["next_node"] == "career_node"
+    assert understand(supervisor(router), "Start a project", next_node="career_node")["next_node"] == "services"
@@ -0,0 +1,49 @@
+from src.tools.career_listings import JobRecord
+from src.tools.job_shortlist import extract_keywords, shortlist_jobs, encode_jobs_table, rehydrate_jobs
+
+JOBS = (
+    JobRecord("Senior Python Developer", "Bangalore", "https://example.com/jobs/1"),
+    JobRecord("QA Engineer", "Hyderabad", "https://example.com/jobs/2"),
+    JobRecord("Java Developer", "Bangalore / Hyderabad", "https://example.com/jobs/3"),
+    JobRecord("HR Executive", "N/A", "https://example.com/jobs/4"),
+)
+
+
+def test_keywords_skip_stopwords_and_prefer_the_latest_message():
+    assert extract_keywords(["I am looking for a job", "any python roles in Bangalore?"]) == ["python", "bangalore"]
+    assert extract_keywords(["c++ or c# openings"]) == ["c++", "c#"]
+
+
+def test_shortlist_keeps_listing_order_and_stable_ids():
+    shortlist = shortlist_jobs(JOBS, ["developer jobs in hyderabad"])
+    assert [job_id for job_id, _ in shortlist] == ["J1", "J2", "J3"]
+
+
+def test_best_matches_win_when_over_the_limit():
+    shortlist = shortlist_jobs(JOBS, ["java developer in bangalore"], limit=2)
+    assert [job_id for job_id, _ in shortlist] == ["J1", "J3"]
+
+
+def test_typos_still_match():
+    assert [job_id for job_id, _ in shortlist_jobs(JOBS, ["develper jobs in banglore"])] == ["J1", "J3"]
+
+
+def test_without_matching_keywords_the_first_jobs_are_returned():
+    assert shortlist_jobs(JOBS, ["what jobs do you have?"], limit=2) == [("J1", JOBS[0]), ("J2", JOBS[1])]
+    assert shortlist_jobs(JOBS, ["marketing"], limit=3) == [("J1", JOBS[0]), ("J2", JOBS[1]), ("J3", JOBS[2])]
+
+
+def test_jobs_table_has_no_links_and_lists_every_location():
+    table = encode_jobs_table(shortlist_jobs(JOBS, ["qa"]), JOBS)
+    assert table.splitlines() == [
+        "All locations: Bangalore, Hyderabad",
+        "1 of 4 openings, best matches for the conversation:",
+        "id | title | location",
+        "J2 | QA Engineer | Hyderabad",
+    ]
+    assert "https://" not in table
+
+
+def test_rehydrate_maps_ids_back_to_records():
+    shortlist = shortlist_jobs(JOBS, ["developer"])
+    assert rehydrate_jobs([" j3", "J1", "J9", "J2"], shortlist) == [JOBS[2], JOBS[0]]
@@ -0,0 +1,70 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage, RemoveMessage
+from langgraph.graph.message import add_messages
+
+from src.nodes.message_trimmer import MessageTrimmer
+
+
+def conversation(turns):
+    messages = []
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"question {turn}", id=f"h{turn}"))
+        messages.append(AIMessage(content=f"answer {turn}", id=f"a{turn}"))
+    return messages
+
+
+def tool_round(turn):
+    tool_call = {"name": "ResponseFormatter", "args": {}, "id": f"call{turn}"}
+    return [
+        AIMessage(content="", tool_calls=[tool_call], id=f"tc{turn}"),
+        ToolMessage(content="Here is your structured response", tool_call_id=f"call{turn}", id=f"tm{turn}"),
+    ]
+
+
+def test_short_conversation_is_left_alone():
+    trimmer = MessageTrimmer(window=20)
+    assert trimmer.trim({"messages": conversation(3)}) == {}
+
+
+def test_tool_scaffolding_is_removed():
+    trimmer = MessageTrimmer(window=20)
+    messages = conversation(1) + tool_round(1) + [AIMessage(content="done", id="final")]
+
+    update = trimmer.trim({"messages": messages})
+
+    assert [message.id for message in update["messages"]] == ["tc1", "tm1"]
+    assert all(isinstance(message, RemoveMessage) for message in update["messages"])
+    assert update["trimmed_messages"] == 2
+    # scaffolding is not conversation, nothing is summarised
+    assert "summary" not in update
+
+
+def test_overflow_is_folded_into_the_summary():
+    trimmer = MessageTrimmer(window=4)
+    messages = conversation(4)
+
+    update = trimmer.trim({"messages": messages, "trimmed_messages": 5, "summary": "User: earlier"})
+
+    assert [message.id for message in update["messages"]] == ["h0", "a0", "h1", "a1"]
+    assert update["trimmed_messages"] == 9
+    assert update["summary"] == "User: earlier\nUser: question 0\nBot: answer 0\nUser: question 1\nBot: answer 1"
+
+    remaining = add_messages(messages, update["messages"])
+    assert [message.id for message in remaining] == ["h2", "a2", "h3", "a3"]
+
+
+def test_summary_keeps_the_most_recent_lines_within_budget():
+    trimmer = MessageTrimmer(window=2, summary_max_chars=40, line_max_chars=10)
+    messages = [HumanMessage(content="a very long question " * 5, id="long")] + conversation(3)
+
+    summary = trimmer.trim({"messages": messages})["summary"]
+
+    assert len(summary) <= 40
+    assert summary.endswith("Bot: answer 1")
+    assert "User: a very lon..." not in summary
+
+
+def test_summary_line_is_truncated():
+    trimmer = MessageTrimmer(window=1, line_max_chars=10)
+    messages = [HumanMessage(content="0123456789abcdef", id="h"), AIMessage(content="ok", id="a")]
+
+    assert trimmer.trim({"messages": messages})["summary"] == "User: 0123456789..."
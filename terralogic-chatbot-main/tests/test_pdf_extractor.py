@@ -0,0 +1,59 @@
+import fitz
+
+from utils import pdf_extractor
+from utils.pdf_extractor import extract_pdf_pages, iter_pdf_pages, pages_complete
+
+
+def write_pdf(path, page_texts):
+    doc = fitz.open()
+    for text in page_texts:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_pages_stream_back_in_order_across_page_ranges(tmp_path):
+    first = write_pdf(tmp_path / "first.pdf", [f"first page {i}" for i in range(5)])
+    second = write_pdf(tmp_path / "second.pdf", ["second page 0", "second page 1"])
+
+    pages = list(iter_pdf_pages([first, second], max_workers=2, pages_per_task=2))
+
+    assert [(path, page_number, total) for path, page_number, total, _ in pages] == (
+        [(first, i, 5) for i in range(5)] + [(second, i, 2) for i in range(2)]
+    )
+    for path, page_number, _, text in pages:
+        expected = "first" if path == first else "second"
+        assert text.strip() == f"{expected} page {page_number}"
+
+
+def test_failed_pages_keep_their_place(tmp_path, monkeypatch):
+    pdf_path = write_pdf(tmp_path / "faq.pdf", ["page 0", "page 1", "page 2"])
+    real_extract = pdf_extractor._extract_page_range
+
+    def extract_with_broken_page(path, start, end):
+        return [(page_number, None if page_number == 1 else text) for page_number, text in real_extract(path, start, end)]
+
+    # a single small document is extracted in-process, so the patched worker is used
+    monkeypatch.setattr(pdf_extractor, "_extract_page_range", extract_with_broken_page)
+    pages = extract_pdf_pages([pdf_path])[pdf_path]
+
+    assert [text.strip() if text else text for text in pages] == ["page 0", None, "page 2"]
+    assert not pages_complete(pages)
+
+
+def test_page_outside_the_document_is_none(tmp_path):
+    pdf_path = write_pdf(tmp_path / "faq.pdf", ["page 0"])
+    assert [(n, text and text.strip()) for n, text in pdf_extractor._extract_page_range(pdf_path, 0, 2)] == [(0, "page 0"), (1, None)]
+
+
+def test_unreadable_pdf_maps_to_none(tmp_path):
+    good = write_pdf(tmp_path / "good.pdf", ["page 0"])
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+
+    pdf_pages = extract_pdf_pages([good, str(broken)])
+
+    assert pdf_pages[str(broken)] is None
+    assert not pages_complete(pdf_pages[str(broken)])
+    assert pages_complete(pdf_pages[good])
@@ -0,0 +1,121 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.site_crawler import SiteCrawler, canonicalize
+
+
+def page(title, *links):
+    anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+    return f"<html><head><title>{title}</title></head><body><p>{title} page</p>{anchors}</body></html>"
+
+
+SITE = {
+    "/robots.txt": "User-agent: *\nDisallow: /private\n",
+    "/": page("Home", "/about", "/services/", "/missing", "/private", "/brochure.pdf", "https://elsewhere.example/", "/partners"),
+    "/about": page("About", "/", "/about/team", "/about/old-team"),
+    "/about/team": page("Team", "/about/team/history"),
+    "/about/team/history": page("History"),
+    "/services": page("Services", "/services/cloud?utm_source=home", "/about#contact"),
+    "/services/cloud": page("Cloud"),
+    "/private": page("Private"),
+}
+
+
+# in scope, but redirecting outside the crawl (another host, or above the start path)
+REDIRECTS = {"/partners": "http://localhost:{port}/about", "/about/old-team": "/services"}
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path in REDIRECTS:
+            self.send_response(301)
+            self.send_header("Location", REDIRECTS[path].format(port=self.server.server_port))
+            self.end_headers()
+            return
+        if path not in SITE:
+            self.send_error(404)
+            return
+        body = SITE[path].encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain" if path.endswith(".txt") else "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def crawl(start_url, **kwargs):
+    crawler = SiteCrawler(start_url, delay=0, **kwargs)
+    documents = crawler.crawl()
+    return crawler, sorted(document.metadata["source"] for document in documents)
+
+
+def test_discovered_urls_include_failed_pages(site):
+    crawler, sources = crawl(site, max_depth=2)
+    assert sources == [f"{site}/", f"{site}/about", f"{site}/services"]
+    # /missing failed and is still part of the site; robots.txt-disallowed and out-of-scope links are not
+    assert crawler.discovered == {f"{site}/", f"{site}/about", f"{site}/services", f"{site}/missing"}
+    assert not crawler.budget_reached
+    failed = {report.url: report.error for report in crawler.reports if report.error}
+    assert set(failed) == {f"{site}/missing", f"{site}/private", f"{site}/partners"}
+    assert failed[f"{site}/partners"].startswith("skipped, redirects out of scope")
+
+
+def test_page_budget_is_reported(site):
+    crawler, sources = crawl(site, max_depth=3, max_pages=2)
+    assert len(sources) == 2
+    assert crawler.budget_reached
+    # the URLs left in the frontier are discovered too
+    assert len(crawler.discovered) > len(sources)
+
+
+def test_multi_page_site_is_crawled_to_depth(site):
+    crawler, sources = crawl(site, max_depth=10)
+    assert sources == [
+        f"{site}/", f"{site}/about", f"{site}/about/team", f"{site}/about/team/history", f"{site}/services",
+        f"{site}/services/cloud",
+    ]
+    assert not crawler.budget_reached
+
+
+def test_depth_limits_link_levels(site):
+    assert crawl(site, max_depth=1)[1] == [f"{site}/"]
+    assert crawl(site, max_depth=3)[1] == [
+        f"{site}/", f"{site}/about", f"{site}/about/team", f"{site}/services", f"{site}/services/cloud",
+    ]
+
+
+def test_crawl_stays_under_the_start_path(site):
+    crawler, sources = crawl(f"{site}/about/", max_depth=10)
+    assert sources == [f"{site}/about", f"{site}/about/team", f"{site}/about/team/history"]
+    # /about/old-team redirects to /services, outside the start path: skipped and not part of the site
+    assert f"{site}/about/old-team" not in crawler.discovered
+    assert any(report.url == f"{site}/about/old-team" and "out of scope" in report.error for report in crawler.reports)
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTPS://Example.COM", "https://example.com/"),
+    ("https://example.com:443/about/", "https://example.com/about"),
+    ("http://example.com:80/", "http://example.com/"),
+    ("http://example.com:8080/a", "http://example.com:8080/a"),
+    ("https://example.com/a#section", "https://example.com/a"),
+    ("https://example.com/a?utm_source=x&b=2&fbclid=y&a=1", "https://example.com/a?a=1&b=2"),
+    ("https://example.com/a?q=", "https://example.com/a?q="),
+    ("  https://example.com/Case/Path//  ", "https://example.com/Case/Path"),
+])
+def test_canonicalize(url, expected):
+    assert canonicalize(url) == expected
@@ -0,0 +1,133 @@
+import contextlib
+import gzip
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import utils.sitemap_parser as sitemap_parser
+from utils.sitemap_parser import iter_sitemap_file, iter_sitemap, SitemapEntry
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*entries):
+    urls = "".join(f"<url><loc> {loc} </loc>{f'<lastmod>{lastmod}</lastmod>' if lastmod else ''}</url>" for loc, lastmod in entries)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{urls}</urlset>'.encode("utf-8")
+
+
+def sitemap_index(*locs):
+    sitemaps = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>{sitemaps}</sitemapindex>'.encode("utf-8")
+
+
+def test_urlset_entries_with_lastmod():
+    stream = io.BytesIO(urlset(("https://example.com/a", "2026-01-01"), ("https://example.com/b", None)))
+    assert list(iter_sitemap_file(stream)) == [
+        ("url", "https://example.com/a", "2026-01-01"),
+        ("url", "https://example.com/b", None),
+    ]
+
+
+def test_sitemap_index_entries():
+    stream = io.BytesIO(sitemap_index("https://example.com/pages.xml", "https://example.com/posts.xml"))
+    assert [(kind, loc) for kind, loc, _ in iter_sitemap_file(stream)] == [
+        ("sitemap", "https://example.com/pages.xml"),
+        ("sitemap", "https://example.com/posts.xml"),
+    ]
+
+
+def test_entries_without_namespace_or_loc():
+    stream = io.BytesIO(b"<urlset><url><loc>https://example.com/a</loc></url><url><lastmod>2026-01-01</lastmod></url>"
+                        b"<url><loc>  </loc></url></urlset>")
+    assert list(iter_sitemap_file(stream)) == [("url", "https://example.com/a", None)]
+
+
+def test_image_extension_tags_are_ignored():
+    xml = (f'<urlset {NS} xmlns:image="http://www.google.com/schemas/sitemap-image/1.1"><url><loc>https://example.com/a</loc>'
+           '<image:image><image:loc>https://example.com/a.png</image:loc></image:image></url></urlset>')
+    assert list(iter_sitemap_file(io.BytesIO(xml.encode("utf-8")))) == [("url", "https://example.com/a", None)]
+
+
+SITEMAPS = {}
+
+
+class SitemapHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in SITEMAPS:
+            self.send_error(404)
+            return
+        body = SITEMAPS[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SitemapHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    SITEMAPS.update({
+        "/sitemap.xml": sitemap_index(f"{base}/pages.xml", f"{base}/posts.xml.gz", f"{base}/missing.xml", f"{base}/pages.xml"),
+        "/pages.xml": urlset((f"{base}/", "2026-01-01"), (f"{base}/about", None), (f"{base}/blog/a", None)),
+        # served without Content-Encoding, as most servers do for .xml.gz files
+        "/posts.xml.gz": gzip.compress(urlset((f"{base}/blog/b", "2026-02-01"), (f"{base}/about", None))),
+    })
+    yield base
+    server.shutdown()
+    server.server_close()
+
+
+def test_iter_sitemap_follows_indexes_and_gzip(server_url):
+    entries = sorted(iter_sitemap(f"{server_url}/sitemap.xml"))
+    assert entries == sorted([
+        SitemapEntry(f"{server_url}/", "2026-01-01"),
+        SitemapEntry(f"{server_url}/about", None),
+        SitemapEntry(f"{server_url}/blog/a", None),
+        SitemapEntry(f"{server_url}/blog/b", "2026-02-01"),
+    ])
+
+
+def test_iter_sitemap_include_and_exclude(server_url):
+    locs = sorted(entry.loc for entry in iter_sitemap(f"{server_url}/sitemap.xml", include=[r"/blog/"], exclude=[r"/b$"]))
+    assert locs == [f"{server_url}/blog/a"]
+
+
+def test_iter_sitemap_nesting_limit(server_url):
+    assert list(iter_sitemap(f"{server_url}/sitemap.xml", max_depth=0)) == []
+
+
+def test_readers_pause_while_the_caller_is_busy(monkeypatch):
+    produced = []
+    document = urlset(*((f"https://example.com/page/{index}", None) for index in range(5000)))
+
+    def counting_iter_sitemap_file(stream):
+        for entry in iter_sitemap_file(stream):
+            produced.append(entry)
+            yield entry
+
+    monkeypatch.setattr(sitemap_parser, "open_sitemap", lambda url: (contextlib.nullcontext(), io.BytesIO(document)))
+    monkeypatch.setattr(sitemap_parser, "iter_sitemap_file", counting_iter_sitemap_file)
+
+    entries = iter_sitemap("https://example.com/sitemap.xml", max_buffered=10)
+    first = [next(entries) for _ in range(5)]
+    time.sleep(0.3)
+    assert [entry.loc for entry in first] == [f"https://example.com/page/{index}" for index in range(5)]
+    # the reader is parked on the full buffer instead of parsing the whole file ahead
+    assert len(produced) <= 5 + 10 + 2
+
+    # a caller that stops early releases the parked reader
+    entries.close()
+    deadline = time.monotonic() + 5
+    while any(thread.name.startswith("sitemap") for thread in threading.enumerate()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not any(thread.name.startswith("sitemap") for thread in threading.enumerate())
+    assert len(produced) < 5000
@@ -0,0 +1,96 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+import src.subgraphs.introduction_subgraph as introduction_subgraph
+from src.nodes.slot_extractor import extract_email, extract_name, extract_slots
+
+
+@pytest.mark.parametrize("text, name", [
+    ("my name is john", "John"),
+    ("Hi, my name is Priya Sharma and I need a website", "Priya Sharma"),
+    ("I'm Rahul, rahul@example.com", "Rahul"),
+    ("This is Anita here", "Anita"),
+    ("I am looking for a job, my name is Arjun", "Arjun"),
+    ("call me Sam", "Sam"),
+    ("Hello I am Meera", "Meera"),
+])
+def test_names_after_an_intro_phrase(text, name):
+    assert extract_name(text) == name
+
+
+@pytest.mark.parametrize("text", [
+    "this is urgent",
+    "This is urgent",
+    "I am ready to start",
+    "im happy to chat",
+    "I am Bangalore based",
+    "I'm from Bangalore",
+    "I am a developer",
+    "i am rahul",
+    "my name is",
+    "Mobile app development",
+    "cloud migration",
+    "React Native",
+    "Tree",
+    "Bangalore",
+    "John Doe",
+    "hello",
+])
+def test_no_name_without_a_confident_intro(text):
+    assert extract_name(text) is None
+
+
+@pytest.mark.parametrize("text, email", [
+    ("my email is Priya.Sharma+chat@Example.co.in.", "Priya.Sharma+chat@Example.co.in"),
+    ("reach me at a@b.io", "a@b.io"),
+    ("same twice: a@b.io A@B.io", "a@b.io"),
+])
+def test_single_email(text, email):
+    assert extract_email(text) == email
+
+
+@pytest.mark.parametrize("text", ["no email here", "a@b.io or c@d.io", "john@localhost", "john@example", "@example.com"])
+def test_no_email_when_missing_or_ambiguous(text):
+    assert extract_email(text) is None
+
+
+def test_extract_slots():
+    assert extract_slots("My name is Priya, priya@example.com") == ("Priya", "priya@example.com")
+    assert extract_slots("priya@example.com") == (None, "priya@example.com")
+
+
+@pytest.fixture
+def subgraph(monkeypatch):
+    # MX lookups are not part of these tests
+    monkeypatch.setattr(introduction_subgraph, "validate_email_address", lambda email: (not email.endswith(".invalid"), None))
+    node = introduction_subgraph.ServiceInformationSubgraph.__new__(introduction_subgraph.ServiceInformationSubgraph)
+    node.all_prompts = {"intro_complete_template": "Thanks, {name}!"}
+    return node
+
+
+def prepass(subgraph, text, **state):
+    return subgraph.slot_prepass({"messages": [HumanMessage(content=text)], **state})
+
+
+def test_prepass_answers_an_intro_with_name_and_email(subgraph):
+    update = prepass(subgraph, "Hi, my name is Priya and my email is priya@example.com")
+
+    assert update["prepass"] == "respond"
+    assert update["name"] == "Priya"
+    assert update["email"] == "priya@example.com"
+    assert update["mode"] == "answering"
+    assert isinstance(update["messages"][0], AIMessage)
+    assert update["messages"][0].content == "Thanks, Priya!"
+
+
+@pytest.mark.parametrize("text, state", [
+    ("this is urgent, priya@example.com", {}),
+    ("Mobile app development priya@example.com", {}),
+    ("Priya priya@example.com", {}),
+    ("my name is Priya", {}),
+    ("priya@example.com", {"name": "Priya"}),
+    ("my name is Priya", {"email": "priya@example.com"}),
+    ("my name is Priya, priya@example.invalid", {}),
+])
+def test_prepass_leaves_everything_else_to_the_llm(subgraph, text, state):
+    assert prepass(subgraph, text, **state) == {"prepass": "llm"}
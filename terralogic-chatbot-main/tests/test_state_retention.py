@@ -0,0 +1,122 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import StateGraph, MessagesState, START, END
+from langchain_core.messages import AIMessage
+
+import utils.helper as helper
+import utils.state_retention as state_retention
+from src.graphs.checkpointer import PooledSqliteSaver
+
+
+@pytest.fixture
+def state_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(helper, "load_application_properties", lambda: {"STATE_DB_PATH": str(tmp_path)})
+    return os.path.join(tmp_path, "tenant.db")
+
+
+def write_checkpoints(saver, thread_id, count, checkpoint_ns="", ts=None):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}}
+    for step in range(count):
+        checkpoint = empty_checkpoint()
+        if ts:
+            checkpoint["ts"] = ts
+        checkpoint["channel_values"] = {"messages": "x" * 2000}
+        config = saver.put(config, checkpoint, {"step": step}, {})
+
+
+def checkpoint_counts(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return dict(conn.execute("SELECT thread_id || '/' || checkpoint_ns, COUNT(*) FROM checkpoints GROUP BY thread_id, checkpoint_ns").fetchall())
+
+
+def test_prunes_to_keep_last_and_returns_freed_pages(state_db):
+    saver = PooledSqliteSaver(state_db)
+    for thread in range(10):
+        write_checkpoints(saver, f"thread-{thread}", 30)
+    saver.pool.close()
+
+    result = state_retention.compact_state_db("tenant", keep_last=9, archive_after_days=30)
+
+    assert result["deleted_checkpoints"] == 210
+    assert set(checkpoint_counts(state_db).values()) == {9}
+    assert result["free_pages"] == 0
+    assert result["freed_pages"] > 0
+    assert result["reclaimed_bytes"] > 0
+
+
+def test_archives_idle_threads(state_db):
+    saver = PooledSqliteSaver(state_db)
+    idle_ts = (datetime.now(timezone.utc) - timedelta(days=40)).isoformat()
+    write_checkpoints(saver, "idle", 5, ts=idle_ts)
+    write_checkpoints(saver, "idle", 2, checkpoint_ns="introduction_node:1", ts=idle_ts)
+    write_checkpoints(saver, "active", 5)
+    saver.pool.close()
+
+    result = state_retention.compact_state_db("tenant", keep_last=3, archive_after_days=30)
+
+    assert result["archived_threads"] == 1
+    assert checkpoint_counts(state_db) == {"active/": 3}
+    # the archive keeps the latest main-graph checkpoint, subgraph namespaces are dropped
+    assert checkpoint_counts(state_db.replace("tenant.db", "tenant_archive.db")) == {"idle/": 1}
+
+
+def test_legacy_db_is_only_vacuumed_on_request(state_db):
+    # a state DB created before auto_vacuum was enabled
+    with sqlite3.connect(state_db) as conn:
+        conn.execute("PRAGMA journal_mode=WAL;")
+    saver = PooledSqliteSaver(state_db)
+    write_checkpoints(saver, "thread", 50)
+    saver.pool.close()
+
+    result = state_retention.compact_state_db("tenant", keep_last=3)
+    assert result["freed_pages"] == 0
+    assert result["free_pages"] > 0
+
+    result = state_retention.compact_state_db("tenant", keep_last=3, full_vacuum=True)
+    assert result["free_pages"] == 0
+    with sqlite3.connect(state_db) as conn:
+        assert conn.execute("PRAGMA auto_vacuum;").fetchone()[0] == 2
+
+
+def run_turns(db_path, subgraph_checkpointer, durability, turns=4):
+    """
+    Main graph with a compiled subgraph as a node, as in src/graphs/graph_v3.py.
+    """
+    subgraph_builder = StateGraph(MessagesState)
+    subgraph_builder.add_node("respond", lambda state: {"messages": [AIMessage(content="hello")]})
+    subgraph_builder.add_edge(START, "respond")
+    subgraph_builder.add_edge("respond", END)
+
+    graph_builder = StateGraph(MessagesState)
+    graph_builder.add_node("introduction_node", subgraph_builder.compile(checkpointer=subgraph_checkpointer))
+    graph_builder.add_edge(START, "introduction_node")
+    graph_builder.add_edge("introduction_node", END)
+    saver = PooledSqliteSaver(db_path)
+    graph = graph_builder.compile(checkpointer=saver)
+    for turn in range(turns):
+        graph.invoke({"messages": [("user", f"turn {turn}")]}, {"configurable": {"thread_id": "session"}}, durability=durability)
+    saver.pool.close()
+    return graph
+
+
+def test_subgraph_with_exit_durability_writes_no_namespaces(state_db):
+    run_turns(state_db, subgraph_checkpointer=None, durability="exit")
+    assert checkpoint_counts(state_db) == {"session/": 4}
+
+
+def test_prunes_per_turn_subgraph_namespaces(state_db):
+    # with sync durability a subgraph inherits the main graph's checkpointer under a new namespace every turn
+    run_turns(state_db, subgraph_checkpointer=None, durability="sync")
+    namespaces = [key for key in checkpoint_counts(state_db) if key != "session/"]
+    assert len(namespaces) == 4
+
+    result = state_retention.compact_state_db("tenant", keep_last=3)
+
+    assert checkpoint_counts(state_db) == {"session/": 3}
+    with sqlite3.connect(state_db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM writes WHERE checkpoint_ns != ''").fetchone()[0] == 0
+    assert result["deleted_checkpoints"] > 0
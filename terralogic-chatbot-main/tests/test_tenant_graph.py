@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+import src.graphs.graph_v3 as graph_v3
+import utils.helper as helper
+
+
+class FakeSubgraph:
+    """
+    Stands in for the subgraph builders. Builders listed in `parallel` wait on a shared barrier, which only opens when
+    they run at the same time.
+    """
+
+    barrier = None
+    parallel = ()
+
+    def __init__(self, *args, **kwargs):
+        self.args, self.kwargs = args, kwargs
+        self.timings = {}
+
+    def build_graph(self):
+        if type(self).__name__ in self.parallel:
+            self.barrier.wait(timeout=5)
+        return self
+
+
+class FakeIntroSubgraph(FakeSubgraph):
+    pass
+
+
+class FakeCareerSubgraph(FakeSubgraph):
+    pass
+
+
+class FakeSupervisor(FakeSubgraph):
+    def understand(self, state):
+        pass
+
+    def fallback(self, state):
+        pass
+
+
+class FakeFAQLLMSubgraph(FakeSubgraph):
+    def __init__(self, *args, vectorstore=None):
+        super().__init__(*args)
+        self.type = args[5]
+        self.vectorstore = vectorstore
+        self.timings = {"faq_load": 0.0} if self.type == "services" else {}
+
+    def faq_llm_career_build_graph(self):
+        return self.build_graph()
+
+
+@pytest.fixture
+def tenant_graph(monkeypatch, tmp_path):
+    vectorstore_loads = []
+
+    def load_vectorstore(vectorstore_path, url, embeddings):
+        vectorstore_loads.append(vectorstore_path)
+        # the intro and career builders run while the index is loading
+        FakeSubgraph.barrier.wait(timeout=5)
+        return object()
+
+    FakeSubgraph.barrier = threading.Barrier(3)
+    FakeSubgraph.parallel = ("FakeIntroSubgraph", "FakeCareerSubgraph")
+    monkeypatch.setattr(graph_v3, "ChatOpenAI", lambda **kwargs: object())
+    monkeypatch.setattr(graph_v3, "OpenAIEmbeddings", lambda **kwargs: object())
+    monkeypatch.setattr(helper, "load_application_properties", lambda: {"STATE_DB_PATH": str(tmp_path)})
+    monkeypatch.setattr(helper, "load_client_properties", lambda client: {
+        "ROOT_DIR": "Data", "CLIENT_NAME": client, "VECTOR_STORE_FILE": "vectorstore.db", "URL": "https://example.com"})
+    monkeypatch.setattr(graph_v3.MultiTenantGraph, "_load_prompts", lambda self, client_properties: {})
+    monkeypatch.setattr(graph_v3.LLMNode, "load_or_create_vectorstore", staticmethod(load_vectorstore))
+    monkeypatch.setattr(graph_v3.IntentRouter, "from_client_properties", staticmethod(lambda client_properties: "router"))
+    monkeypatch.setattr(graph_v3, "Supervisor", FakeSupervisor)
+    monkeypatch.setattr(graph_v3, "ServiceInformationSubgraph", FakeIntroSubgraph)
+    monkeypatch.setattr(graph_v3, "CareerToolNode", FakeCareerSubgraph)
+    monkeypatch.setattr(graph_v3, "FAQLLMSubgraph", FakeFAQLLMSubgraph)
+    return graph_v3.MultiTenantGraph("tenant"), vectorstore_loads
+
+
+def test_subgraphs_are_built_in_parallel_and_share_one_vectorstore(tenant_graph):
+    graph, vectorstore_loads = tenant_graph
+
+    assert isinstance(graph.service_info_node, FakeIntroSubgraph) and isinstance(graph.career_node, FakeCareerSubgraph)
+    assert graph.supervisor_agent.kwargs == {"intent_router": "router"}
+    assert vectorstore_loads == ["Data/tenant/vectorstore.db"]
+    assert (graph.service_node.type, graph.project_node.type) == ("services", "projects")
+    assert graph.service_node.vectorstore is graph.project_node.vectorstore is not None
+
+
+def test_startup_timings_cover_every_step(tenant_graph):
+    graph, _ = tenant_graph
+    assert set(graph.timings) == {"prompts", "faiss_load", "intent_router", "introduction_subgraph", "career_subgraph",
+                                  "faq_load", "services_subgraph", "projects_subgraph"}
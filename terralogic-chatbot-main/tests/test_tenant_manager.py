@@ -0,0 +1,153 @@
+import threading
+import time
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from utils.tenant_manager import TenantManager
+
+
+class FakeGraph:
+    def __init__(self, client_id):
+        self.client_id = client_id
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_manager(clients=("a", "b", "c"), sizes=None, **kwargs):
+    loads = []
+
+    def factory(client_id):
+        loads.append(client_id)
+        return FakeGraph(client_id)
+
+    manager = TenantManager({client_id: {} for client_id in clients}, factory, on_evict=lambda graph: graph.close(),
+                            size_estimator=(lambda client_id: sizes[client_id]) if sizes else None, **kwargs)
+    return manager, loads
+
+
+def test_least_recently_used_tenant_is_evicted_and_closed():
+    manager, loads = make_manager(max_tenants=2)
+    graph_a = manager.get("a")
+    manager.get("b")
+    manager.get("a")
+    manager.get("c")
+
+    assert manager.stats()["resident_tenants"] == ["a", "c"]
+    assert manager.readiness()["b"] == {"status": "evicted"}
+    assert not graph_a.closed
+    # evicted tenants load again on their next request
+    manager.get("b")
+    assert loads == ["a", "b", "c", "b"]
+    assert manager.stats()["evictions"] == 2
+
+
+def test_artifact_budget():
+    manager, _ = make_manager(sizes={"a": 600, "b": 600, "c": 300}, max_artifact_mb=1000)
+    manager.get("a")
+    manager.get("b")
+    assert manager.stats()["resident_tenants"] == ["b"]
+    manager.get("c")
+    stats = manager.stats()
+    assert stats["resident_tenants"] == ["b", "c"] and stats["resident_artifact_mb"] == 900
+    assert manager.readiness()["c"]["artifact_mb"] == 300
+
+
+def test_busy_tenant_is_not_evicted_until_released():
+    manager, _ = make_manager(max_tenants=1)
+    with manager.use("a") as graph_a:
+        graph_b = manager.get("b")
+        manager.get("c")
+        stats = manager.stats()
+        assert "a" in stats["resident_tenants"] and stats["busy_tenants"] == ["a"]
+        assert not graph_a.closed and graph_b.closed
+    # the skipped eviction happens once the request is done
+    assert manager.stats()["resident_tenants"] == ["c"]
+    assert graph_a.closed
+
+
+def test_nested_use_keeps_the_tenant_busy():
+    manager, _ = make_manager(max_tenants=1)
+    with manager.use("a") as graph_a:
+        with manager.use("a"):
+            pass
+        manager.get("b")
+        assert not graph_a.closed
+    assert graph_a.closed and manager.stats()["busy_tenants"] == []
+
+
+def test_loads_are_single_flight():
+    release = threading.Event()
+    calls = []
+
+    def slow_factory(client_id):
+        calls.append(client_id)
+        release.wait(5)
+        return FakeGraph(client_id)
+
+    manager = TenantManager({"a": {}}, slow_factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.get("a", timeout=5))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    assert manager.readiness()["a"] == {"status": "loading"}
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["a"]
+    assert len(results) == 8 and all(graph is results[0] for graph in results)
+
+
+def test_request_times_out_while_the_tenant_is_loading():
+    release = threading.Event()
+    calls = []
+
+    def slow_factory(client_id):
+        calls.append(client_id)
+        release.wait(5)
+        return FakeGraph(client_id)
+
+    manager = TenantManager({"a": {}}, slow_factory)
+    with pytest.raises(TimeoutError):
+        manager.get("a", timeout=0.05)
+    with pytest.raises(TimeoutError):
+        with manager.use("a", timeout=0.05):
+            pass
+    # timed-out requests neither restart the load nor keep the tenant busy
+    assert manager.readiness()["a"] == {"status": "loading"}
+    assert manager.stats()["busy_tenants"] == []
+
+    release.set()
+    assert manager.get("a", timeout=5).client_id == "a"
+    assert calls == ["a"] and manager.stats()["loads"] == 1
+
+
+def test_failed_load_is_retried():
+    attempts = []
+
+    def flaky_factory(client_id):
+        attempts.append(client_id)
+        if len(attempts) == 1:
+            raise RuntimeError("index missing")
+        return FakeGraph(client_id)
+
+    manager = TenantManager({"a": {}}, flaky_factory)
+    with pytest.raises(RuntimeError):
+        manager.get("a")
+    assert manager.readiness()["a"]["status"] == "failed"
+    assert manager.get("a").client_id == "a"
+    assert manager.stats()["load_failures"] == 1 and manager.stats()["loads"] == 2
+
+
+def test_unconfigured_client():
+    manager, _ = make_manager()
+    with pytest.raises(ValueError):
+        manager.get("unknown")
+    with pytest.raises(ValueError):
+        with manager.use("unknown"):
+            pass
+
@@ -0,0 +1,110 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import utils.url_fetcher as url_fetcher
+from utils.url_fetcher import HostLimiter, fetch_url, fetch_documents
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    hits = {}
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.hits[self.path] = cls.hits.get(self.path, 0) + 1
+            hits = cls.hits[self.path]
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.1)
+            if self.path == "/down" or (self.path == "/flaky" and hits == 1):
+                self.send_error(503)
+                return
+            if self.path == "/missing":
+                self.send_error(404)
+                return
+            body = f"<html><head><title>{self.path}</title></head><body>{self.path}</body></html>".encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url(monkeypatch):
+    monkeypatch.setattr(url_fetcher, "RETRY_BACKOFF_SECONDS", 0)
+    CountingHandler.hits, CountingHandler.max_in_flight = {}, 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_retryable_status_is_retried_once_per_attempt(server_url):
+    content, report = fetch_url(f"{server_url}/flaky", HostLimiter(delay=0), retries=2)
+    assert content and report.status == 200 and report.attempts == 2 and report.error is None
+    assert CountingHandler.hits["/flaky"] == 2
+
+
+def test_attempts_count_every_request(server_url):
+    content, report = fetch_url(f"{server_url}/down", HostLimiter(delay=0), retries=2)
+    assert content is None and report.status == 503 and report.error
+    # no hidden retries in the session: three attempts are three requests
+    assert report.attempts == 3 and CountingHandler.hits["/down"] == 3
+
+
+def test_client_errors_are_not_retried(server_url):
+    content, report = fetch_url(f"{server_url}/missing", HostLimiter(delay=0), retries=2)
+    assert content is None and report.status == 404 and report.attempts == 1
+    assert CountingHandler.hits["/missing"] == 1
+
+
+def test_connection_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(url_fetcher, "RETRY_BACKOFF_SECONDS", 0)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    content, report = fetch_url(f"http://127.0.0.1:{port}/", HostLimiter(delay=0), retries=1)
+    assert content is None and report.status is None and report.attempts == 2 and report.error
+
+
+def test_per_host_limit(server_url):
+    urls = [f"{server_url}/slow/{index}" for index in range(8)]
+    documents, reports = fetch_documents(urls, max_workers=8, per_host=2, delay=0, extract_workers=1)
+    assert [document.metadata["source"] for document in documents] == urls
+    assert documents[0].metadata["title"] == "/slow/0"
+    assert all(report.error is None for report in reports)
+    assert CountingHandler.max_in_flight == 2
+
+
+def test_host_limiter_spaces_request_starts():
+    limiter = HostLimiter(per_host=4, delay=0.05)
+    starts = []
+
+    def request():
+        with limiter.slot("example.com"):
+            starts.append(time.monotonic())
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    starts.sort()
+    assert all(later - earlier >= 0.045 for earlier, later in zip(starts, starts[1:]))
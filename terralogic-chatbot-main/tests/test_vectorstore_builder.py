@@ -0,0 +1,101 @@
+import threading
+import time
+
+from langchain_core.documents import Document
+
+from utils.vectorstore_builder import FaissIndexBuilder, RateLimiter
+
+
+class SlowEmbeddings:
+    """
+    Embeds "chunk-<i>" as [i, 1, 0, 0]. Earlier batches take longer, so batches finish out of order.
+    Tracks how many embedding requests run at once.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            first = int(texts[0].split("-")[1])
+            time.sleep(max(0.0, 0.08 - first * 0.005))
+            return [[float(text.split("-")[1]), 1.0, 0.0, 0.0] for text in texts]
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def chunks(start, end):
+    return [Document(page_content=f"chunk-{i}", metadata={"source": f"page-{i // 3}"}) for i in range(start, end)]
+
+
+def stored_rows(vectorstore):
+    """
+    (text, metadata source, docstore id, first vector component) for every row of the index, in index order.
+    """
+    rows = []
+    for row, chunk_id in sorted(vectorstore.index_to_docstore_id.items()):
+        document = vectorstore.docstore.search(chunk_id)
+        rows.append((document.page_content, document.metadata["source"], chunk_id, vectorstore.index.reconstruct(row)[0]))
+    return rows
+
+
+def test_batches_are_appended_in_order():
+    embed_model = SlowEmbeddings()
+    progress = []
+    builder = FaissIndexBuilder(embed_model, batch_size=2, max_concurrency=3, requests_per_minute=None, on_progress=progress.append)
+
+    builder.add_documents(chunks(0, 7), ids=[f"id-{i}" for i in range(7)])
+    builder.add_documents(chunks(7, 12), ids=[f"id-{i}" for i in range(7, 12)])
+    vectorstore = builder.build()
+
+    assert stored_rows(vectorstore) == [(f"chunk-{i}", f"page-{i // 3}", f"id-{i}", float(i)) for i in range(12)]
+    assert progress == [2] * 6 and builder.chunks_added == 12
+    assert embed_model.requests == 6
+    assert 1 < embed_model.max_in_flight <= 3
+
+
+def test_appends_to_an_existing_index():
+    embed_model = SlowEmbeddings()
+    first = FaissIndexBuilder(embed_model, batch_size=4, requests_per_minute=None)
+    first.add_documents(chunks(0, 3))
+    vectorstore = first.build()
+
+    second = FaissIndexBuilder(embed_model, vectorstore=vectorstore, batch_size=4, requests_per_minute=None)
+    second.add_documents(chunks(3, 9))
+    assert second.build() is vectorstore
+    assert [row[0] for row in stored_rows(vectorstore)] == [f"chunk-{i}" for i in range(9)]
+
+
+def test_empty_build_returns_none():
+    assert FaissIndexBuilder(SlowEmbeddings()).build() is None
+
+
+def test_rate_limiter_spaces_calls_across_threads():
+    limiter = RateLimiter(requests_per_minute=1200)
+    starts = []
+    lock = threading.Lock()
+
+    def call():
+        limiter.wait()
+        with lock:
+            starts.append(time.monotonic())
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    starts.sort()
+    assert all(later - earlier >= 0.045 for earlier, later in zip(starts, starts[1:]))
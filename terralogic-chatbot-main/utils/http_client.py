@@ -0,0 +1,121 @@
+import time
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds, used when a call does not pass its own timeout
+DEFAULT_TIMEOUT = (5, 30)
+# host pools kept alive, and connections per host (callers wait for a free connection beyond that)
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 8
+# idempotent requests are retried on connection errors and these statuses, with exponential backoff (0.5s, 1s, 2s)
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; TeLoChatbot/1.0)",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+}
+
+_session = None
+_no_retry_session = None
+_session_lock = threading.Lock()
+
+
+class RequestMetrics:
+    """
+    Per-host request counters and timings of the shared session.
+    """
+
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def record(self, host, seconds, error):
+        with self._lock:
+            entry = self._hosts.setdefault(host, {"requests": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            entry["requests"] += 1
+            entry["errors"] += int(error)
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                host: dict(entry, avg_seconds=round(entry["total_seconds"] / entry["requests"], 4), total_seconds=round(entry["total_seconds"], 3), max_seconds=round(entry["max_seconds"], 3))
+                for host, entry in self._hosts.items()
+            }
+
+
+metrics = RequestMetrics()
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with keep-alive pools bounded per host, retry with backoff, a default timeout and timing metrics.
+    With retry=False every request is attempted once, for callers that retry themselves.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retry=True):
+        super().__init__()
+        self.timeout = timeout
+        self.headers.update(DEFAULT_HEADERS)
+        retry = Retry(
+            total=RETRY_TOTAL if retry else 0,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
+            # POST is not retried: a lead or enquiry must not be submitted twice
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry, pool_block=True)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, **kwargs)
+        except requests.RequestException:
+            metrics.record(host, time.perf_counter() - start, error=True)
+            raise
+        metrics.record(host, time.perf_counter() - start, error=response.status_code >= 400)
+        return response
+
+
+def get_session(retry=True):
+    """
+    The process-wide pooled session. Safe to share between threads for requests; do not mutate its headers per call.
+    retry=False returns the session without retries (see PooledSession), shared the same way.
+    """
+    global _session, _no_retry_session
+    with _session_lock:
+        if retry:
+            if _session is None:
+                _session = PooledSession()
+            return _session
+        if _no_retry_session is None:
+            _no_retry_session = PooledSession(retry=False)
+        return _no_retry_session
+
+
+def get(url, **kwargs):
+    return get_session().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return get_session().post(url, **kwargs)
+
+
+def http_stats():
+    """
+    Per-host request counts, errors and latencies, e.g. {"terralogic.com": {"requests": 12, "avg_seconds": 0.21, ...}}.
+    """
+    return metrics.snapshot()
@@ -0,0 +1,92 @@
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+
+from utils.logger_config import logger
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def is_web_source(source):
+    return isinstance(source, str) and source.startswith(("http://", "https://"))
+
+
+class IndexManifest:
+    """
+    Per-tenant record of the website pages in the vectorstore: url -> {"hash", "chunk_ids", "lastmod", "indexed_at"}.
+
+    A website re-index uses it to skip pages whose sitemap lastmod or content hash did not change, and to find the
+    chunk ids to delete from the FAISS index and docstore for pages that changed or disappeared.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.pages = json.load(f).get("pages", {})
+
+    def __len__(self):
+        return len(self.pages)
+
+    def urls(self):
+        return set(self.pages)
+
+    def chunk_ids(self, url):
+        return list(self.pages.get(url, {}).get("chunk_ids", []))
+
+    def unchanged_since(self, url, lastmod):
+        """
+        True when the sitemap lastmod of url equals the one recorded at its last indexing.
+        """
+        entry = self.pages.get(url)
+        return bool(entry and lastmod and entry.get("hash") and entry.get("lastmod") == lastmod)
+
+    def has_content(self, url, page_hash):
+        entry = self.pages.get(url)
+        return bool(entry and entry.get("hash") == page_hash)
+
+    def record(self, url, page_hash, chunk_ids, lastmod=None):
+        self.pages[url] = {
+            "hash": page_hash,
+            "chunk_ids": list(chunk_ids),
+            "lastmod": lastmod,
+            "indexed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+    def set_lastmod(self, url, lastmod):
+        if url in self.pages and lastmod:
+            self.pages[url]["lastmod"] = lastmod
+
+    def remove(self, url):
+        """
+        Forget url and return the chunk ids it had in the vectorstore.
+        """
+        return self.pages.pop(url, {}).get("chunk_ids", [])
+
+    def rebuild_from_vectorstore(self, vectorstore, page_hashes=None, lastmods=None):
+        """
+        Record every web page chunk of a FAISS vectorstore by its source url (PDF and other chunks are left out).
+        Pages without a known hash are re-embedded on the next re-index.
+        """
+        page_hashes = page_hashes or {}
+        lastmods = lastmods or {}
+        chunks = {}
+        for chunk_id in vectorstore.index_to_docstore_id.values():
+            source = vectorstore.docstore.search(chunk_id).metadata.get("source")
+            if is_web_source(source):
+                chunks.setdefault(source, []).append(chunk_id)
+        self.pages = {}
+        for url, chunk_ids in chunks.items():
+            self.record(url, page_hashes.get(url), chunk_ids, lastmods.get(url))
+        logger.info(f"Index manifest: recorded {len(chunks)} pages from the vectorstore")
+        return self
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"pages": self.pages}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,236 @@
+import uuid
+import threading
+import multiprocessing
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.logger_config import logger
+
+# indexing jobs run at once across tenants (each tenant runs one job at a time), and jobs a tenant may have waiting
+MAX_WORKERS = 2
+MAX_QUEUED = 5
+
+# pipeline stages reported by src/setup.py, and the progress shown once a stage is reached (stages repeat per batch,
+# progress never goes back)
+STAGE_PROGRESS = {"starting": 5, "fetched": 20, "extracted": 35, "chunked": 50, "embedded": 75, "saving": 90, "saved": 95}
+# reported once the run's artifacts are written, so a cancellation can no longer leave them half updated
+UNCANCELLABLE_STAGES = ("saved",)
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+# finished jobs kept for status queries
+MAX_FINISHED_JOBS = 200
+
+
+class IndexingCancelled(Exception):
+    pass
+
+
+class IndexingQueueFull(Exception):
+    pass
+
+
+def _run_indexing_job(job_id, client_id, options, progress_queue, cancel_event):
+    """
+    Worker process: run the setup pipeline for one job. Progress is sent back as (job_id, stage, count); a
+    cancellation request is honoured at the next progress report, except the final "saved" one.
+    """
+    from src.setup import run_setup
+
+    def progress(stage, count):
+        if cancel_event.is_set() and stage not in UNCANCELLABLE_STAGES:
+            raise IndexingCancelled(f"Indexing job {job_id} cancelled")
+        progress_queue.put((job_id, stage, count))
+
+    progress("starting", 1)
+    run_setup(client_id, progress=progress, **options)
+
+
+class IndexingJobRunner:
+    """
+    Runs indexing jobs (src/setup.py run_setup) on a pool of worker processes.
+
+    - Single flight per tenant: a tenant has at most one running job, further jobs wait in its queue and start in order.
+      Submitting a job identical to one already queued for the tenant returns the queued job. At most max_queued jobs
+      wait per tenant, beyond that submit raises IndexingQueueFull.
+    - Jobs can be cancelled: a queued job is dropped, a running job stops at its next progress report. The vectorstore
+      and index manifest are written together after the last cancellation point ("saving"), so a cancelled job leaves
+      both as they were. The FAQ store (FAQ JSON, embeddings, per-PDF cache) is refreshed at the start of a job that
+      includes PDFs, before any progress report, and stays updated when the job is cancelled later; it is complete
+      on its own.
+    - Each job reports its stage (fetched, extracted, chunked, embedded, saved), a count per stage and a progress percentage.
+
+    Workers are started with the spawn method, so they do not inherit the server's threads, and are reused across jobs.
+    Spawn re-imports the server's __main__ module in every worker (as __mp_main__), so that module must not start
+    anything at import time in that case (see app.py). job_function runs a job in a worker; it must be a module-level
+    function taking (job_id, client_id, options, progress_queue, cancel_event).
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_queued=MAX_QUEUED, job_function=_run_indexing_job):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.job_function = job_function
+        self.jobs = {}
+        self._lock = threading.RLock()
+        self._running = {}
+        self._queued = {}
+        self._options = {}
+        self._cancel_events = {}
+        self._on_finish = {}
+        self._executor = None
+        self._manager = None
+        self._progress_queue = None
+
+    def _ensure_started(self):
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            if self._manager is None:
+                self._manager = context.Manager()
+                self._progress_queue = self._manager.Queue()
+                threading.Thread(target=self._listen, name="indexing-progress", daemon=True).start()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def submit(self, client_id, options, description="", on_finish=None):
+        """
+        Queue an indexing job for client_id. options are run_setup keyword arguments (website_only, urls, sitemap,
+        include, exclude). on_finish(job) is called once the job completes, fails or is cancelled, also when the
+        submission joins an identical queued job. Returns (job id, False when an identical queued job was reused).
+        """
+        with self._lock:
+            queue = self._queued.get(client_id, ())
+            for queued_id in queue:
+                if self._options[queued_id] == options:
+                    if on_finish:
+                        self._on_finish[queued_id].append(on_finish)
+                    return queued_id, False
+            if client_id in self._running and len(queue) >= self.max_queued:
+                raise IndexingQueueFull(f"{len(queue)} indexing jobs already waiting for {client_id}, retry once one has finished")
+
+            self._prune()
+            job_id = str(uuid.uuid4())
+            self.jobs[job_id] = {
+                "status": "queued",
+                "progress": 0,
+                "stage": "queued",
+                "stages": {},
+                "message": f"Waiting for {description or 'indexing'}...",
+                "indexing_mode": description,
+                "client_id": client_id,
+                "created_at": datetime.now().isoformat(),
+            }
+            self._options[job_id] = options
+            self._on_finish[job_id] = [on_finish] if on_finish else []
+            if client_id in self._running:
+                queue = self._queued.setdefault(client_id, deque())
+                queue.append(job_id)
+                self.jobs[job_id]["message"] = f"Queued behind {len(queue)} job(s) of {client_id}"
+            else:
+                self._start(job_id)
+            return job_id, True
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in FINISHED_STATUSES]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def _start(self, job_id):
+        job = self.jobs[job_id]
+        self._ensure_started()
+        executor = self._executor
+        cancel_event = self._manager.Event()
+        future = executor.submit(self.job_function, job_id, job["client_id"], self._options[job_id], self._progress_queue, cancel_event)
+        self._cancel_events[job_id] = cancel_event
+        self._running[job["client_id"]] = job_id
+        job.update({"status": "processing", "stage": "starting", "progress": STAGE_PROGRESS["starting"],
+                    "message": f"Running {job['indexing_mode'] or 'indexing'}...", "started_at": datetime.now().isoformat()})
+        future.add_done_callback(lambda future: self._finished(job_id, future, executor))
+        logger.info(f"Indexing job {job_id} started for {job['client_id']}")
+
+    def _finished(self, job_id, future, executor):
+        with self._lock:
+            job = self.jobs[job_id]
+            error = future.exception()
+            if isinstance(error, IndexingCancelled):
+                job.update({"status": "cancelled", "message": "Indexing cancelled"})
+            elif error is not None:
+                job.update({"status": "failed", "progress": 100, "message": f"Indexing failed: {error}"})
+                logger.error(f"Indexing job {job_id} for {job['client_id']} failed: {error}")
+                if isinstance(error, BrokenProcessPool) and self._executor is executor:
+                    # a worker died (e.g. out of memory); the next job gets a fresh pool
+                    self._executor = None
+            else:
+                job.update({"status": "completed", "stage": "saved", "progress": 100,
+                            "message": f"{job['indexing_mode'] or 'Indexing'} completed successfully"})
+            job["finished_at"] = datetime.now().isoformat()
+            logger.info(f"Indexing job {job_id} for {job['client_id']} {job['status']}")
+
+            self._cancel_events.pop(job_id, None)
+            self._running.pop(job["client_id"], None)
+            queue = self._queued.get(job["client_id"])
+            if queue:
+                self._start(queue.popleft())
+        self._notify(job_id)
+
+    def _notify(self, job_id):
+        callbacks = self._on_finish.pop(job_id, [])
+        self._options.pop(job_id, None)
+        for on_finish in callbacks:
+            try:
+                on_finish(self.status(job_id))
+            except Exception as e:
+                logger.error(f"Indexing job {job_id}: finish callback failed: {e}")
+
+    def _listen(self):
+        while True:
+            try:
+                job_id, stage, count = self._progress_queue.get()
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                job = self.jobs.get(job_id)
+                if not job or job["status"] != "processing":
+                    continue
+                job["stage"] = stage
+                job["stages"][stage] = count
+                job["progress"] = max(job["progress"], STAGE_PROGRESS.get(stage, 0))
+                job["message"] = f"{stage.capitalize()}: {count}"
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job. Returns False when the job is unknown or already finished.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if not job or job["status"] in FINISHED_STATUSES:
+                return False
+            queue = self._queued.get(job["client_id"])
+            if queue and job_id in queue:
+                queue.remove(job_id)
+                job.update({"status": "cancelled", "message": "Indexing cancelled before it started", "finished_at": datetime.now().isoformat()})
+            else:
+                self._cancel_events[job_id].set()
+                job.update({"status": "cancelling", "message": "Cancelling at the next pipeline step..."})
+                return True
+        self._notify(job_id)
+        return True
+
+    def status(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job, stages=dict(job["stages"])) if job else None
+
+    def list_jobs(self, client_id=None):
+        with self._lock:
+            return {job_id: dict(job, stages=dict(job["stages"])) for job_id, job in self.jobs.items() if client_id in (None, job["client_id"])}
+
+    def shutdown(self):
+        """
+        Stop the worker processes, waiting for running jobs.
+        """
+        with self._lock:
+            executor, manager = self._executor, self._manager
+            self._executor = self._manager = None
+        if executor is not None:
+            executor.shutdown()
+        if manager is not None:
+            manager.shutdown()
@@ -0,0 +1,103 @@
+import os
+import fitz
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.logger_config import logger
+
+# large PDFs are split into page ranges of this size so a single document can use several cores
+PAGES_PER_TASK = 25
+
+
+def _page_count(pdf_path):
+    """
+    Number of pages of a PDF, None when it cannot be opened.
+    """
+    try:
+        with fitz.open(pdf_path) as doc:
+            return doc.page_count
+    except Exception as e:
+        logger.error(f"Error reading PDF {pdf_path}: {e}")
+        return None
+
+
+def _extract_page_range(pdf_path, start, end):
+    """
+    Worker: extract the text of pages [start, end) of a PDF. Returns (page_number, text) pairs, text is None for a
+    page that could not be extracted.
+    """
+    try:
+        doc = fitz.open(pdf_path)
+    except Exception as e:
+        logger.error(f"Error extracting pages {start}-{end} of {pdf_path}: {e}")
+        return [(page_number, None) for page_number in range(start, end)]
+    pages = []
+    with doc:
+        for page_number in range(start, end):
+            try:
+                pages.append((page_number, doc[page_number].get_text()))
+            except Exception as e:
+                logger.error(f"Error extracting page {page_number} of {pdf_path}: {e}")
+                pages.append((page_number, None))
+    return pages
+
+
+def iter_pdf_pages(pdf_paths, max_workers=None, pages_per_task=PAGES_PER_TASK):
+    """
+    Extract PDFs on a process pool, fanning out documents and page ranges of large documents across cores.
+
+    Yields (pdf_path, page_number, total_pages, text) in document and page order, as soon as each range is ready.
+    text is None for a page that could not be extracted. PDFs that cannot be opened yield nothing.
+    """
+    tasks = []
+    for pdf_path in pdf_paths:
+        total_pages = _page_count(pdf_path) or 0
+        for start in range(0, total_pages, pages_per_task):
+            tasks.append((pdf_path, start, min(start + pages_per_task, total_pages), total_pages))
+
+    if not tasks:
+        return
+
+    # a single small document is not worth the pool start-up cost
+    if len(tasks) == 1:
+        pdf_path, start, end, total_pages = tasks[0]
+        results = [_extract_page_range(pdf_path, start, end)]
+    else:
+        max_workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+        results = pool.map(_extract_page_range, [t[0] for t in tasks], [t[1] for t in tasks], [t[2] for t in tasks])
+
+    try:
+        # map() returns results in submission order, so pages stream back in order
+        for (pdf_path, start, end, total_pages), pages in zip(tasks, results):
+            for page_number, text in pages:
+                yield pdf_path, page_number, total_pages, text
+    finally:
+        if len(tasks) > 1:
+            pool.shutdown(cancel_futures=True)
+
+
+def extract_pdf_pages(pdf_paths, max_workers=None):
+    """
+    Extract a set of PDFs once for an indexing run.
+
+    Returns a dict of pdf_path -> list of page texts, indexed by page number. A page that could not be extracted is
+    None, a PDF that could not be opened (or has no pages) maps to None, see pages_complete.
+    """
+    pdf_pages = {pdf_path: None for pdf_path in pdf_paths}
+    for pdf_path, page_number, total_pages, text in iter_pdf_pages(pdf_paths, max_workers=max_workers):
+        if pdf_pages[pdf_path] is None:
+            pdf_pages[pdf_path] = [None] * total_pages
+        pdf_pages[pdf_path][page_number] = text
+
+    failed = [pdf_path for pdf_path, pages in pdf_pages.items() if not pages_complete(pages)]
+    logger.info(f"Extracted {sum(text is not None for pages in pdf_pages.values() for text in pages or [])} pages from {len(pdf_paths)} PDFs")
+    if failed:
+        logger.warning(f"PDFs not fully extracted: {failed}")
+    return pdf_pages
+
+
+def pages_complete(pages):
+    """
+    True when a PDF was opened and every page of it was extracted (extract_pdf_pages result).
+    """
+    return pages is not None and all(text is not None for text in pages)
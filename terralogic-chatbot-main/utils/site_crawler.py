@@ -0,0 +1,257 @@
+import os
+import time
+from collections import deque
+from urllib import robotparser
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+from bs4 import BeautifulSoup
+from langchain_core.documents import Document
+
+from utils.logger_config import logger
+import utils.http_client as http_client
+from utils.url_fetcher import FetchReport, HostLimiter, bs4_extractor, page_metadata, log_fetch_summary
+
+# pages fetched at once, and the crawl budget: pages, total downloaded bytes, bytes of a single page
+MAX_WORKERS = 8
+MAX_PAGES = 2000
+MAX_BYTES = 200 * 1024 * 1024
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+POLITENESS_DELAY = 0.2
+
+# links to these are never requested; other non-HTML responses are dropped from their headers, before the body is read
+SKIPPED_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".bmp", ".mp4", ".mp3", ".avi", ".mov", ".webm",
+    ".zip", ".gz", ".rar", ".7z", ".tar", ".exe", ".dmg", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".csv",
+    ".css", ".js", ".json", ".xml", ".rss", ".woff", ".woff2", ".ttf", ".eot",
+)
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# query parameters that never change the page content
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "mc_cid", "mc_eid", "ref", "_ga"}
+
+
+def canonicalize(url):
+    """
+    One spelling per page: lowercase scheme and host, no default port, no fragment, no trailing slash (except the
+    root), no tracking parameters, sorted query.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def _extract_page_and_links(extractor, content, url):
+    """
+    Worker: page text, metadata, and the absolute http(s) links of the page.
+    """
+    soup = BeautifulSoup(content, "lxml")
+    links = []
+    for anchor in soup.find_all("a", href=True):
+        if anchor.get("rel") and "nofollow" in anchor.get("rel"):
+            continue
+        link = urljoin(url, anchor["href"].strip())
+        if link.startswith(("http://", "https://")):
+            links.append(link)
+    canonical = soup.find("link", rel="canonical", href=True)
+    metadata = page_metadata(soup)
+    if canonical:
+        metadata["canonical"] = urljoin(url, canonical["href"].strip())
+    return extractor(content), metadata, links
+
+
+class RobotsPolicy:
+    """
+    robots.txt rules per host, fetched once per crawl. A missing robots.txt allows everything, 401/403 disallows everything.
+    """
+
+    def __init__(self, user_agent):
+        self.user_agent = user_agent
+        self._parsers = {}
+
+    def _parser(self, url):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if origin not in self._parsers:
+            parser = robotparser.RobotFileParser(origin + "/robots.txt")
+            try:
+                response = http_client.get(origin + "/robots.txt", timeout=10)
+                if response.status_code in (401, 403):
+                    parser.disallow_all = True
+                elif response.status_code >= 400:
+                    parser.allow_all = True
+                else:
+                    parser.parse(response.text.splitlines())
+            except requests.RequestException as e:
+                logger.warning(f"Crawler: robots.txt of {origin} not available, crawling without it: {e}")
+                parser.allow_all = True
+            self._parsers[origin] = parser
+        return self._parsers[origin]
+
+    def allowed(self, url):
+        return self._parser(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        return self._parser(url).crawl_delay(self.user_agent) or 0
+
+
+class SiteCrawler:
+    """
+    Concurrent crawler for full-website indexing.
+
+    - Breadth-first from start_url, staying under its prefix; pages at depth < max_depth are fetched (the start page
+      is depth 0, so max_depth=1 fetches only the start page, as RecursiveUrlLoader did).
+    - URLs are canonicalized and deduplicated, redirects and <link rel="canonical"> collapse onto one page.
+    - robots.txt is respected, including Crawl-delay.
+    - Non-HTML links are skipped by extension, other non-HTML responses from their Content-Type before the body is read.
+    - Budgets: max_pages fetched, max_bytes downloaded in total, max_page_bytes per page. Failures are reported, not raised.
+    - Text and links are extracted on a process pool while further pages download.
+
+    - A link redirecting out of scope (another host, or outside the start prefix) is reported as skipped, not indexed.
+
+    After crawl(), discovered holds every in-scope URL the crawl found, whether it was fetched, failed or left in the
+    frontier (URLs disallowed by robots.txt or redirecting out of scope excluded), and budget_reached tells whether a
+    budget cut the crawl short.
+    """
+
+    def __init__(self, start_url, max_depth=2, extractor=bs4_extractor, max_workers=MAX_WORKERS, max_pages=MAX_PAGES,
+                 max_bytes=MAX_BYTES, max_page_bytes=MAX_PAGE_BYTES, delay=POLITENESS_DELAY, timeout=None):
+        self.start_url = canonicalize(start_url)
+        self.scope = self.start_url.rstrip("/") + "/" if urlsplit(self.start_url).path != "/" else self.start_url
+        self.max_depth = max_depth
+        self.extractor = extractor
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_page_bytes = max_page_bytes
+        self.timeout = timeout
+        self.session = http_client.get_session()
+        self.robots = RobotsPolicy(self.session.headers.get("User-Agent", "*"))
+        self.limiter = HostLimiter(per_host=max_workers, delay=max(delay, self.robots.crawl_delay(self.start_url)))
+        self.reports = []
+        self.bytes_downloaded = 0
+        self.discovered = set()
+        self.budget_reached = False
+
+    def in_scope(self, url):
+        return (url == self.start_url or url.startswith(self.scope)) and not urlsplit(url).path.lower().endswith(SKIPPED_EXTENSIONS)
+
+    def _fetch(self, url):
+        """
+        Returns (final url, content or None, content type, FetchReport). A redirect out of scope is not downloaded:
+        it returns the final url without content.
+        """
+        start = time.perf_counter()
+        status = None
+        try:
+            with self.limiter.slot(urlsplit(url).netloc):
+                response = self.session.get(url, stream=True, timeout=self.timeout or self.session.timeout)
+            with response:
+                status = response.status_code
+                response.raise_for_status()
+                final_url = canonicalize(response.url)
+                if final_url != url and not self.in_scope(final_url):
+                    return response.url, None, None, FetchReport(url, status, 1, round(time.perf_counter() - start, 3), 0,
+                                                                  f"skipped, redirects out of scope to {final_url}")
+                content_type = response.headers.get("Content-Type", "")
+                if not content_type.lower().startswith(HTML_CONTENT_TYPES):
+                    raise ValueError(f"skipped content type {content_type or 'unknown'}")
+                if int(response.headers.get("Content-Length") or 0) > self.max_page_bytes:
+                    raise ValueError(f"skipped, larger than {self.max_page_bytes} bytes")
+                chunks, size = [], 0
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    size += len(chunk)
+                    if size > self.max_page_bytes:
+                        raise ValueError(f"skipped, larger than {self.max_page_bytes} bytes")
+                    chunks.append(chunk)
+                content = b"".join(chunks)
+                return response.url, content, content_type, FetchReport(url, status, 1, round(time.perf_counter() - start, 3), size, None)
+        except (requests.RequestException, ValueError) as e:
+            return url, None, None, FetchReport(url, status, 1, round(time.perf_counter() - start, 3), 0, str(e))
+
+    def crawl(self):
+        """
+        Returns the crawled pages as Documents (metadata: source, content_type, title, description, language).
+        """
+        start = time.perf_counter()
+        documents = []
+        frontier = deque([(self.start_url, 0)])
+        seen = {self.start_url}
+        excluded = set()
+        indexed = set()
+        fetching, extracting = {}, {}
+        pages_requested = 0
+
+        fetch_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crawl")
+        extract_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        try:
+            while True:
+                while frontier and len(fetching) < self.max_workers and pages_requested < self.max_pages and self.bytes_downloaded < self.max_bytes:
+                    url, depth = frontier.popleft()
+                    if not self.robots.allowed(url):
+                        self.reports.append(FetchReport(url, None, 0, 0.0, 0, "disallowed by robots.txt"))
+                        excluded.add(url)
+                        continue
+                    fetching[fetch_pool.submit(self._fetch, url)] = (url, depth)
+                    pages_requested += 1
+                if not fetching and not extracting:
+                    break
+
+                done, _ = wait(set(fetching) | set(extracting), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in fetching:
+                        url, depth = fetching.pop(future)
+                        final_url, content, content_type, report = future.result()
+                        self.reports.append(report)
+                        final_url = canonicalize(final_url)
+                        if content is None:
+                            if not self.in_scope(final_url):
+                                excluded.add(url)
+                            continue
+                        self.bytes_downloaded += len(content)
+                        # a redirect onto a page that is already indexed
+                        if final_url != url and final_url in indexed:
+                            continue
+                        seen.add(final_url)
+                        indexed.add(final_url)
+                        extracting[extract_pool.submit(_extract_page_and_links, self.extractor, content, final_url)] = (final_url, depth, content_type)
+                    else:
+                        url, depth, content_type = extracting.pop(future)
+                        try:
+                            text, metadata, links = future.result()
+                        except Exception as e:
+                            logger.warning(f"Crawler: extraction of {url} failed: {e}")
+                            continue
+
+                        canonical = canonicalize(metadata.pop("canonical", url))
+                        if canonical != url:
+                            if canonical in indexed:
+                                continue
+                            seen.add(canonical)
+                            indexed.add(canonical)
+                        documents.append(Document(page_content=text, metadata={"source": url, "content_type": content_type, **metadata}))
+
+                        if depth + 1 < self.max_depth:
+                            for link in links:
+                                link = canonicalize(link)
+                                if link not in seen and self.in_scope(link):
+                                    seen.add(link)
+                                    frontier.append((link, depth + 1))
+        finally:
+            fetch_pool.shutdown(cancel_futures=True)
+            extract_pool.shutdown(cancel_futures=True)
+
+        self.discovered = seen - excluded
+        self.budget_reached = bool(frontier)
+        if frontier:
+            logger.warning(f"Crawler: budget reached ({pages_requested} pages, {self.bytes_downloaded / 1e6:.1f} MB), {len(frontier)} URLs not crawled")
+        log_fetch_summary(self.reports, time.perf_counter() - start)
+        return documents
@@ -0,0 +1,148 @@
+import io
+import re
+import gzip
+import queue
+import threading
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import utils.http_client as http_client
+from utils.logger_config import logger
+
+# nested sitemaps read at once, how deep sitemap indexes may nest, and entries parsed ahead of the consumer
+MAX_WORKERS = 4
+MAX_DEPTH = 3
+MAX_BUFFERED = 1000
+
+SitemapEntry = namedtuple("SitemapEntry", ["loc", "lastmod"])
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element, name):
+    for child in element:
+        if _local_name(child.tag) == name:
+            return (child.text or "").strip() or None
+    return None
+
+
+def iter_sitemap_file(stream):
+    """
+    Stream the entries of one sitemap file with iterparse, keeping only the current element in memory.
+    Yields ("url", loc, lastmod) for a urlset and ("sitemap", loc, lastmod) for a sitemap index.
+    """
+    root = None
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            continue
+        kind = _local_name(element.tag)
+        if kind in ("url", "sitemap"):
+            loc = _child_text(element, "loc")
+            if loc:
+                yield kind, loc, _child_text(element, "lastmod")
+            # drop the entries parsed so far
+            root.clear()
+
+
+def open_sitemap(url):
+    """
+    GET a sitemap as a stream. Returns (response, file object); .xml.gz files are decompressed on the fly,
+    whether or not the server marks them with Content-Encoding.
+    """
+    response = http_client.get(url, stream=True)
+    response.raise_for_status()
+    response.raw.decode_content = True
+    # urllib3 closes the raw stream as soon as it is read to the end, which fails the buffered reader's last read
+    response.raw.auto_close = False
+    stream = io.BufferedReader(response.raw)
+    if stream.peek(2)[:2] == b"\x1f\x8b":
+        stream = gzip.GzipFile(fileobj=stream)
+    return response, stream
+
+
+def iter_sitemap(sitemap_url, include=None, exclude=None, max_workers=MAX_WORKERS, max_depth=MAX_DEPTH, max_buffered=MAX_BUFFERED):
+    """
+    Yield SitemapEntry(loc, lastmod) for every page of a sitemap, following sitemap indexes.
+
+    Nested sitemaps are read concurrently and entries are yielded as soon as they are parsed, so callers can start
+    on the first pages while the rest of the tree is still downloading. Order across nested sitemaps is not
+    guaranteed. include / exclude are regular expressions matched (re.search) against loc: with include, a page
+    must match one of them; a page matching any exclude pattern is left out. Duplicate locs are yielded once.
+
+    At most max_buffered entries wait for the caller: readers pause while it is busy (e.g. embedding a batch), so
+    memory stays flat however large the sitemap tree is.
+    """
+    include = [re.compile(pattern) for pattern in include or []]
+    exclude = [re.compile(pattern) for pattern in exclude or []]
+    results = queue.Queue(maxsize=max_buffered)
+    finished = object()
+    stop = threading.Event()
+    lock = threading.Lock()
+    seen_sitemaps = set()
+    pending = [0]
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sitemap")
+
+    def put(item):
+        # blocks while the buffer is full; gives up once the caller stopped reading
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def wanted(loc):
+        return (not include or any(pattern.search(loc) for pattern in include)) and not any(pattern.search(loc) for pattern in exclude)
+
+    def read(url, depth):
+        try:
+            response, stream = open_sitemap(url)
+            with response:
+                count = 0
+                for kind, loc, lastmod in iter_sitemap_file(stream):
+                    if stop.is_set():
+                        return
+                    if kind == "sitemap":
+                        if depth < max_depth:
+                            submit(loc, depth + 1)
+                        else:
+                            logger.warning(f"Sitemap: {loc} nested deeper than {max_depth} levels, skipped")
+                    elif wanted(loc):
+                        count += 1
+                        if not put(SitemapEntry(loc, lastmod)):
+                            return
+            logger.info(f"Sitemap: {count} URLs from {url}")
+        except Exception as e:
+            logger.error(f"Sitemap parsing error for {url}: {e}")
+        finally:
+            put(finished)
+
+    def submit(url, depth):
+        with lock:
+            if url in seen_sitemaps:
+                return
+            seen_sitemaps.add(url)
+            pending[0] += 1
+        executor.submit(read, url, depth)
+
+    submit(sitemap_url, 0)
+    seen_locs = set()
+    try:
+        while pending[0]:
+            item = results.get()
+            if item is finished:
+                with lock:
+                    pending[0] -= 1
+                continue
+            if item.loc not in seen_locs:
+                seen_locs.add(item.loc)
+                yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
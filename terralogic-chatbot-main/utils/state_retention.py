@@ -0,0 +1,224 @@
+import os
+import sys
+sys.path.append(os.getcwd())
+import argparse
+import sqlite3
+import msgpack
+from datetime import datetime, timedelta, timezone
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from src.graphs.checkpointer import configure_connection
+from utils.logger_config import logger
+import utils.helper as helper
+
+
+def _db_size(db_path):
+    """
+    Bytes on disk of a SQLite file plus its write-ahead log.
+    """
+    return sum(os.path.getsize(path) for path in (db_path, db_path + "-wal") if os.path.exists(path))
+
+
+def _checkpoint_time(checkpoint_blob):
+    """
+    Timestamp of a msgpack-encoded checkpoint, or None when it cannot be read.
+    """
+    try:
+        ts = msgpack.unpackb(checkpoint_blob, raw=False).get("ts")
+        if not ts:
+            return None
+        checkpoint_time = datetime.fromisoformat(ts)
+        return checkpoint_time if checkpoint_time.tzinfo else checkpoint_time.replace(tzinfo=timezone.utc)
+    except Exception:
+        return None
+
+
+def enable_incremental_vacuum(conn):
+    """
+    Switch the database to auto_vacuum=INCREMENTAL. On a database with data the mode only takes effect after a full
+    VACUUM, which rewrites the whole file under an exclusive lock: only call this while the chatbot is stopped
+    (state_retention.py --vacuum). State DBs created by the checkpointer are incremental from the start.
+    """
+    if conn.execute("PRAGMA auto_vacuum;").fetchone()[0] == 2:
+        return False
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+    conn.execute("VACUUM;")
+    return True
+
+
+def incremental_vacuum(conn):
+    """
+    Give every page on the freelist back to the OS. Returns the number of pages freed, 0 when the database is not in
+    auto_vacuum=INCREMENTAL mode (its free pages are then only reused by later writes).
+    """
+    if conn.execute("PRAGMA auto_vacuum;").fetchone()[0] != 2:
+        return 0
+    free_pages = conn.execute("PRAGMA freelist_count;").fetchone()[0]
+    # through execute() the pragma frees one page per step; executescript runs it to completion
+    conn.executescript("PRAGMA incremental_vacuum;")
+    return free_pages - conn.execute("PRAGMA freelist_count;").fetchone()[0]
+
+
+def _delete_in_batches(conn, keys, batch_size):
+    """
+    Delete checkpoints and their pending writes by (thread_id, checkpoint_ns, checkpoint_id), one transaction per batch
+    so the chatbot's own checkpoint writes are never blocked for long.
+    """
+    deleted_checkpoints, deleted_writes = 0, 0
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start:start + batch_size]
+        with conn:
+            deleted_writes += conn.executemany(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", batch
+            ).rowcount
+            deleted_checkpoints += conn.executemany(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", batch
+            ).rowcount
+    return deleted_checkpoints, deleted_writes
+
+
+def archive_idle_threads(conn, archive_db_path, idle_days, batch_size=500):
+    """
+    Move threads whose latest checkpoint is older than idle_days into the archive database.
+    Only the latest main-graph checkpoint (and its pending writes) is kept in the archive, finished subgraph
+    namespaces are dropped; the thread's full history is removed from the live database. Returns the number of archived threads.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=idle_days)
+    latest = conn.execute(
+        "SELECT c.thread_id, c.checkpoint_ns, c.checkpoint_id, c.checkpoint FROM checkpoints c "
+        "JOIN (SELECT thread_id, checkpoint_ns, MAX(checkpoint_id) AS checkpoint_id FROM checkpoints GROUP BY thread_id, checkpoint_ns) m "
+        "ON c.thread_id = m.thread_id AND c.checkpoint_ns = m.checkpoint_ns AND c.checkpoint_id = m.checkpoint_id"
+    ).fetchall()
+
+    # a thread is idle only when none of its namespaces has a recent checkpoint
+    last_activity = {}
+    for thread_id, checkpoint_ns, checkpoint_id, checkpoint_blob in latest:
+        checkpoint_time = _checkpoint_time(checkpoint_blob)
+        if checkpoint_time is None:
+            last_activity[thread_id] = datetime.max.replace(tzinfo=timezone.utc)
+        elif thread_id not in last_activity or checkpoint_time > last_activity[thread_id]:
+            last_activity[thread_id] = checkpoint_time
+    idle_threads = [thread_id for thread_id, checkpoint_time in last_activity.items() if checkpoint_time < cutoff]
+    if not idle_threads:
+        return 0
+
+    # create the archive with the checkpointer's own schema, so SqliteSaver can read it back
+    with sqlite3.connect(archive_db_path) as archive_conn:
+        SqliteSaver(archive_conn).setup()
+    conn.execute("ATTACH DATABASE ? AS archive", (archive_db_path,))
+    try:
+        for start in range(0, len(idle_threads), batch_size):
+            batch = [(thread_id,) for thread_id in idle_threads[start:start + batch_size]]
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO archive.checkpoints SELECT o.* FROM main.checkpoints o WHERE o.thread_id = ?1 AND o.checkpoint_ns = '' AND o.checkpoint_id = "
+                    "(SELECT MAX(c.checkpoint_id) FROM main.checkpoints c WHERE c.thread_id = o.thread_id AND c.checkpoint_ns = o.checkpoint_ns)",
+                    batch,
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO archive.writes SELECT w.* FROM main.writes w JOIN archive.checkpoints a "
+                    "ON w.thread_id = a.thread_id AND w.checkpoint_ns = a.checkpoint_ns AND w.checkpoint_id = a.checkpoint_id WHERE w.thread_id = ?1",
+                    batch,
+                )
+                conn.executemany("DELETE FROM main.writes WHERE thread_id = ?", batch)
+                conn.executemany("DELETE FROM main.checkpoints WHERE thread_id = ?", batch)
+    finally:
+        conn.execute("DETACH DATABASE archive")
+    return len(idle_threads)
+
+
+def prune_old_checkpoints(conn, keep_last, batch_size=500):
+    """
+    Keep only the keep_last most recent checkpoints per (thread_id, checkpoint_ns).
+    checkpoint_ids are time-ordered, so ordering by id orders by age.
+
+    A subgraph that inherits the main graph's checkpointer writes under a new namespace every turn
+    ("introduction_node:<task_id>"), which is never read once the turn is over. Checkpoints of such namespaces older
+    than the thread's latest main-graph checkpoint are deleted outright.
+    Returns (deleted_checkpoints, deleted_writes).
+    """
+    keys = conn.execute(
+        "SELECT thread_id, checkpoint_ns, checkpoint_id FROM ("
+        "SELECT thread_id, checkpoint_ns, checkpoint_id, "
+        "ROW_NUMBER() OVER (PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS position FROM checkpoints"
+        ") WHERE position > ?",
+        (keep_last,),
+    ).fetchall()
+    keys += conn.execute(
+        "SELECT c.thread_id, c.checkpoint_ns, c.checkpoint_id FROM checkpoints c "
+        "JOIN (SELECT thread_id, MAX(checkpoint_id) AS checkpoint_id FROM checkpoints WHERE checkpoint_ns = '' GROUP BY thread_id) m "
+        "ON c.thread_id = m.thread_id WHERE c.checkpoint_ns != '' AND c.checkpoint_id < m.checkpoint_id"
+    ).fetchall()
+    return _delete_in_batches(conn, list(set(keys)), batch_size)
+
+
+def compact_state_db(client_id, keep_last=None, archive_after_days=None, batch_size=None, full_vacuum=False):
+    """
+    Retention job for a tenant's LangGraph state DB (application_db/state_db/<client_id>.db).
+
+    1. Threads idle for more than archive_after_days move to <client_id>_archive.db (latest checkpoint only).
+    2. Every remaining thread keeps its keep_last newest checkpoints; older checkpoints, checkpoints of finished per-turn
+       subgraph namespaces and their writes are deleted in batches.
+    3. Freed pages are returned to the OS with incremental_vacuum and the WAL is truncated.
+
+    A state DB created before the checkpointer enabled auto_vacuum=INCREMENTAL keeps its free pages for reuse;
+    full_vacuum converts it with a one-time VACUUM after pruning, which needs the chatbot stopped.
+    The report job only reads the latest checkpoint of threads active in the last day, so it is unaffected.
+    A session resumed after being archived starts from an empty state.
+    Returns a dictionary with counts and reclaimed bytes.
+    """
+    application_properties = helper.load_application_properties()
+    keep_last = keep_last or int(application_properties.get("STATE_KEEP_CHECKPOINTS", 3))
+    archive_after_days = archive_after_days or int(application_properties.get("STATE_ARCHIVE_AFTER_DAYS", 30))
+    batch_size = batch_size or int(application_properties.get("STATE_RETENTION_BATCH_SIZE", 500))
+
+    state_db_path = application_properties["STATE_DB_PATH"]
+    db_path = os.path.join(state_db_path, f"{client_id}.db")
+    archive_db_path = os.path.join(state_db_path, f"{client_id}_archive.db")
+    if not os.path.exists(db_path):
+        logger.info(f"State retention: {db_path} not found, nothing to compact")
+        return {"status": 204, "reason": "db file not found"}
+
+    bytes_before = _db_size(db_path)
+    conn = configure_connection(sqlite3.connect(db_path, timeout=30), busy_timeout_ms=30000)
+    try:
+        archived_threads = archive_idle_threads(conn, archive_db_path, archive_after_days, batch_size)
+        deleted_checkpoints, deleted_writes = prune_old_checkpoints(conn, keep_last, batch_size)
+
+        if full_vacuum and enable_incremental_vacuum(conn):
+            logger.info(f"State retention: vacuumed {db_path} and switched it to auto_vacuum=INCREMENTAL")
+        freed_pages = incremental_vacuum(conn)
+        if conn.execute("PRAGMA auto_vacuum;").fetchone()[0] != 2:
+            logger.warning(f"State retention: {db_path} is not in auto_vacuum=INCREMENTAL mode, free pages are kept for reuse "
+                           f"(run utils/state_retention.py --vacuum with the chatbot stopped to convert it)")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+        free_pages = conn.execute("PRAGMA freelist_count;").fetchone()[0]
+    finally:
+        conn.close()
+
+    bytes_after = _db_size(db_path)
+    result = {
+        "client_id": client_id,
+        "archived_threads": archived_threads,
+        "deleted_checkpoints": deleted_checkpoints,
+        "deleted_writes": deleted_writes,
+        "freed_pages": freed_pages,
+        "free_pages": free_pages,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "reclaimed_bytes": bytes_before - bytes_after,
+    }
+    logger.info(f"State retention completed: {result}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prune and archive LangGraph checkpoints in a client's state DB.")
+    parser.add_argument('-n', '--name', type=str, default="terralogic", help='Client id (state_db/<name>.db)')
+    parser.add_argument('-k', '--keep-last', type=int, default=None, help='Checkpoints kept per thread')
+    parser.add_argument('-d', '--archive-after-days', type=int, default=None, help='Archive threads idle for more than this many days')
+    parser.add_argument('--vacuum', action='store_true', help='One-time full VACUUM to enable incremental vacuum (stop the chatbot first)')
+    args = parser.parse_args()
+
+    print(compact_state_db(args.name, keep_last=args.keep_last, archive_after_days=args.archive_after_days, full_vacuum=args.vacuum))
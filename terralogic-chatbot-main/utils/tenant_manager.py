@@ -0,0 +1,213 @@
+import os
+import time
+from threading import Lock
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.logger_config import logger
+
+
+def _path_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, file)) for file in files)
+    return total
+
+
+def artifact_size_mb(client_properties):
+    """
+    On-disk size of the artifacts a tenant's graph loads into memory (FAISS vectorstore, FAQ embeddings and FAQ JSON).
+    It is a proxy for the tenant's share of RAM, not a measurement: flat FAISS indexes and embedding arrays take about
+    their file size once loaded, while models, LLM clients and Python overhead are not counted.
+    """
+    client_dir = os.path.join(client_properties["ROOT_DIR"], client_properties["CLIENT_NAME"])
+    artifacts = [client_properties.get(key) for key in ("VECTOR_STORE_FILE", "EMBEDDINGS_FILE", "FAQ_JSON_FILE")]
+    paths = [os.path.join(client_dir, artifact) for artifact in artifacts if artifact]
+    return sum(_path_size(path) for path in paths if os.path.exists(path)) / (1024 * 1024)
+
+
+class TenantManager:
+    """
+    Builds one chatbot graph per configured client on a background thread pool and hands them out to requests.
+
+    Loads are single-flight: a tenant is built at most once at a time, and requests that arrive while it is
+    loading wait on the same future. Failed loads are retried on the next request.
+
+    At most max_tenants graphs (and max_artifact_mb of artifacts, as reported by size_estimator, e.g. artifact_size_mb)
+    stay resident. Beyond that, the least recently used idle tenants are evicted, passed to on_evict(graph) to release
+    their resources, and loaded again on their next request. A tenant is busy while a use() block holds its graph:
+    busy tenants are never evicted, the budget is enforced again once they are released.
+    """
+
+    def __init__(self, client_configs, graph_factory, max_workers=4, max_tenants=None, max_artifact_mb=None, size_estimator=None,
+                 on_evict=None):
+        self.client_configs = client_configs
+        self.graph_factory = graph_factory
+        self.max_tenants = max_tenants
+        self.max_artifact_mb = max_artifact_mb
+        self.size_estimator = size_estimator
+        self.on_evict = on_evict
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tenant-loader")
+        self._futures = {}
+        self._status = {}
+        # resident tenants, least recently used first: client_id -> artifact size in MB, and their graphs
+        self._resident = OrderedDict()
+        self._graphs = {}
+        # client_id -> number of requests currently holding its graph
+        self._in_use = {}
+        self._counters = {"loads": 0, "load_failures": 0, "evictions": 0}
+        self._lock = Lock()
+
+    def _estimate_mb(self, client_id):
+        if self.size_estimator is None:
+            return 0.0
+        try:
+            return float(self.size_estimator(client_id))
+        except Exception as e:
+            logger.warning(f"Could not estimate the size of tenant {client_id}: {e}")
+            return 0.0
+
+    def _evict_over_budget(self):
+        """
+        Drop least recently used idle tenants until the count and artifact budgets hold. Busy tenants and the most
+        recent tenant are always kept. Caller holds the lock; returns the evicted graphs, to be closed once it is released.
+        """
+        def over_budget():
+            if self.max_tenants is not None and len(self._resident) > self.max_tenants:
+                return True
+            return self.max_artifact_mb is not None and sum(self._resident.values()) > self.max_artifact_mb
+
+        evicted = []
+        for client_id in list(self._resident)[:-1]:
+            if not over_budget():
+                break
+            if self._in_use.get(client_id):
+                continue
+            size_mb = self._resident.pop(client_id)
+            self._futures.pop(client_id, None)
+            evicted.append(self._graphs.pop(client_id))
+            self._status[client_id] = {"status": "evicted"}
+            self._counters["evictions"] += 1
+            logger.info(f"Evicted idle tenant {client_id} (~{size_mb:.1f} MB of artifacts)")
+        return evicted
+
+    def _close(self, graphs):
+        for graph in graphs:
+            if self.on_evict is None:
+                continue
+            try:
+                self.on_evict(graph)
+            except Exception as e:
+                logger.warning(f"Could not release an evicted tenant graph: {e}")
+
+    def _load(self, client_id):
+        start = time.perf_counter()
+        try:
+            graph = self.graph_factory(client_id)
+        except Exception as e:
+            duration = time.perf_counter() - start
+            logger.exception(f"Failed to initialize graph for {client_id}: {e}")
+            with self._lock:
+                self._status[client_id] = {"status": "failed", "error": str(e), "load_seconds": round(duration, 2)}
+                self._counters["load_failures"] += 1
+            raise
+
+        duration = time.perf_counter() - start
+        size_mb = self._estimate_mb(client_id)
+        logger.info(f"Graph initialized successfully for: {client_id} in {duration:.2f}s")
+        with self._lock:
+            self._status[client_id] = {"status": "ready", "load_seconds": round(duration, 2), "artifact_mb": round(size_mb, 1)}
+            self._resident[client_id] = size_mb
+            self._resident.move_to_end(client_id)
+            self._graphs[client_id] = graph
+            evicted = self._evict_over_budget()
+        self._close(evicted)
+        return graph
+
+    def _submit_locked(self, client_id):
+        future = self._futures.get(client_id)
+        if future is None or (future.done() and future.exception() is not None):
+            logger.info(f"Initializing graph for client: {client_id}")
+            self._status[client_id] = {"status": "loading"}
+            self._counters["loads"] += 1
+            future = self._executor.submit(self._load, client_id)
+            self._futures[client_id] = future
+        elif client_id in self._resident:
+            self._resident.move_to_end(client_id)
+        return future
+
+    def _submit(self, client_id):
+        with self._lock:
+            return self._submit_locked(client_id)
+
+    def start_loading(self, client_ids=None):
+        """
+        Queue every (or the given) tenant for loading and return immediately.
+        """
+        return [self._submit(client_id) for client_id in (client_ids or self.client_configs.keys())]
+
+    def wait_until_loaded(self, timeout=None):
+        """
+        Block until every queued tenant finished loading (successfully or not).
+        """
+        for future in list(self._futures.values()):
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+
+    def get(self, client_id, timeout=None):
+        """
+        Return the tenant's graph, loading it first if needed. The tenant may be evicted (and its graph closed) as soon
+        as this returns; use use() to run the graph.
+
+        Raises ValueError for unconfigured clients and concurrent.futures.TimeoutError when the tenant
+        is still loading after timeout seconds.
+        """
+        if client_id not in self.client_configs:
+            raise ValueError(f"Client '{client_id}' not configured in client_properties.yaml")
+        return self._submit(client_id).result(timeout=timeout)
+
+    @contextmanager
+    def use(self, client_id, timeout=None):
+        """
+        Like get(), as a context manager: the tenant is busy, and so not evicted, until the block exits.
+
+            with tenant_manager.use(client_id) as graph:
+                graph.run_graph(...)
+        """
+        if client_id not in self.client_configs:
+            raise ValueError(f"Client '{client_id}' not configured in client_properties.yaml")
+        with self._lock:
+            future = self._submit_locked(client_id)
+            self._in_use[client_id] = self._in_use.get(client_id, 0) + 1
+        try:
+            yield future.result(timeout=timeout)
+        finally:
+            with self._lock:
+                self._in_use[client_id] -= 1
+                if not self._in_use[client_id]:
+                    del self._in_use[client_id]
+                # evictions skipped while the tenant was busy
+                evicted = self._evict_over_budget()
+            self._close(evicted)
+
+    def stats(self):
+        """
+        Load/evict counters and the resident set, e.g. {"loads": 3, "evictions": 1, "resident_tenants": ["terralogic"], ...}.
+        """
+        with self._lock:
+            return dict(self._counters, resident_tenants=list(self._resident.keys()), busy_tenants=sorted(self._in_use),
+                        resident_artifact_mb=round(sum(self._resident.values()), 1), max_tenants=self.max_tenants,
+                        max_artifact_mb=self.max_artifact_mb)
+
+    def readiness(self):
+        """
+        Per-tenant load status, e.g. {"terralogic": {"status": "ready", "load_seconds": 12.3}}.
+        """
+        with self._lock:
+            status = {client_id: dict(self._status.get(client_id, {"status": "not_loaded"})) for client_id in self.client_configs}
+        return status
@@ -0,0 +1,182 @@
+import os
+import re
+import json
+import time
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+import requests
+from bs4 import BeautifulSoup
+from langchain_core.documents import Document
+
+from utils.logger_config import logger
+import utils.http_client as http_client
+
+# pages fetched at once overall, and at once from one host
+MAX_WORKERS = 16
+PER_HOST_LIMIT = 4
+# minimum seconds between two request starts to the same host
+POLITENESS_DELAY = 0.2
+# extra attempts after a connection error, a timeout or a retryable status (http_client.RETRY_STATUSES), with
+# exponential backoff. These are the only retries: pages are fetched on the session without retries.
+RETRIES = 2
+RETRY_BACKOFF_SECONDS = 1.0
+
+FetchReport = namedtuple("FetchReport", ["url", "status", "attempts", "seconds", "bytes", "error"])
+
+
+# Beautiful soup plain text extractor function
+def bs4_extractor(html) -> str:
+    soup = BeautifulSoup(html, "lxml")
+    return re.sub(r"\n\n+", "\n\n", soup.text).strip()
+
+
+def page_metadata(soup):
+    """
+    The metadata WebBaseLoader used to attach to a page: title, description, language.
+    """
+    metadata = {}
+    if soup.title and soup.title.string:
+        metadata["title"] = soup.title.string.strip()
+    description = soup.find("meta", attrs={"name": "description"})
+    if description and description.get("content"):
+        metadata["description"] = description["content"].strip()
+    if soup.html and soup.html.get("lang"):
+        metadata["language"] = soup.html["lang"]
+    return metadata
+
+
+def _extract_page(extractor, content):
+    """
+    Worker: page text and metadata.
+    """
+    return extractor(content), page_metadata(BeautifulSoup(content, "lxml"))
+
+
+class HostLimiter:
+    """
+    Caps concurrent requests per host and spaces request starts to one host at least delay seconds apart.
+    """
+
+    def __init__(self, per_host=PER_HOST_LIMIT, delay=POLITENESS_DELAY):
+        self.per_host = per_host
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+
+    @contextmanager
+    def slot(self, host):
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, 0.0))
+                self._next_start[host] = start + self.delay
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def fetch_url(url, limiter, retries=RETRIES, timeout=None):
+    """
+    GET one page through the shared pool, retrying here only (every attempt goes through the host's limiter slot and
+    is counted in the report). Returns (content or None, FetchReport).
+    """
+    session = http_client.get_session(retry=False)
+    host = urlsplit(url).netloc
+    start = time.perf_counter()
+    status, error, attempt = None, None, 0
+    for attempt in range(1, retries + 2):
+        try:
+            with limiter.slot(host):
+                response = session.get(url, timeout=timeout or session.timeout)
+            status = response.status_code
+            if status in http_client.RETRY_STATUSES and attempt <= retries:
+                response.close()
+                error = f"HTTP {status}"
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+                continue
+            response.raise_for_status()
+            content = response.content
+            return content, FetchReport(url, status, attempt, round(time.perf_counter() - start, 3), len(content), None)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+            if attempt <= retries:
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+        except requests.RequestException as e:
+            error = e
+            break
+    return None, FetchReport(url, status, attempt, round(time.perf_counter() - start, 3), 0, str(error))
+
+
+def fetch_documents(urls, extractor=bs4_extractor, max_workers=MAX_WORKERS, per_host=PER_HOST_LIMIT, delay=POLITENESS_DELAY,
+                    retries=RETRIES, extract_workers=None):
+    """
+    Fetch pages on a thread pool under global and per-host limits, and extract their text on a process pool while
+    the remaining pages download. extractor must be a module-level function (it is sent to the worker processes).
+
+    Returns (documents in url order, one FetchReport per unique url). Failed urls have no document and a report with error set.
+    """
+    urls = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+    if not urls:
+        return [], []
+
+    limiter = HostLimiter(per_host, delay)
+    reports = [None] * len(urls)
+    contents = {}
+    start = time.perf_counter()
+
+    # a single page is not worth the pool start-up cost
+    extract_pool = ProcessPoolExecutor(max_workers=extract_workers or os.cpu_count() or 1) if len(urls) > 1 else None
+    try:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls)), thread_name_prefix="url-fetch") as fetch_pool:
+            futures = {fetch_pool.submit(fetch_url, url, limiter, retries): index for index, url in enumerate(urls)}
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                content, reports[index] = future.result()
+                if content is not None:
+                    contents[index] = extract_pool.submit(_extract_page, extractor, content) if extract_pool else content
+                if done % 50 == 0:
+                    logger.info(f"Fetched {done}/{len(urls)} URLs ({time.perf_counter() - start:.1f}s)")
+
+        documents = []
+        for index in sorted(contents):
+            try:
+                text, metadata = contents[index].result() if extract_pool else _extract_page(extractor, contents[index])
+            except Exception as e:
+                reports[index] = reports[index]._replace(error=f"extraction failed: {e}")
+                continue
+            documents.append(Document(page_content=text, metadata={"source": urls[index], **metadata}))
+    finally:
+        if extract_pool:
+            extract_pool.shutdown(cancel_futures=True)
+
+    log_fetch_summary(reports, time.perf_counter() - start)
+    return documents, reports
+
+
+def log_fetch_summary(reports, elapsed):
+    if not reports:
+        return
+    failed = [report for report in reports if report.error]
+    seconds = sorted(report.seconds for report in reports)
+    p95 = seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))]
+    logger.info(
+        f"Fetched {len(reports) - len(failed)}/{len(reports)} URLs in {elapsed:.1f}s "
+        f"(p50 {seconds[len(seconds) // 2]:.2f}s, p95 {p95:.2f}s, {sum(report.bytes for report in reports) / 1e6:.1f} MB)"
+    )
+    for report in failed:
+        logger.warning(f"Failed to load URL {report.url} after {report.attempts} attempt(s): {report.error}")
+
+
+def write_fetch_report(reports, report_path):
+    """
+    Save the per-URL reports of an indexing run as JSON, slowest first.
+    """
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump([report._asdict() for report in sorted(reports, key=lambda report: -report.seconds)], f, indent=2)
@@ -0,0 +1,118 @@
+import time
+import uuid
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_community.vectorstores import FAISS
+
+from utils.logger_config import logger
+
+# chunks per embeddings request, requests in flight, and the request budget shared by them
+EMBED_BATCH_SIZE = 256
+EMBED_MAX_CONCURRENCY = 4
+EMBED_REQUESTS_PER_MINUTE = 300
+
+
+class RateLimiter:
+    """
+    Spaces calls at least 60 / requests_per_minute seconds apart, across threads.
+    """
+
+    def __init__(self, requests_per_minute=EMBED_REQUESTS_PER_MINUTE):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class FaissIndexBuilder:
+    """
+    Builds one FAISS vectorstore from a stream of chunks.
+
+    Chunks are buffered into batches of batch_size. Each full batch is embedded on a small thread pool, at most
+    max_concurrency requests at a time under a shared rate limit, while the caller keeps producing chunks.
+    Embedded batches are appended in order to a single index with add_embeddings, so there is no per-batch
+    vectorstore and no merge_from. Pass vectorstore to append to an existing index. on_progress, when given, is
+    called with the number of chunks of every batch appended to the index.
+
+        builder = FaissIndexBuilder(embed_model)
+        builder.add_documents(splits)   # any number of times
+        vectorstore = builder.build()   # None when no chunks were added
+    """
+
+    def __init__(self, embed_model, vectorstore=None, batch_size=EMBED_BATCH_SIZE, max_concurrency=EMBED_MAX_CONCURRENCY,
+                 requests_per_minute=EMBED_REQUESTS_PER_MINUTE, on_progress=None):
+        self.embed_model = embed_model
+        self.vectorstore = vectorstore
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.on_progress = on_progress
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="embed")
+        self._pending = []
+        self._in_flight = deque()
+        self.chunks_added = 0
+        self._start = time.perf_counter()
+
+    def _embed(self, texts):
+        self.rate_limiter.wait()
+        return self.embed_model.embed_documents(texts)
+
+    def add_documents(self, documents, ids=None):
+        """
+        Queue chunks for embedding. ids, when given, are used as their docstore ids.
+        """
+        ids = ids or [None] * len(documents)
+        try:
+            for document, chunk_id in zip(documents, ids):
+                self._pending.append((document, chunk_id))
+                if len(self._pending) >= self.batch_size:
+                    self._submit()
+            # append whatever finished; block only when too many batches are waiting, to bound memory
+            self._drain(keep=2 * self.max_concurrency)
+        except BaseException:
+            # a failed or cancelled build does not leave embedding threads behind
+            self._executor.shutdown(cancel_futures=True)
+            raise
+
+    def _submit(self):
+        batch, self._pending = self._pending, []
+        self._in_flight.append((batch, self._executor.submit(self._embed, [document.page_content for document, _ in batch])))
+
+    def _drain(self, keep=0):
+        while self._in_flight and (len(self._in_flight) > keep or self._in_flight[0][1].done()):
+            batch, future = self._in_flight.popleft()
+            self._append(batch, future.result())
+
+    def _append(self, batch, vectors):
+        text_embeddings = [(document.page_content, vector) for (document, _), vector in zip(batch, vectors)]
+        metadatas = [document.metadata for document, _ in batch]
+        ids = [chunk_id or str(uuid.uuid4()) for _, chunk_id in batch]
+        if self.vectorstore is None:
+            self.vectorstore = FAISS.from_embeddings(text_embeddings, self.embed_model, metadatas=metadatas, ids=ids)
+        else:
+            self.vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+        self.chunks_added += len(batch)
+        if self.on_progress:
+            self.on_progress(len(batch))
+        logger.info(f"Index builder: {self.chunks_added} chunks embedded ({time.perf_counter() - self._start:.1f}s)")
+
+    def build(self):
+        """
+        Embed the remaining chunks and return the vectorstore.
+        """
+        try:
+            if self._pending:
+                self._submit()
+            self._drain()
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+        return self.vectorstore